@@ -0,0 +1,110 @@
+# database and dashboard query benchmarks against seeded local postgres corpora
+import itertools
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.database import queries
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+
+# pmids used by the insert benchmarks, removed again after each run. above the
+# seeded corpus, which starts at SYNTHETIC_PMID_START (900000000)
+INSERT_PMID_START = 950000000
+
+SEARCH_SHAPES = {
+    'common_word': ("cancer", "All", ""),
+    'phrase': ("machine learning", "All", ""),
+    'no_match': ("zzqxv", "All", ""),
+    'year_filter': ("cancer", 2020, ""),
+    'year_range': ("therapy", "2015-2020", ""),
+    'journal_filter': ("cancer", "All", "Oncology"),
+}
+
+def _server_url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def seed_database(size, seed, batch_size=2000):
+    # make (or reuse) a database holding exactly `size` synthetic articles
+    name = f"pubmed_bench_{size}"
+    admin = create_engine(_server_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        exists = conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :name"), {'name': name}).scalar()
+        if not exists:
+            conn.execute(text(f'CREATE DATABASE "{name}"'))
+    admin.dispose()
+
+    db = DatabaseManager(_server_url(name))
+    db.create_tables()
+    corpus = SyntheticCorpus(CorpusConfig(seed=seed))
+
+    with db.engine.connect() as conn:
+        loaded = conn.execute(text("SELECT COUNT(*) FROM articles WHERE pmid < :limit"),
+                              {'limit': INSERT_PMID_START}).scalar()
+    for start in range(loaded, size, batch_size):
+        db.insert_articles_bulk(corpus.articles(min(batch_size, size - start), start))
+        print(f"\r  seeding {name}: {min(start + batch_size, size)}/{size}", end="", flush=True)
+    if loaded < size:
+        print()
+        with db.engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+    return db, corpus
+
+def _cleanup_inserted(db):
+    with db.engine.begin() as conn:
+        conn.execute(text("DELETE FROM article_authors WHERE article_pmid >= :p"), {'p': INSERT_PMID_START})
+        conn.execute(text("DELETE FROM article_mesh_terms WHERE article_pmid >= :p"), {'p': INSERT_PMID_START})
+        conn.execute(text("DELETE FROM articles WHERE pmid >= :p"), {'p': INSERT_PMID_START})
+
+def run(runner, args):
+    for size in args.sizes:
+        db, corpus = seed_database(size, args.seed)
+        group = f"db-{size}"
+        params = {'corpus_size': size}
+
+        # inserts: fresh pmids every round so nothing is skipped as existing
+        insert_corpus = SyntheticCorpus(CorpusConfig(seed=args.seed, pmid_start=INSERT_PMID_START))
+        counter = itertools.count()
+        runner.run("insert_article_data", db.insert_article_data, group,
+                   setup=lambda: (insert_corpus.article(INSERT_PMID_START + next(counter)),), params=params)
+        batch_counter = itertools.count(1000)
+        runner.run("insert_articles_bulk_100", db.insert_articles_bulk, group,
+                   setup=lambda: (insert_corpus.articles(100, next(batch_counter) * 100),),
+                   params=dict(params, batch=100))
+        _cleanup_inserted(db)
+
+        # search shapes, orm method and the dashboard's raw sql
+        for shape, (term, year, journal) in SEARCH_SHAPES.items():
+            runner.run(f"search_articles[{shape}]",
+                       lambda: db.search_articles(term, year, journal, 20), group, params=params)
+            query, query_params = queries.build_search_query(term, year, journal, 20)
+            runner.run(f"ui_search_query[{shape}]",
+                       lambda: db.execute_query(query, query_params), group, params=params)
+
+        runner.run("get_article_stats", db.get_article_stats, group, params=params)
+        runner.run("get_top_journals", lambda: db.get_top_journals(10), group, params=params)
+        runner.run("get_top_authors", lambda: db.get_top_authors(10), group, params=params)
+        runner.run("get_common_mesh_terms", lambda: db.get_common_mesh_terms(15), group, params=params)
+
+        # dashboard queries
+        runner.run("ui_year_stats", lambda: db.execute_query(queries.YEAR_STATS), group, params=params)
+        runner.run("ui_available_years", lambda: db.execute_query(queries.AVAILABLE_YEARS), group, params=params)
+        runner.run("ui_recent_articles", lambda: db.execute_query(queries.RECENT_ARTICLES, [10]), group, params=params)
+
+        # show_article_details runs three queries per article
+        pmids = itertools.cycle(range(corpus.config.pmid_start, corpus.config.pmid_start + size, max(1, size // 97)))
+
+        def show_article_details(pmid):
+            db.execute_query(queries.ARTICLE_DETAILS, [pmid])
+            db.execute_query(queries.ARTICLE_AUTHORS, [pmid])
+            db.execute_query(queries.ARTICLE_MESH_TERMS, [pmid])
+
+        runner.run("ui_show_article_details", show_article_details, group,
+                   setup=lambda: (next(pmids),), params=params)
+        runner.run("ui_export_article_csv", lambda pmid: db.execute_query(queries.EXPORT_ARTICLE_CSV, [pmid]),
+                   group, setup=lambda: (next(pmids),), params=params)
+
+        db.engine.dispose()
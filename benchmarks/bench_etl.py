@@ -0,0 +1,38 @@
+# parse and clean benchmarks, no database or network needed
+import xml.etree.ElementTree as ET
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.etl.pubmed_etl import PubMedETL
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+
+def run(runner, args):
+    etl = PubMedETL()
+    corpus = SyntheticCorpus(CorpusConfig(seed=args.seed))
+    articles = corpus.articles(100)
+
+    # realistic single record and a 100 record efetch-sized document
+    article = max(articles, key=lambda a: len(a['abstract']))
+    element = ET.fromstring(corpus.to_xml(article))
+    batch_xml = ("<PubmedArticleSet>" + "".join(corpus.to_xml(a) for a in articles) + "</PubmedArticleSet>").encode()
+
+    group = "etl"
+    runner.run("clean_text_title", lambda: etl._clean_text(article['title']), group)
+    runner.run("clean_text_abstract", lambda: etl._clean_text(article['abstract']), group,
+               params={'chars': len(article['abstract'])})
+    runner.run("clean_text_markup", lambda: etl._clean_text("<i>In vivo</i>  effects of <sup>18</sup>F-FDG"), group)
+
+    runner.run("extract_title", lambda: etl._extract_title(element), group)
+    runner.run("extract_abstract", lambda: etl._extract_abstract(element), group)
+    runner.run("extract_year", lambda: etl._extract_year(element), group)
+    runner.run("extract_journal_title", lambda: etl._extract_journal_title(element), group)
+    runner.run("extract_journal_issn", lambda: etl._extract_journal_issn(element), group)
+    runner.run("extract_authors", lambda: etl._extract_authors(element), group,
+               params={'authors': len(article['authors'])})
+    runner.run("extract_mesh_terms", lambda: etl._extract_mesh_terms(element), group,
+               params={'mesh_terms': len(article['mesh_terms'])})
+
+    runner.run("parse_article", lambda: etl.parse_article(element), group)
+    runner.run("parse_articles_batch_100", lambda: etl.parse_articles(batch_xml), group,
+               params={'articles': 100, 'bytes': len(batch_xml)})
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmarks: every sample is a fresh interpreter that imports an
+entry point and exits, so nothing is shared with this process or between
+samples.
+
+    main      main.py, the Streamlit app module (Streamlit in bare mode)
+    run_etl   run_etl.py
+    cli       scripts/run_etl.py --help
+
+As a suite of run_benchmarks.py it records one benchmark per entry point.
+Run directly it prints the median start time of each entry point next to
+an empty interpreter, plus its slowest imports (python -X importtime):
+
+    python benchmarks/bench_import.py --runs 10 --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import time
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+ENTRY_POINTS = {
+    'main': ['-c', 'import main'],
+    'run_etl': ['-c', 'import run_etl'],
+    'cli': [os.path.join('scripts', 'run_etl.py'), '--help'],
+}
+
+INTERPRETER = ['-c', 'pass']
+
+def spawn(argv, importtime=False):
+    # run one fresh interpreter from the repository root, returns its stderr
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + argv
+    result = subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with {result.returncode}: {result.stderr[-500:]}")
+    return result.stderr
+
+def slowest_imports(argv, top=10):
+    # (cumulative ms, module) of the slowest imports, nesting kept in the name
+    imports = []
+    for line in spawn(argv, importtime=True).splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(imports, reverse=True)[:top]
+
+def run(runner, args):
+    for name, argv in ENTRY_POINTS.items():
+        runner.run(f"start[{name}]", lambda argv=argv: spawn(argv), "import", params={'argv': ' '.join(argv)})
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Entry point import (cold start) times")
+    parser.add_argument("--entry", nargs="+", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list, 0 for none")
+    return parser.parse_args()
+
+def _median_ms(argv, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        spawn(argv)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+def main():
+    args = parse_args()
+    baseline = _median_ms(INTERPRETER, args.runs)
+    print(f"{'entry point':<12} {'median ms':>10} {'imports ms':>11}")
+    print(f"{'interpreter':<12} {baseline:>10.0f} {'':>11}")
+    for name in args.entry:
+        median = _median_ms(ENTRY_POINTS[name], args.runs)
+        print(f"{name:<12} {median:>10.0f} {median - baseline:>11.0f}")
+
+    for name in args.entry if args.top else []:
+        print(f"\nSlowest imports of {name} (cumulative ms):")
+        for cumulative, module in slowest_imports(ENTRY_POINTS[name], args.top):
+            print(f"  {cumulative:>8.1f}  {module}")
+
+if __name__ == "__main__":
+    main()
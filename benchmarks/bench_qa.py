@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+AI Q&A benchmarks: the question -> SQL -> governed query round trip that
+process_question runs, with the offline stub provider by default.
+
+As a suite of run_benchmarks.py it times the pipeline itself (stub without
+latency) with and without the SQL cache. Run directly it is a load test
+that compares providers on latency and throughput at several concurrency
+levels:
+
+    python benchmarks/bench_qa.py --provider stub --concurrency 1 4 16 --requests 200
+    python benchmarks/bench_qa.py --provider stub gemini --stub-latency-ms 800 --requests 50
+"""
+
+import argparse
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(__file__))
+
+from src.database.query_governor import QueryGovernor
+from src.qa.pipeline import answer_question
+from src.qa.providers import StubProvider, DEFAULT_STUB_ANSWERS, PROVIDERS, get_provider
+from src.qa.sql_cache import SqlCache
+from src.qa.sql_generator import SqlGenerator
+from src.utils.benchmark import summarize
+
+QUESTIONS = list(DEFAULT_STUB_ANSWERS)
+
+def run(runner, args):
+    from bench_database import seed_database
+    size = min(args.sizes)
+    db, _ = seed_database(size, args.seed)
+    group = f"qa-{size}"
+    params = {'corpus_size': size}
+    governor = QueryGovernor(db)
+    questions = itertools.cycle(QUESTIONS)
+
+    generator = SqlGenerator(StubProvider(latency_ms=0))
+    runner.run("answer_question[stub]", lambda q: answer_question(generator, governor, q), group,
+               setup=lambda: (next(questions),), params=params)
+
+    cache = SqlCache(db)
+    cache.clear()
+    cached_generator = SqlGenerator(StubProvider(latency_ms=0), cache)
+    runner.run("answer_question[cached]", lambda q: answer_question(cached_generator, governor, q), group,
+               setup=lambda: (next(questions),), params=params)
+    cache.clear()
+    db.engine.dispose()
+
+def load_test(provider, governor, questions, concurrency, requests, cache=None):
+    # fire `requests` questions from `concurrency` threads, returns latency
+    # percentiles and throughput
+    generator = SqlGenerator(provider, cache)
+    latencies = []
+    errors = 0
+
+    def one(question):
+        started = time.perf_counter()
+        answer = answer_question(generator, governor, question)
+        if answer['error']:
+            raise RuntimeError(answer['error'])
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(one, question) for question in itertools.islice(itertools.cycle(questions), requests)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies) if latencies else {}
+    return {
+        'provider': provider.name, 'concurrency': concurrency, 'requests': requests, 'errors': errors,
+        'seconds': elapsed, 'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'median_ms': stats.get('median', 0) * 1000, 'p95_ms': _percentile(latencies, 0.95) * 1000,
+        'retries': provider.stats['retries'], 'busy': provider.stats['busy'],
+    }
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AI Q&A load test")
+    parser.add_argument("--provider", nargs="+", choices=PROVIDERS, default=['stub'])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--size", type=int, default=10000, help="corpus size (articles) of the benchmark database")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stub-latency-ms", type=float, default=200)
+    parser.add_argument("--stub-jitter-ms", type=float, default=50)
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, help="provider concurrency limit (default LLM_MAX_CONCURRENCY)")
+    parser.add_argument("--cache", action="store_true", help="use the SQL cache (cleared first)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    from bench_database import seed_database
+    db, _ = seed_database(args.size, args.seed)
+    governor = QueryGovernor(db)
+    cache = SqlCache(db) if args.cache else None
+
+    limits = {'max_concurrency': args.max_concurrency} if args.max_concurrency else {}
+    print(f"{'provider':<8} {'conc':>5} {'req':>5} {'err':>4} {'req/s':>8} {'median ms':>10} {'p95 ms':>8} {'retries':>8}")
+    for name in args.provider:
+        for concurrency in args.concurrency:
+            if name == 'stub':
+                provider = StubProvider(latency_ms=args.stub_latency_ms, jitter_ms=args.stub_jitter_ms,
+                                        failure_rate=args.stub_failure_rate, seed=args.seed, **limits)
+            else:
+                provider = get_provider(name, **limits)
+                if provider is None:
+                    print(f"{name}: not configured, skipped")
+                    break
+            if cache is not None:
+                cache.clear()
+            result = load_test(provider, governor, QUESTIONS, concurrency, args.requests, cache)
+            print(f"{result['provider']:<8} {concurrency:>5} {result['requests']:>5} {result['errors']:>4} "
+                  f"{result['throughput']:>8.1f} {result['median_ms']:>10.1f} {result['p95_ms']:>8.1f} "
+                  f"{result['retries']:>8}")
+    db.engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Run the benchmark suite and optionally compare against a stored baseline.
+
+Examples:
+    python benchmarks/run_benchmarks.py                          # all suites
+    python benchmarks/run_benchmarks.py --suite etl
+    python benchmarks/run_benchmarks.py --suite qa --sizes 1000
+    python benchmarks/run_benchmarks.py --suite import
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --output benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json --threshold 0.15
+"""
+
+import argparse
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(__file__))
+
+from src.utils.benchmark import BenchmarkRunner, load_results, compare_results, format_results, format_comparison
+
+SUITES = ['etl', 'database', 'qa', 'import']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PubMed ETL benchmark suite")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000],
+                        help="corpus sizes (articles) for the database suite")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--max-time", type=float, default=1.0, help="seconds per benchmark")
+    parser.add_argument("--output", help="result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown (fraction of the baseline median) that counts as a regression")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    runner = BenchmarkRunner(min_rounds=args.min_rounds, max_time=args.max_time)
+
+    for suite in args.suite:
+        print(f"Running {suite} benchmarks...")
+        module = __import__(f"bench_{suite}")
+        module.run(runner, args)
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    runner.save(output)
+    print(format_results(runner.results))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        rows = compare_results(load_results(args.compare), runner.to_dict(), args.threshold)
+        print()
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row['regression']]
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN the queries the performance indexes were added for and show whether
+the planner uses them on the current database.
+
+    python scripts/check_indexes.py
+    python scripts/check_indexes.py --force   # sequential scans off, for small databases
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.database.db_manager import DatabaseManager
+from src.database.migrate import check_indexes, current_revision, head_revision
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that hot queries use their indexes")
+    parser.add_argument("--force", action="store_true", help="disable sequential scans while explaining")
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    revision = current_revision(db.engine)
+    print(f"Schema revision: {revision or 'none'} (latest {head_revision()})")
+
+    failed = 0
+    for result in check_indexes(db.engine, force=args.force):
+        mark = "✅" if result['uses_index'] else "❌"
+        failed += not result['uses_index']
+        print(f"{mark} {result['name']:28s} {result['index']:36s} cost {result['total_cost']:>10.1f}  ({result['source']})")
+        if not result['uses_index']:
+            print(f"   plan uses: {', '.join(result['indexes_in_plan']) or 'sequential scans only'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Distributed ETL: enqueue PMID batches and run workers against the shared queue.
+
+Examples:
+    # queue up the results of a search in batches of 200 pmids
+    python scripts/etl_worker.py enqueue --search "cancer immunotherapy" --max 5000
+
+    # run 4 worker processes on this host (run the same command on other hosts)
+    python scripts/etl_worker.py work --processes 4
+
+    # job counts
+    python scripts/etl_worker.py status
+"""
+
+import argparse
+import multiprocessing
+import signal
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.config.config import ETL_RATE_LIMIT, ETL_JOB_BATCH_SIZE, ETL_LEASE_SECONDS, ETL_MAX_ATTEMPTS
+from src.database.database import DatabaseManager
+from src.etl.pubmed_etl import PubMedETL
+from src.etl.rate_limit import SharedRateLimiter
+from src.etl.work_queue import WorkQueue, EtlWorker
+from src.utils.logger import flush_logs
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distributed PubMed ETL workers")
+    parser.add_argument("--base-url", help="e-utilities base url (default PUBMED_BASE_URL)")
+    parser.add_argument("--lease-seconds", type=int, default=ETL_LEASE_SECONDS)
+    parser.add_argument("--max-attempts", type=int, default=ETL_MAX_ATTEMPTS)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="add pmid batches to the queue")
+    enqueue.add_argument("--search", help="esearch term whose results are enqueued")
+    enqueue.add_argument("--max", type=int, default=1000, help="max search results")
+    enqueue.add_argument("--pmids-file", help="file with one pmid per line")
+    enqueue.add_argument("--batch-size", type=int, default=ETL_JOB_BATCH_SIZE)
+
+    work = commands.add_parser("work", help="process jobs")
+    work.add_argument("--processes", type=int, default=1, help="worker processes on this host")
+    work.add_argument("--rate-limit", type=float, default=ETL_RATE_LIMIT,
+                      help="requests per second for the whole fleet")
+    work.add_argument("--max-jobs", type=int, help="stop after this many jobs per process")
+    work.add_argument("--exit-when-empty", action="store_true", help="stop when nothing is left to claim")
+
+    commands.add_parser("status", help="show job counts")
+    return parser.parse_args()
+
+def make_queue(args, db=None):
+    return WorkQueue(db or DatabaseManager(), lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+
+def run_worker(args):
+    # one worker process, the rate limit is shared through the database
+    db = DatabaseManager()
+    etl = PubMedETL(base_url=args.base_url, rate_limiter=SharedRateLimiter(db, args.rate_limit))
+    worker = EtlWorker(make_queue(args, db), etl)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    try:
+        worker.run(max_jobs=args.max_jobs, exit_when_empty=args.exit_when_empty)
+    except KeyboardInterrupt:
+        worker.stop()
+    finally:
+        # forked processes skip atexit, write out queued log records first
+        flush_logs()
+
+def main():
+    args = parse_args()
+    db = DatabaseManager()
+    db.create_tables()
+
+    if args.command == "enqueue":
+        if args.pmids_file:
+            with open(args.pmids_file) as f:
+                pmids = [line.strip() for line in f if line.strip()]
+        elif args.search:
+            pmids = PubMedETL(base_url=args.base_url).search_articles(args.search, args.max)
+        else:
+            print("Nothing to enqueue: pass --search TERM or --pmids-file PATH")
+            sys.exit(1)
+        jobs = make_queue(args, db).enqueue(pmids, batch_size=args.batch_size, search_term=args.search)
+        print(f"Enqueued {len(pmids)} pmids as {jobs} jobs")
+
+    elif args.command == "work":
+        if args.processes == 1:
+            run_worker(args)
+            return
+        processes = [multiprocessing.Process(target=run_worker, args=(args,)) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+
+    elif args.command == "status":
+        for key, value in make_queue(args, db).get_status().items():
+            print(f"{key:<18} {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic PubMed corpus for scale testing.
+
+Examples:
+    # write 1M articles as PubmedArticle XML
+    python scripts/generate_corpus.py --articles 1000000 --xml corpus.xml
+
+    # bulk load 1M articles straight into a scale test database
+    python scripts/generate_corpus.py --articles 1000000 --load --database pubmed_scale
+
+    # load through the ETL parser (XML -> parse -> bulk insert)
+    python scripts/generate_corpus.py --articles 100000 --load --via-parser --database pubmed_scale
+
+    # first load into an empty database: COPY into staging, indexes built once at the end
+    python scripts/generate_corpus.py --articles 1000000 --load --initial-load --database pubmed_scale
+
+--load needs --database (a database name on the configured server, or a
+postgresql:// URL) and refuses the app's own database: synthetic articles
+do not belong next to real ones.
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PubMed corpus")
+    parser.add_argument("--articles", type=int, default=10000, help="number of articles")
+    parser.add_argument("--start", type=int, default=0, help="offset into the pmid range")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--xml", help="write PubmedArticleSet XML to this file")
+    parser.add_argument("--load", action="store_true", help="bulk insert into the --database")
+    parser.add_argument("--database", help="database name or postgresql:// URL to load into, not the app database")
+    parser.add_argument("--via-parser", action="store_true",
+                        help="round-trip each batch through XML and the ETL parser before loading")
+    parser.add_argument("--initial-load", action="store_true",
+                        help="empty database only: COPY into staging tables and build indexes after the load")
+    parser.add_argument("--batch-size", type=int, default=1000)
+
+    # distribution knobs
+    parser.add_argument("--authors-mean", type=float, default=6.0)
+    parser.add_argument("--mesh-mean", type=float, default=10.0)
+    parser.add_argument("--journals", type=int, default=2000)
+    parser.add_argument("--journal-zipf", type=float, default=1.1)
+    parser.add_argument("--abstract-words", type=int, default=220)
+    parser.add_argument("--year-start", type=int, default=1990)
+    parser.add_argument("--year-end", type=int, default=2025)
+    return parser.parse_args()
+
+def database_url(database):
+    # url of the --database to load into, None when missing or the app database
+    from sqlalchemy.engine import make_url
+    from src.config.config import DB_CONFIG
+    if not database:
+        return None
+    if '://' in database:
+        url = make_url(database)
+    else:
+        url = make_url(f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@"
+                       f"{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}")
+    app = (DB_CONFIG['host'], int(DB_CONFIG['port']), DB_CONFIG['database'])
+    if (url.host, url.port or 5432, url.database) == app:
+        return None
+    return url.render_as_string(hide_password=False)
+
+def initial_load(etl, corpus, args):
+    from src.database.bulk_load import InitialLoader
+
+    loader = InitialLoader(etl.db).begin()
+    started = time.time()
+    for offset in range(0, args.articles, args.batch_size):
+        count = min(args.batch_size, args.articles - offset)
+        batch = corpus.articles(count, args.start + offset)
+        if args.via_parser:
+            xml = "<PubmedArticleSet>" + "".join(corpus.to_xml(a) for a in batch) + "</PubmedArticleSet>"
+            batch = etl.parse_articles(xml.encode())
+        loader.add(batch)
+        elapsed = time.time() - started
+        print(f"\r{offset + count}/{args.articles} articles staged, "
+              f"{(offset + count) / elapsed:.0f} articles/s", end="", flush=True)
+
+    print("\nBuilding tables and indexes...")
+    stats = loader.finish()
+    for step, seconds in stats['seconds'].items():
+        print(f"  {step:28s} {seconds:8.2f}s")
+    print(f"✅ Loaded {stats['rows'].get('articles', 0)} articles in {time.time() - started:.1f}s")
+
+def main():
+    args = parse_args()
+    if not args.xml and not args.load:
+        print("Nothing to do: pass --xml PATH and/or --load")
+        sys.exit(1)
+    if args.load:
+        url = database_url(args.database)
+        if url is None:
+            print("--load needs --database NAME|URL, synthetic articles are not loaded into the app database")
+            sys.exit(1)
+
+    corpus = SyntheticCorpus(CorpusConfig(
+        seed=args.seed,
+        authors_mean=args.authors_mean,
+        mesh_mean=args.mesh_mean,
+        journal_count=args.journals,
+        journal_zipf=args.journal_zipf,
+        abstract_words_mean=args.abstract_words,
+        year_start=args.year_start,
+        year_end=args.year_end
+    ))
+
+    if args.xml:
+        started = time.time()
+        corpus.write_xml(args.xml, args.articles, args.start)
+        print(f"✅ Wrote {args.articles} articles to {args.xml} in {time.time() - started:.1f}s")
+
+    if args.load:
+        from src.database.database import DatabaseManager
+        from src.etl.pubmed_etl import PubMedETL
+
+        etl = PubMedETL(db=DatabaseManager(url))
+        if args.initial_load:
+            initial_load(etl, corpus, args)
+            return
+        if not etl.db.create_tables():
+            print(f"Could not set up {args.database}, does the database exist?")
+            sys.exit(1)
+        started = time.time()
+        inserted = 0
+
+        for offset in range(0, args.articles, args.batch_size):
+            count = min(args.batch_size, args.articles - offset)
+            batch = corpus.articles(count, args.start + offset)
+
+            if args.via_parser:
+                xml = "<PubmedArticleSet>" + "".join(corpus.to_xml(a) for a in batch) + "</PubmedArticleSet>"
+                batch = etl.parse_articles(xml.encode())
+
+            inserted += etl.db.insert_articles_bulk(batch)
+            elapsed = time.time() - started
+            print(f"\r{offset + count}/{args.articles} articles, {inserted} inserted, "
+                  f"{(offset + count) / elapsed:.0f} articles/s", end="", flush=True)
+
+        print(f"\n✅ Loaded {inserted} articles in {time.time() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Run the ingest daemon: keeps saved searches current with incremental refreshes.
+
+Examples:
+    python scripts/ingest_daemon.py --config src/config/ingest_searches.example.json
+    python scripts/ingest_daemon.py --once          # one tick, then exit (e.g. from cron)
+    curl http://127.0.0.1:8766/status
+"""
+
+import argparse
+import json
+import signal
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.config.config import INGEST_CONFIG, ETL_RATE_LIMIT
+from src.database.database import DatabaseManager
+from src.etl.daemon import IngestDaemon, load_search_config
+from src.etl.rate_limit import RateLimiter, SharedRateLimiter
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PubMed ingest daemon")
+    parser.add_argument("--config", default=INGEST_CONFIG, help="saved searches json")
+    parser.add_argument("--base-url", help="e-utilities base url (default PUBMED_BASE_URL)")
+    parser.add_argument("--workers", type=int, help="searches refreshed in parallel (overrides config)")
+    parser.add_argument("--tick-seconds", type=float, default=30)
+    parser.add_argument("--rate-limit", type=float, default=ETL_RATE_LIMIT, help="requests per second")
+    parser.add_argument("--shared-rate-limit", action="store_true",
+                        help="share the rate limit with etl workers through the database")
+    parser.add_argument("--status-host", default="127.0.0.1")
+    parser.add_argument("--status-port", type=int, default=8766, help="0 picks a free port, -1 disables")
+    parser.add_argument("--once", action="store_true", help="run due searches once and exit")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    searches, options = load_search_config(args.config)
+    db = DatabaseManager()
+    db.create_tables()
+
+    rate_limiter = SharedRateLimiter(db, args.rate_limit) if args.shared_rate_limit else RateLimiter(args.rate_limit)
+    daemon = IngestDaemon(
+        searches,
+        db=db,
+        base_url=args.base_url,
+        workers=args.workers or options.get('workers', 2),
+        lookback_days=options.get('lookback_days', 30),
+        rate_limiter=rate_limiter
+    )
+
+    if args.once:
+        for future in daemon.tick():
+            future.result()
+        print(json.dumps(daemon.get_status(), indent=2, default=str))
+        return
+
+    if args.status_port >= 0:
+        daemon.serve_status(args.status_host, args.status_port)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run_forever(tick_seconds=args.tick_seconds)
+    except KeyboardInterrupt:
+        daemon.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Range partitioning of the articles table by publication_year (opt in).
+
+Examples:
+    # rebuild articles as a partitioned table, one partition per year since 1950
+    python scripts/partition_articles.py convert --start-year 1950
+
+    # partitions for new years and for years that landed in the default partition
+    python scripts/partition_articles.py maintain
+
+    # detach a year as a standalone table for archiving
+    python scripts/partition_articles.py detach 1998
+
+    # partitions with estimated rows and size
+    python scripts/partition_articles.py status
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.database.db_manager import DatabaseManager
+from src.database import partitioning
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Partition articles by publication year")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="turn articles into a partitioned table")
+    convert.add_argument("--start-year", type=int, default=1950,
+                         help="older years share one partition")
+    convert.add_argument("--end-year", type=int, help="last year partition to create (default next year)")
+
+    maintain = commands.add_parser("maintain", help="add partitions for new years")
+    maintain.add_argument("--years-ahead", type=int, default=1)
+
+    detach = commands.add_parser("detach", help="detach one year into a standalone table")
+    detach.add_argument("year", type=int)
+
+    commands.add_parser("status", help="list partitions")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    db = DatabaseManager()
+    db.create_tables()
+    engine = db.engine
+
+    if args.command == "convert":
+        moved = partitioning.convert(engine, args.start_year, args.end_year)
+        print(f"✅ articles partitioned by year, {moved} rows moved")
+    elif args.command == "maintain":
+        if not partitioning.is_partitioned(engine):
+            sys.exit("articles is not partitioned, run convert first")
+        created = partitioning.maintain(engine, args.years_ahead)
+        print(f"✅ New partitions: {', '.join(map(str, created)) or 'none'}")
+    elif args.command == "detach":
+        name = partitioning.detach_year(engine, args.year)
+        print(f"✅ Detached {name}, archive it with: pg_dump -t {name} ... && DROP TABLE {name}")
+    else:
+        if not partitioning.is_partitioned(engine):
+            print("articles is not partitioned")
+            return
+        for part in partitioning.list_partitions(engine):
+            print(f"{part['name']:28s} {part['rows']:>10d} rows {part['bytes'] / 1024 / 1024:>9.1f} MB  {part['bound']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,77 @@
 #!/usr/bin/env python3
 """
 Script to run PubMed ETL with different search terms
+
+Without arguments (in a terminal) it shows the interactive menu. For cron,
+containers and large loads use the subcommands:
+
+    # one or more searches, up to 5000 articles each
+    python scripts/run_etl.py search "cancer immunotherapy" "COVID-19 vaccine" --max 5000 --progress
+
+    # many queries from a job file (one per line, or a json list)
+    python scripts/run_etl.py search --job-file queries.txt --concurrency 4 --batch-size 200
+
+    # specific pmids
+    python scripts/run_etl.py fetch 31452104 32205204
+    python scripts/run_etl.py fetch --pmids-file pmids.txt
+
+    # PubmedArticleSet XML files (e.g. from the baseline dumps)
+    python scripts/run_etl.py load-file pubmed25n0001.xml
+
+    # incremental refresh of the saved searches (one ingest daemon tick)
+    python scripts/run_etl.py refresh
+
+    # database counts
+    python scripts/run_etl.py stats
 """
 
+import argparse
+import json
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from src.config.config import ETL_RATE_LIMIT, ETL_JOB_BATCH_SIZE, INGEST_CONFIG
+from src.database.database import DatabaseManager
 from src.etl.pubmed_etl import PubMedETL
+from src.etl.rate_limit import RateLimiter
+from src.utils.metrics import RunMetrics
 
-def main():
+def interactive_menu():
     """Main function to run ETL with user-specified search terms"""
-    
+
     # Predefined search terms
     predefined_terms = {
         "1": "machine learning medicine",
-        "2": "cancer immunotherapy", 
+        "2": "cancer immunotherapy",
         "3": "COVID-19 vaccine",
         "4": "artificial intelligence healthcare",
         "5": "diabetes treatment",
         "6": "neuroscience research"
     }
-    
+
     print("🔬 PubMed ETL Data Loader")
     print("=" * 40)
     print("Choose a search term:")
-    
+
     for key, term in predefined_terms.items():
         print(f"{key}. {term}")
-    
+
     print("7. Custom search term")
     print("8. Load all predefined terms (smaller batches)")
-    
+
     choice = input("\nEnter your choice (1-8): ").strip()
-    
+
     etl = PubMedETL()
-    
+
     if choice in predefined_terms:
         search_term = predefined_terms[choice]
         print(f"\n🚀 Loading articles for: {search_term}")
         etl.process_articles(search_term, max_articles=100)
-        
+
     elif choice == "7":
         search_term = input("Enter your custom search term: ").strip()
         if search_term:
@@ -48,19 +79,343 @@ def main():
             etl.process_articles(search_term, max_articles=100)
         else:
             print("❌ No search term provided")
-            
+
     elif choice == "8":
         print("\n🚀 Loading articles for all predefined terms (20 articles each)...")
         for term in predefined_terms.values():
             print(f"\nProcessing: {term}")
             etl.process_articles(term, max_articles=20)
-            
+
     else:
         print("❌ Invalid choice")
         sys.exit(1)
-    
+
     print("\n✅ ETL process completed!")
     print("Run 'streamlit run streamlit_app.py' to explore the data")
 
+class Progress:
+    # single status line on stderr with throughput and eta
+
+    def __init__(self, enabled, total=None, label="articles"):
+        self.enabled = enabled
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.written = 0
+        self.started = time.perf_counter()
+        self._last_draw = 0.0
+
+    def update(self, done, written=0):
+        # written: new plus changed articles
+        self.done += done
+        self.written += written
+        if self.enabled and time.perf_counter() - self._last_draw >= 0.2:
+            self.draw()
+
+    def draw(self, end=""):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        line = f"\r{self.done}"
+        if self.total:
+            remaining = (self.total - self.done) / rate if rate else 0.0
+            line += f"/{self.total} {self.label} ({self.done * 100 // self.total}%) eta {remaining:.0f}s"
+        else:
+            line += f" {self.label}"
+        line += f" | {self.written} written | {rate:.1f} {self.label}/s | {elapsed:.0f}s"
+        sys.stderr.write(line + end)
+        sys.stderr.flush()
+        self._last_draw = time.perf_counter()
+
+    def finish(self):
+        if self.enabled:
+            self.draw(end="\n")
+
+class Loader:
+    # fetches pmid batches on a thread pool and bulk inserts them from the calling
+    # thread, so inserts never race each other on the author / mesh term lookups
+
+    def __init__(self, args):
+        self.args = args
+        self.metrics = RunMetrics("cli")
+        self.rate_limiter = RateLimiter(args.rate_limit)
+        self.etl = PubMedETL(base_url=args.base_url, rate_limiter=self.rate_limiter,
+                             db=DatabaseManager(args.database_url))
+        self.etl.metrics = self.metrics
+        # failed searches and stores, the run exits non-zero when there are any
+        self.errors = []
+        self._local = threading.local()
+
+    def _thread_etl(self):
+        # requests sessions are not shared between threads
+        if not hasattr(self._local, 'etl'):
+            etl = PubMedETL(base_url=self.args.base_url, rate_limiter=self.rate_limiter, db=self.etl.db)
+            etl.metrics = self.metrics
+            self._local.etl = etl
+        return self._local.etl
+
+    def _fetch(self, batch):
+        return self._thread_etl().fetch_articles_batch(batch)
+
+    def store(self, articles):
+        if self.args.dry_run:
+            return 0
+        with self.metrics.timer('db_insert'):
+            return self.etl.db.insert_articles_bulk(articles, self.metrics)
+
+    def load_pmids(self, pmids, progress):
+        size = self.args.batch_size
+        batches = [pmids[i:i + size] for i in range(0, len(pmids), size)]
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            futures = {pool.submit(self._fetch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                articles = future.result()
+                if articles is None:
+                    self.metrics.incr('articles_failed', len(futures[future]))
+                    progress.update(len(futures[future]))
+                    continue
+                try:
+                    count = self.store(articles)
+                except Exception:
+                    # leaving the with block waits for every queued efetch,
+                    # whose articles could not be stored anyway
+                    pool.shutdown(cancel_futures=True)
+                    raise
+                written += count
+                self.metrics.incr('articles_processed', len(articles))
+                progress.update(len(futures[future]), count)
+        return written
+
+    def load_articles(self, articles, progress):
+        # articles is an iterator of parsed dicts, stored in batches
+        written = 0
+        batch = []
+        for article in articles:
+            batch.append(article)
+            if len(batch) >= self.args.batch_size:
+                written += self._store_batch(batch, progress)
+                batch = []
+        if batch:
+            written += self._store_batch(batch, progress)
+        return written
+
+    def _store_batch(self, batch, progress):
+        count = self.store(batch)
+        self.metrics.incr('articles_processed', len(batch))
+        progress.update(len(batch), count)
+        return count
+
+    def written_summary(self):
+        # insert_articles_bulk counts new and changed articles apart in the metrics
+        if self.args.dry_run:
+            return "dry run, nothing written"
+        inserted = self.metrics.counters.get('articles_inserted', 0)
+        updated = self.metrics.counters.get('articles_updated', 0)
+        return f"{inserted} new and {updated} updated articles written"
+
+    def failed(self, message):
+        self.errors.append(message)
+        print(message)
+
+    def exit_code(self):
+        # searches, fetches and stores that failed, nothing left out silently
+        return 1 if self.errors or self.metrics.counters.get('articles_failed') else 0
+
+    def report(self, **extra):
+        if self.errors:
+            extra['errors'] = self.errors
+        if not self.args.dry_run:
+            extra['report_path'] = self.metrics.write_report(**extra)
+        print(self.metrics.format_summary())
+        if extra.get('report_path'):
+            print(f"Run report written to {extra['report_path']}")
+
+def read_job_file(path, default_max):
+    # plain text: one query per line, optional "<tab>max"; or a json list of
+    # strings / {"term": ..., "max": ...} objects. returns [(term, max)]
+    with open(path) as f:
+        content = f.read()
+    if path.endswith('.json'):
+        jobs = []
+        for entry in json.loads(content):
+            if isinstance(entry, str):
+                jobs.append((entry, default_max))
+            else:
+                jobs.append((entry['term'], entry.get('max', default_max)))
+        return jobs
+
+    jobs = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        term, _, max_articles = line.partition('\t')
+        jobs.append((term.strip(), int(max_articles) if max_articles.strip() else default_max))
+    return jobs
+
+def read_pmids_file(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+def cmd_search(args):
+    jobs = [(term, args.max) for term in args.terms]
+    if args.job_file:
+        jobs += read_job_file(args.job_file, args.max)
+    if not jobs:
+        print("Nothing to search: pass terms or --job-file PATH")
+        return 1
+
+    loader = Loader(args)
+    if not args.dry_run:
+        loader.etl.db.create_tables()
+
+    for term, max_articles in jobs:
+        # esearch is paged, only PubMed's 10,000 id limit or --max leave matches out
+        try:
+            with loader.metrics.timer('esearch_total'):
+                pmids, count = loader.etl.esearch_with_count(term, max_articles)
+        except Exception as e:
+            loader.failed(f"{term}: search failed: {str(e)}")
+            continue
+        print(f"{term}: {len(pmids)} articles" + (f" of {count} matches" if count > len(pmids) else ""))
+        progress = Progress(args.progress, total=len(pmids))
+        try:
+            loader.load_pmids(pmids, progress)
+        except Exception as e:
+            # the database is gone or broken, the other queries would fail the same way
+            progress.finish()
+            loader.failed(f"{term}: store failed: {str(e)}")
+            break
+        progress.finish()
+
+    print(loader.written_summary().capitalize())
+    loader.report(command="search", queries=[term for term, _ in jobs])
+    return loader.exit_code()
+
+def cmd_fetch(args):
+    pmids = list(args.pmids)
+    if args.pmids_file:
+        pmids += read_pmids_file(args.pmids_file)
+    if not pmids:
+        print("Nothing to fetch: pass pmids or --pmids-file PATH")
+        return 1
+
+    loader = Loader(args)
+    if not args.dry_run:
+        loader.etl.db.create_tables()
+    progress = Progress(args.progress, total=len(pmids))
+    try:
+        loader.load_pmids(pmids, progress)
+    except Exception as e:
+        loader.failed(f"store failed: {str(e)}")
+    progress.finish()
+    print(f"Fetched {len(pmids)} pmids, {loader.written_summary()}")
+    loader.report(command="fetch", pmids=len(pmids))
+    return loader.exit_code()
+
+def cmd_load_file(args):
+    loader = Loader(args)
+    if not args.dry_run:
+        loader.etl.db.create_tables()
+    for path in args.paths:
+        progress = Progress(args.progress)
+        try:
+            with loader.metrics.timer('load_file'):
+                loader.load_articles(loader.etl.iter_xml_file(path), progress)
+        except Exception as e:
+            progress.finish()
+            loader.failed(f"{path}: load failed: {str(e)}")
+            break
+        progress.finish()
+        print(f"{path}: {progress.done} articles, {progress.written} new or updated")
+    print(loader.written_summary().capitalize())
+    loader.report(command="load-file", files=args.paths)
+    return loader.exit_code()
+
+def cmd_refresh(args):
+    # the daemon brings the models and its http server, only refresh needs them
+    from src.etl.daemon import IngestDaemon, load_search_config
+    searches, options = load_search_config(args.config)
+    if args.dry_run:
+        for search in searches:
+            print(f"{search.name}: {search.term} every {search.interval}")
+        return 0
+
+    daemon = IngestDaemon(
+        searches,
+        db=DatabaseManager(args.database_url),
+        base_url=args.base_url,
+        workers=args.concurrency,
+        lookback_days=options.get('lookback_days', 30),
+        batch_size=args.batch_size,
+        rate_limiter=RateLimiter(args.rate_limit)
+    )
+    daemon.db.create_tables()
+    for future in daemon.tick():
+        future.result()
+    code = 0
+    for search in daemon.get_status()['searches']:
+        result = search['last_result'] or {}
+        print(f"{search['name']}: {result.get('status', 'not due')} "
+              f"found={result.get('found', '-')} written={result.get('inserted', '-')}")
+        if result.get('status') == 'error':
+            code = 1
+    return code
+
+def cmd_stats(args):
+    stats = DatabaseManager().get_article_stats()
+    for key, value in stats.items():
+        print(f"{key:<18} {value}")
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PubMed ETL loader")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--concurrency", type=int, default=4, help="parallel efetch requests")
+    common.add_argument("--batch-size", type=int, default=ETL_JOB_BATCH_SIZE, help="pmids per efetch / insert")
+    common.add_argument("--rate-limit", type=float, default=ETL_RATE_LIMIT, help="max requests per second")
+    common.add_argument("--dry-run", action="store_true", help="fetch and parse but do not write to the database")
+    common.add_argument("--progress", action="store_true", help="show a throughput line on stderr")
+    common.add_argument("--base-url", help="e-utilities base url (default PUBMED_BASE_URL)")
+    common.add_argument("--database-url", help="postgresql:// url to load into (default the configured database)")
+
+    commands = parser.add_subparsers(dest="command")
+
+    search = commands.add_parser("search", parents=[common], help="search and load articles")
+    search.add_argument("terms", nargs="*", help="search terms")
+    search.add_argument("--max", type=int, default=1000, help="max articles per query")
+    search.add_argument("--job-file", help="file of queries, one per line or a json list")
+    search.set_defaults(func=cmd_search)
+
+    fetch = commands.add_parser("fetch", parents=[common], help="load specific pmids")
+    fetch.add_argument("pmids", nargs="*")
+    fetch.add_argument("--pmids-file", help="file with one pmid per line")
+    fetch.set_defaults(func=cmd_fetch)
+
+    load_file = commands.add_parser("load-file", parents=[common], help="load PubmedArticleSet XML files")
+    load_file.add_argument("paths", nargs="+")
+    load_file.set_defaults(func=cmd_load_file)
+
+    refresh = commands.add_parser("refresh", parents=[common], help="incremental refresh of saved searches")
+    refresh.add_argument("--config", default=INGEST_CONFIG, help="saved searches json")
+    refresh.set_defaults(func=cmd_refresh)
+
+    stats = commands.add_parser("stats", help="show database counts")
+    stats.set_defaults(func=cmd_stats)
+
+    return parser, parser.parse_args(argv)
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    if args.command is None:
+        # old behaviour for people running it by hand
+        if sys.stdin.isatty():
+            interactive_menu()
+            return 0
+        parser.print_help()
+        return 1
+    return args.func(args)
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
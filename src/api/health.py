@@ -4,7 +4,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.config.config import DB_CONFIG, GEMINI_API_KEY
+from src.config.config import DB_CONFIG, DB_READ_URL, GEMINI_API_KEY, PUBMED_BASE_URL
 from src.utils.logger import get_logger
 
 logger = get_logger("health")
@@ -12,12 +12,19 @@ logger = get_logger("health")
 class HealthChecker:
     # check if everything is working
     
-    def __init__(self):
+    def __init__(self, pubmed_base_url=None):
+        # pubmed endpoint, can be a local stand-in server
+        self.pubmed_base_url = pubmed_base_url or PUBMED_BASE_URL
+        if not self.pubmed_base_url.endswith('/'):
+            self.pubmed_base_url += '/'
+        
         self.checks = {
             'database': self.check_database,
             'pubmed_api': self.check_pubmed_api,
             'gemini_api': self.check_gemini_api
         }
+        if DB_READ_URL:
+            self.checks['read_replica'] = self.check_read_replica
     
     def check_database(self):
         # test database connection
@@ -32,10 +39,26 @@ class HealthChecker:
             logger.error(f"Database health check failed: {e}")
             return {"status": "unhealthy", "message": f"Database connection failed: {str(e)}"}
     
+    def check_read_replica(self):
+        # replica reachable and within DB_READ_MAX_LAG_SECONDS
+        from src.database.db_manager import DatabaseManager
+        db = DatabaseManager()
+        try:
+            status = db.get_replica_status()
+        finally:
+            db.engine.dispose()
+            db.read_engine.dispose()
+        if status['lag_seconds'] is None:
+            return {"status": "warning", "message": "Read replica unreachable, reads use the primary"}
+        if not status['serving_reads']:
+            return {"status": "warning",
+                    "message": f"Read replica lags {status['lag_seconds']:.1f}s, reads use the primary"}
+        return {"status": "healthy", "message": f"Read replica lag {status['lag_seconds']:.1f}s"}
+    
     def check_pubmed_api(self):
         # test pubmed api
         try:
-            response = requests.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi", 
+            response = requests.get(f"{self.pubmed_base_url}esearch.fcgi", 
                                   params={'db': 'pubmed', 'term': 'test', 'retmax': 1}, 
                                   timeout=10)
             if response.status_code == 200:
@@ -47,19 +70,23 @@ class HealthChecker:
             return {"status": "unhealthy", "message": f"PubMed API check failed: {str(e)}"}
     
     def check_gemini_api(self):
-        # test gemini api
+        # cached model availability (src/qa/model_status.py), only the first
+        # check of a process waits for the probe
         if not GEMINI_API_KEY:
             return {"status": "warning", "message": "Gemini API key not configured"}
         
-        try:
-            import google.generativeai as genai
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = model.generate_content("test")
-            return {"status": "healthy", "message": "Gemini API accessible"}
-        except Exception as e:
-            logger.error(f"Gemini API health check failed: {e}")
-            return {"status": "unhealthy", "message": f"Gemini API check failed: {str(e)}"}
+        from src.qa.model_status import get_model_status, AVAILABLE, CHECKING
+        model_status = get_model_status()
+        status = model_status.status()
+        if status['state'] == CHECKING:
+            status = model_status.refresh(wait=10)
+        
+        if status['state'] == AVAILABLE:
+            return {"status": "healthy", "message": f"Gemini API accessible ({status['message']})"}
+        if status['state'] == CHECKING:
+            return {"status": "warning", "message": "Gemini API check still running"}
+        logger.error(f"Gemini API health check failed: {status['message']}")
+        return {"status": "unhealthy", "message": f"Gemini API check failed: {status['message']}"}
     
     def run_all_checks(self):
         # run all checks
@@ -77,7 +104,16 @@ class HealthChecker:
         
         return {
             "overall_status": overall_status,
-            "checks": results
+            "checks": results,
+            "query_stats": self.get_query_stats()
+        }
+    
+    def get_query_stats(self, limit=10):
+        # hottest queries seen by this process
+        from src.database.instrumentation import query_stats
+        return {
+            "summary": query_stats.summary(),
+            "top_queries": query_stats.top(limit)
         }
 
 def get_health_status():
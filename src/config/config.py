@@ -1,7 +1,16 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+_env_loaded = False
+
+def load_env():
+    # read .env once per process, config.py and settings.py both need it
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+load_env()
 
 # database settings
 DB_CONFIG = {
@@ -12,10 +21,96 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', '')
 }
 
+# optional read replica (full sqlalchemy url) for dashboard and Q&A reads,
+# reads go back to the primary when it lags more than DB_READ_MAX_LAG_SECONDS
+DB_READ_URL = os.getenv('DB_READ_URL') or None
+DB_READ_MAX_LAG_SECONDS = float(os.getenv('DB_READ_MAX_LAG_SECONDS', '30'))
+
 # gemini model settings
 GEMINI_API_KEY = os.getenv('GEMINI_API')
 GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'gemini-2.0-flash')
+# model availability is probed in the background (src/qa/model_status.py) and
+# cached this long, failures are re-probed sooner
+GEMINI_STATUS_TTL_SECONDS = float(os.getenv('GEMINI_STATUS_TTL_SECONDS', '300'))
+GEMINI_STATUS_RETRY_SECONDS = float(os.getenv('GEMINI_STATUS_RETRY_SECONDS', '30'))
+
+# answers from abstracts in the Q&A tab (src/qa/retrieval.py): top k of the
+# newest RETRIEVAL_CANDIDATES full-text matches, packed into RETRIEVAL_TOKEN_BUDGET
+# tokens with each abstract cut to RETRIEVAL_ABSTRACT_TOKENS. strategy truncate
+# drops what does not fit, map_reduce summarizes up to RETRIEVAL_MAX_CHUNKS chunks
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', '8'))
+RETRIEVAL_CANDIDATES = int(os.getenv('RETRIEVAL_CANDIDATES', '200'))
+RETRIEVAL_TOKEN_BUDGET = int(os.getenv('RETRIEVAL_TOKEN_BUDGET', '3000'))
+RETRIEVAL_ABSTRACT_TOKENS = int(os.getenv('RETRIEVAL_ABSTRACT_TOKENS', '400'))
+RETRIEVAL_STRATEGY = os.getenv('RETRIEVAL_STRATEGY', 'truncate')
+RETRIEVAL_MAX_CHUNKS = int(os.getenv('RETRIEVAL_MAX_CHUNKS', '3'))
+
+# LLM provider for the Q&A question -> SQL path (src/qa/providers.py):
+# gemini, or stub for offline testing and load tests
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '30'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv('LLM_RETRY_BACKOFF_SECONDS', '1'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+LLM_STUB_LATENCY_MS = float(os.getenv('LLM_STUB_LATENCY_MS', '200'))
+LLM_STUB_JITTER_MS = float(os.getenv('LLM_STUB_JITTER_MS', '0'))
+LLM_STUB_ANSWERS = os.getenv('LLM_STUB_ANSWERS', '')
 
 # pubmed api settings
-PUBMED_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+# can point at a local stand-in server (see src/etl/eutils_server.py)
+PUBMED_BASE_URL = os.getenv('PUBMED_BASE_URL', "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/")
 MAX_ARTICLES = 150
+# ids per esearch request, larger searches are paged with retstart (NCBI allows up to 10000)
+ESEARCH_PAGE_SIZE = int(os.getenv('ESEARCH_PAGE_SIZE', '5000'))
+# NCBI allows 3 requests/second without an API key (10 with one), shared by all workers
+NCBI_API_KEY = os.getenv('NCBI_API_KEY')
+ETL_RATE_LIMIT = float(os.getenv('ETL_RATE_LIMIT', '10' if NCBI_API_KEY else '3'))
+
+# query instrumentation, statements slower than this go to the slow query log
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '500'))
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+# EXPLAIN ANALYZE runs the slow query a second time, only turn on while investigating
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv('SLOW_QUERY_EXPLAIN_ANALYZE', 'false').lower() == 'true'
+
+# query governor for AI generated and manual SQL (src/database/query_governor.py):
+# plans above these planner estimates are rejected, results are capped at
+# QUERY_ROW_LIMIT rows and every statement is cancelled after QUERY_TIMEOUT_MS
+QUERY_MAX_COST = float(os.getenv('QUERY_MAX_COST', '200000'))
+QUERY_MAX_ROWS = int(os.getenv('QUERY_MAX_ROWS', '1000000'))
+QUERY_ROW_LIMIT = int(os.getenv('QUERY_ROW_LIMIT', '1000'))
+QUERY_TIMEOUT_MS = int(os.getenv('QUERY_TIMEOUT_MS', '5000'))
+
+# cache of generated Q&A SQL (src/qa/sql_cache.py), entries expire after
+# QA_CACHE_TTL_HOURS and the least recently used go past QA_CACHE_MAX_ENTRIES
+QA_CACHE_TTL_HOURS = float(os.getenv('QA_CACHE_TTL_HOURS', '168'))
+QA_CACHE_MAX_ENTRIES = int(os.getenv('QA_CACHE_MAX_ENTRIES', '1000'))
+QA_CACHE_MEMORY_ENTRIES = int(os.getenv('QA_CACHE_MEMORY_ENTRIES', '256'))
+# few-shot examples per Q&A prompt, picked from verified cache entries that
+# are reloaded every QA_EXAMPLES_REFRESH_SECONDS (src/qa/prompt_builder.py)
+QA_FEW_SHOT_EXAMPLES = int(os.getenv('QA_FEW_SHOT_EXAMPLES', '3'))
+QA_EXAMPLES_REFRESH_SECONDS = float(os.getenv('QA_EXAMPLES_REFRESH_SECONDS', '60'))
+
+# sidebar statistics and filter options of the dashboard are cached for this
+# long instead of queried on every rerun (src/ui/streamlit_app.py)
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv('DASHBOARD_CACHE_TTL_SECONDS', '60'))
+
+# on-demand profiling, comma separated modes: cprofile, sample, tracemalloc
+# (see src/utils/profiling.py), profiles are written to PROFILE_DIR
+PROFILE = os.getenv('PROFILE', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'logs')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+
+# logging, records are written by a background thread unless LOG_ASYNC is false
+LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() == 'true'
+LOG_JSON = os.getenv('LOG_JSON', 'false').lower() == 'true'
+# per-article progress lines are logged once every N articles / seconds
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', '50'))
+LOG_SAMPLE_INTERVAL = float(os.getenv('LOG_SAMPLE_INTERVAL', '5'))
+
+# distributed work queue (src/etl/work_queue.py)
+ETL_JOB_BATCH_SIZE = int(os.getenv('ETL_JOB_BATCH_SIZE', '200'))
+ETL_LEASE_SECONDS = int(os.getenv('ETL_LEASE_SECONDS', '300'))
+ETL_MAX_ATTEMPTS = int(os.getenv('ETL_MAX_ATTEMPTS', '3'))
+
+# saved searches for the ingest daemon (src/etl/daemon.py)
+INGEST_CONFIG = os.getenv('INGEST_CONFIG', 'src/config/ingest_searches.example.json')
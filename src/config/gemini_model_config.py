@@ -3,7 +3,11 @@ Configuration helper for Google Gemini AI integration
 """
 
 import os
-import google.generativeai as genai
+
+def _genai():
+    # google.generativeai takes a while to import, only pay for it when the model is used
+    import google.generativeai as genai
+    return genai
 
 class GeminiModelConfig:
     """Helper class to configure Google Gemini AI client"""
@@ -17,9 +21,25 @@ class GeminiModelConfig:
         if not self.api_key:
             raise ValueError("Gemini API key not found. Set GEMINI_API environment variable.")
         
+        genai = _genai()
         genai.configure(api_key=self.api_key)
         return genai.GenerativeModel(self.model_name)
     
+    def check_model(self, timeout=10):
+        """Look up the model's metadata, a cheap check that needs no generation call"""
+        if not self.api_key:
+            return False, "Gemini API key not found. Set GEMINI_API environment variable."
+        try:
+            genai = _genai()
+            genai.configure(api_key=self.api_key)
+            name = self.model_name if self.model_name.startswith('models/') else f"models/{self.model_name}"
+            model = genai.get_model(name, request_options={'timeout': timeout})
+            if 'generateContent' not in (model.supported_generation_methods or []):
+                return False, f"{self.model_name} does not support generateContent"
+            return True, model.display_name or self.model_name
+        except Exception as e:
+            return False, str(e)
+    
     def test_connection(self):
         """Test if the Gemini model connection is working"""
         try:
@@ -1,9 +1,10 @@
 import os
+import threading
+from typing import Optional
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
 
-load_dotenv()
+from .config import load_env
 
 class DatabaseSettings(BaseSettings):
     # database config
@@ -12,27 +13,79 @@ class DatabaseSettings(BaseSettings):
     database: str = Field(default="pubmed_db", env="DB_NAME")
     user: str = Field(default="postgres", env="DB_USER")
     password: str = Field(default="", env="DB_PASSWORD")
+    read_url: Optional[str] = Field(default=None, env="DB_READ_URL")
+    read_max_lag_seconds: float = Field(default=30, env="DB_READ_MAX_LAG_SECONDS")
     
     @validator('port')
     def port_must_be_valid(cls, v):
         if not 1 <= v <= 65535:
             raise ValueError('Port must be between 1 and 65535')
         return v
+    
+    @validator('read_url')
+    def read_url_validation(cls, v):
+        if v and not v.startswith('postgresql'):
+            raise ValueError('Read replica URL must be a postgresql:// URL')
+        return v or None
+    
+    @validator('read_max_lag_seconds')
+    def read_max_lag_validation(cls, v):
+        if v < 0:
+            raise ValueError('Max replica lag cannot be negative')
+        return v
 
 class GeminiSettings(BaseSettings):
     # gemini ai config
     api_key: str = Field(default=None, env="GEMINI_API")
     model_name: str = Field(default="gemini-2.0-flash", env="GEMINI_MODEL_NAME")
+    status_ttl_seconds: float = Field(default=300, env="GEMINI_STATUS_TTL_SECONDS")
+    status_retry_seconds: float = Field(default=30, env="GEMINI_STATUS_RETRY_SECONDS")
     
     @validator('api_key')
     def api_key_validation(cls, v):
         if v and len(v) < 10:
             raise ValueError('API key seems too short')
         return v
+    
+    @validator('status_ttl_seconds', 'status_retry_seconds')
+    def status_ttl_validation(cls, v):
+        if v <= 0:
+            raise ValueError('Model status intervals must be positive')
+        return v
+
+class LLMSettings(BaseSettings):
+    # provider for the Q&A question -> SQL path
+    provider: str = Field(default="gemini", env="LLM_PROVIDER")
+    timeout_seconds: float = Field(default=30, env="LLM_TIMEOUT_SECONDS")
+    max_retries: int = Field(default=2, env="LLM_MAX_RETRIES")
+    retry_backoff_seconds: float = Field(default=1, env="LLM_RETRY_BACKOFF_SECONDS")
+    max_concurrency: int = Field(default=4, env="LLM_MAX_CONCURRENCY")
+    stub_latency_ms: float = Field(default=200, env="LLM_STUB_LATENCY_MS")
+    stub_jitter_ms: float = Field(default=0, env="LLM_STUB_JITTER_MS")
+    stub_answers: str = Field(default="", env="LLM_STUB_ANSWERS")
+    
+    @validator('provider')
+    def provider_validation(cls, v):
+        valid_providers = ['gemini', 'stub']
+        if v.lower() not in valid_providers:
+            raise ValueError(f'LLM provider must be one of: {valid_providers}')
+        return v.lower()
+    
+    @validator('timeout_seconds', 'max_concurrency')
+    def positive_validation(cls, v):
+        if v <= 0:
+            raise ValueError('LLM timeout and concurrency must be positive')
+        return v
+    
+    @validator('max_retries', 'retry_backoff_seconds', 'stub_latency_ms', 'stub_jitter_ms')
+    def non_negative_validation(cls, v):
+        if v < 0:
+            raise ValueError('LLM retries, backoff and stub latency cannot be negative')
+        return v
 
 class PubMedSettings(BaseSettings):
     # pubmed api config
-    base_url: str = Field(default="https://eutils.ncbi.nlm.nih.gov/entrez/eutils/")
+    base_url: str = Field(default="https://eutils.ncbi.nlm.nih.gov/entrez/eutils/", env="PUBMED_BASE_URL")
     max_articles: int = Field(default=150, env="MAX_ARTICLES")
     request_delay: float = Field(default=0.5, env="REQUEST_DELAY")
     
@@ -48,6 +101,32 @@ class AppSettings(BaseSettings):
     # app settings
     debug: bool = Field(default=False, env="DEBUG")
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_async: bool = Field(default=True, env="LOG_ASYNC")
+    log_json: bool = Field(default=False, env="LOG_JSON")
+    log_sample_every: int = Field(default=50, env="LOG_SAMPLE_EVERY")
+    log_sample_interval: float = Field(default=5, env="LOG_SAMPLE_INTERVAL")
+    slow_query_ms: float = Field(default=500, env="SLOW_QUERY_MS")
+    slow_query_explain: bool = Field(default=True, env="SLOW_QUERY_EXPLAIN")
+    slow_query_explain_analyze: bool = Field(default=False, env="SLOW_QUERY_EXPLAIN_ANALYZE")
+    query_max_cost: float = Field(default=200000, env="QUERY_MAX_COST")
+    query_max_rows: int = Field(default=1000000, env="QUERY_MAX_ROWS")
+    query_row_limit: int = Field(default=1000, env="QUERY_ROW_LIMIT")
+    query_timeout_ms: int = Field(default=5000, env="QUERY_TIMEOUT_MS")
+    qa_cache_ttl_hours: float = Field(default=168, env="QA_CACHE_TTL_HOURS")
+    qa_cache_max_entries: int = Field(default=1000, env="QA_CACHE_MAX_ENTRIES")
+    qa_cache_memory_entries: int = Field(default=256, env="QA_CACHE_MEMORY_ENTRIES")
+    qa_few_shot_examples: int = Field(default=3, env="QA_FEW_SHOT_EXAMPLES")
+    qa_examples_refresh_seconds: float = Field(default=60, env="QA_EXAMPLES_REFRESH_SECONDS")
+    retrieval_top_k: int = Field(default=8, env="RETRIEVAL_TOP_K")
+    retrieval_candidates: int = Field(default=200, env="RETRIEVAL_CANDIDATES")
+    retrieval_token_budget: int = Field(default=3000, env="RETRIEVAL_TOKEN_BUDGET")
+    retrieval_abstract_tokens: int = Field(default=400, env="RETRIEVAL_ABSTRACT_TOKENS")
+    retrieval_strategy: str = Field(default="truncate", env="RETRIEVAL_STRATEGY")
+    retrieval_max_chunks: int = Field(default=3, env="RETRIEVAL_MAX_CHUNKS")
+    dashboard_cache_ttl_seconds: float = Field(default=60, env="DASHBOARD_CACHE_TTL_SECONDS")
+    profile: str = Field(default="", env="PROFILE")
+    profile_dir: str = Field(default="logs", env="PROFILE_DIR")
+    profile_sample_interval_ms: float = Field(default=5, env="PROFILE_SAMPLE_INTERVAL_MS")
     
     @validator('log_level')
     def log_level_validation(cls, v):
@@ -55,6 +134,53 @@ class AppSettings(BaseSettings):
         if v.upper() not in valid_levels:
             raise ValueError(f'Log level must be one of: {valid_levels}')
         return v.upper()
+    
+    @validator('query_max_cost', 'query_max_rows', 'query_row_limit', 'query_timeout_ms')
+    def query_limit_validation(cls, v):
+        if v <= 0:
+            raise ValueError('Query governor limits must be positive')
+        return v
+    
+    @validator('qa_cache_ttl_hours', 'qa_cache_max_entries', 'qa_cache_memory_entries', 'qa_examples_refresh_seconds')
+    def qa_cache_validation(cls, v):
+        if v <= 0:
+            raise ValueError('Q&A cache limits must be positive')
+        return v
+    
+    @validator('retrieval_top_k', 'retrieval_candidates', 'retrieval_token_budget',
+               'retrieval_abstract_tokens', 'retrieval_max_chunks')
+    def retrieval_limit_validation(cls, v):
+        if v <= 0:
+            raise ValueError('Retrieval limits must be positive')
+        return v
+    
+    @validator('retrieval_strategy')
+    def retrieval_strategy_validation(cls, v):
+        valid_strategies = ['truncate', 'map_reduce']
+        if v not in valid_strategies:
+            raise ValueError(f'Retrieval strategy must be one of: {valid_strategies}')
+        return v
+    
+    @validator('dashboard_cache_ttl_seconds')
+    def dashboard_cache_validation(cls, v):
+        if v <= 0:
+            raise ValueError('Dashboard cache TTL must be positive')
+        return v
+    
+    @validator('qa_few_shot_examples')
+    def few_shot_validation(cls, v):
+        if v < 0:
+            raise ValueError('Few-shot examples cannot be negative')
+        return v
+    
+    @validator('profile')
+    def profile_validation(cls, v):
+        valid_modes = ['cprofile', 'sample', 'tracemalloc']
+        modes = [mode.strip().lower() for mode in v.split(',') if mode.strip()]
+        for mode in modes:
+            if mode not in valid_modes:
+                raise ValueError(f'Profile modes must be in: {valid_modes}')
+        return ','.join(modes)
 
 class Settings:
     # main settings class
@@ -63,6 +189,7 @@ class Settings:
         try:
             self.database = DatabaseSettings()
             self.gemini = GeminiSettings()
+            self.llm = LLMSettings()
             self.pubmed = PubMedSettings()
             self.app = AppSettings()
         except Exception as e:
@@ -77,4 +204,20 @@ class Settings:
             print(f"Settings validation failed: {e}")
             return False
 
-settings = Settings()
+_settings = None
+_settings_lock = threading.Lock()
+
+def get_settings():
+    # validated settings, built on first use instead of on import
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            load_env()
+            _settings = Settings()
+        return _settings
+
+def __getattr__(name):
+    # keeps `from src.config.settings import settings` working
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
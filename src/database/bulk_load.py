@@ -0,0 +1,255 @@
+"""
+Initial load mode for empty databases.
+
+Article dicts are streamed with COPY into UNLOGGED staging tables. finish()
+then, in one transaction, drops the indexes and constraints of the target
+tables, fills them with set based INSERT ... SELECT statements (journals,
+authors and mesh terms deduplicated with GROUP BY / DISTINCT ON instead of
+per-row lookups), rebuilds the indexes and constraints and runs ANALYZE.
+If anything fails the transaction rolls back and the schema is unchanged.
+
+Only for empty target tables, incremental loads go through
+DatabaseManager.insert_articles_bulk.
+"""
+
+import io
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.logger import get_logger
+from .db_manager import compute_article_hash
+
+logger = get_logger("database")
+
+TARGET_TABLES = ['journals', 'authors', 'mesh_terms', 'articles', 'article_authors', 'article_mesh_terms']
+
+STAGING_TABLES = {
+    'stage_articles': """
+        CREATE UNLOGGED TABLE IF NOT EXISTS stage_articles (
+            pmid integer, title text, abstract text, publication_year integer,
+            journal_title text, journal_issn text, content_hash text
+        )""",
+    'stage_article_authors': """
+        CREATE UNLOGGED TABLE IF NOT EXISTS stage_article_authors (
+            article_pmid integer, position integer, last_name text,
+            first_name text, middle_name text, full_name text
+        )""",
+    'stage_article_mesh': """
+        CREATE UNLOGGED TABLE IF NOT EXISTS stage_article_mesh (
+            article_pmid integer, term text
+        )""",
+}
+
+# staging -> target, in foreign key order
+LOAD_STATEMENTS = [
+    ('journals', """
+        INSERT INTO journals (title, issn, created_at)
+        SELECT journal_title, min(journal_issn), now()
+        FROM stage_articles
+        GROUP BY journal_title"""),
+    ('authors', """
+        INSERT INTO authors (last_name, first_name, middle_name, full_name, created_at)
+        SELECT DISTINCT ON (last_name, first_name) last_name, first_name, middle_name, full_name, now()
+        FROM stage_article_authors
+        ORDER BY last_name, first_name, article_pmid, position"""),
+    ('mesh_terms', """
+        INSERT INTO mesh_terms (term, created_at)
+        SELECT DISTINCT term, now()
+        FROM stage_article_mesh"""),
+    ('articles', """
+        INSERT INTO articles (pmid, title, abstract, publication_year, journal_id, content_hash, created_at)
+        SELECT DISTINCT ON (s.pmid) s.pmid, s.title, s.abstract, s.publication_year, j.id, s.content_hash, now()
+        FROM stage_articles s
+        JOIN journals j ON j.title = s.journal_title
+        ORDER BY s.pmid"""),
+    ('article_authors', """
+        INSERT INTO article_authors (article_pmid, author_id)
+        SELECT DISTINCT s.article_pmid, a.id
+        FROM stage_article_authors s
+        JOIN authors a ON a.last_name = s.last_name AND a.first_name = s.first_name"""),
+    ('article_mesh_terms', """
+        INSERT INTO article_mesh_terms (article_pmid, mesh_term_id)
+        SELECT DISTINCT s.article_pmid, m.id
+        FROM stage_article_mesh s
+        JOIN mesh_terms m ON m.term = s.term"""),
+]
+
+def _copy_value(value):
+    # COPY text format field
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def _copy_rows(cursor, table, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} FROM STDIN", buffer)
+
+class InitialLoader:
+    # usage: loader.begin(); loader.add(batch) ...; stats = loader.finish()
+
+    def __init__(self, db, maintenance_work_mem='512MB'):
+        self.db = db
+        self.engine = db.engine
+        self.maintenance_work_mem = maintenance_work_mem
+        self.staged = 0
+        self.timings = {}
+
+    def _raw_connection(self):
+        return self.engine.raw_connection()
+
+    def _check_empty(self, cursor):
+        for table in TARGET_TABLES:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+            if cursor.fetchone()[0]:
+                raise ValueError(f"Initial load needs empty tables, {table} has rows "
+                                 f"(use insert_articles_bulk for incremental loads)")
+
+    def begin(self):
+        # create schema and empty staging tables
+        self.db.create_tables()
+        conn = self._raw_connection()
+        try:
+            cursor = conn.cursor()
+            self._check_empty(cursor)
+            for table, ddl in STAGING_TABLES.items():
+                cursor.execute(ddl)
+                cursor.execute(f"TRUNCATE {table}")
+            conn.commit()
+        finally:
+            conn.close()
+        self.staged = 0
+        logger.info("Initial load: staging tables ready")
+        return self
+
+    def add(self, articles):
+        # COPY a batch of article dicts into staging, returns rows staged
+        article_rows = []
+        author_rows = []
+        mesh_rows = []
+        for data in articles:
+            pmid = int(data['pmid'])
+            article_rows.append((
+                pmid, data['title'], data.get('abstract'), data.get('publication_year'),
+                data.get('journal_title') or '', data.get('journal_issn'), compute_article_hash(data)
+            ))
+            for position, author in enumerate(data.get('authors', [])):
+                author_rows.append((
+                    pmid, position, author.get('last_name') or '', author.get('first_name') or '',
+                    author.get('middle_name') or '', author.get('full_name') or ''
+                ))
+            for term in data.get('mesh_terms', []):
+                mesh_rows.append((pmid, term))
+
+        started = time.perf_counter()
+        conn = self._raw_connection()
+        try:
+            cursor = conn.cursor()
+            _copy_rows(cursor, 'stage_articles', article_rows)
+            _copy_rows(cursor, 'stage_article_authors', author_rows)
+            _copy_rows(cursor, 'stage_article_mesh', mesh_rows)
+            conn.commit()
+        finally:
+            conn.close()
+        self.timings['copy'] = self.timings.get('copy', 0.0) + time.perf_counter() - started
+        self.staged += len(article_rows)
+        return len(article_rows)
+
+    def _capture_schema(self, cursor):
+        # constraints and standalone indexes of the target tables, plus foreign
+        # keys elsewhere that point at them, as statements to recreate them
+        cursor.execute("""
+            SELECT c.conname, c.conrelid::regclass::text, c.contype, pg_get_constraintdef(c.oid)
+            FROM pg_constraint c
+            WHERE c.contype IN ('p', 'u', 'f') AND c.conparentid = 0
+              AND (c.conrelid::regclass::text = ANY(%s) OR c.confrelid::regclass::text = ANY(%s))
+        """, (TARGET_TABLES, TARGET_TABLES))
+        constraints = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT i.indexname, i.tablename, i.indexdef
+            FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = ANY(%s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c
+                  WHERE c.conindid = (quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass
+              )
+        """, (TARGET_TABLES,))
+        indexes = cursor.fetchall()
+        return constraints, indexes
+
+    def finish(self, analyze=True, drop_staging=True):
+        # move staged rows into the target tables with indexes deferred
+        timings = {}
+        conn = self._raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SET LOCAL maintenance_work_mem = '{self.maintenance_work_mem}'")
+            self._check_empty(cursor)
+
+            started = time.perf_counter()
+            constraints, indexes = self._capture_schema(cursor)
+            foreign_keys = [c for c in constraints if c[2] == 'f']
+            keys = [c for c in constraints if c[2] != 'f']
+            for name, table, _, _ in foreign_keys + keys:
+                cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+            for name, _, _ in indexes:
+                cursor.execute(f'DROP INDEX "{name}"')
+            timings['drop_indexes'] = time.perf_counter() - started
+
+            counts = {}
+            for table, statement in LOAD_STATEMENTS:
+                started = time.perf_counter()
+                cursor.execute(statement)
+                counts[table] = cursor.rowcount
+                timings[f"insert_{table}"] = time.perf_counter() - started
+
+            # keys first, foreign keys need the referenced unique indexes
+            started = time.perf_counter()
+            for name, table, _, definition in keys + foreign_keys:
+                cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+            for _, _, definition in indexes:
+                # indexes of a partitioned articles table read ON ONLY, which
+                # would leave them without the partition indexes
+                cursor.execute(definition.replace(" ON ONLY ", " ON ", 1))
+            timings['build_indexes'] = time.perf_counter() - started
+
+            if drop_staging:
+                for table in STAGING_TABLES:
+                    cursor.execute(f"DROP TABLE {table}")
+            conn.commit()
+
+            if analyze:
+                started = time.perf_counter()
+                for table in TARGET_TABLES:
+                    cursor.execute(f"ANALYZE {table}")
+                conn.commit()
+                timings['analyze'] = time.perf_counter() - started
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        timings['copy'] = self.timings.get('copy', 0.0)
+        logger.info(f"Initial load finished: {counts}")
+        return {'staged': self.staged, 'rows': counts, 'seconds': timings}
+
+    def load(self, articles, batch_size=5000):
+        # begin, add in batches, finish
+        self.begin()
+        batch = []
+        for article in articles:
+            batch.append(article)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                batch = []
+        if batch:
+            self.add(batch)
+        return self.finish()
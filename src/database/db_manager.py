@@ -1,21 +1,76 @@
-from sqlalchemy import create_engine, func
+from sqlalchemy import create_engine, func, insert, update, delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import SQLAlchemyError
-import pandas as pd
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
+import hashlib
+import json
+import threading
+import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.config.config import DB_CONFIG
+from src.config.config import DB_CONFIG, DB_READ_URL, DB_READ_MAX_LAG_SECONDS
 from src.utils.logger import get_logger
-from .models import Base, Journal, Author, Article, MeshTerm
+from src.utils.metrics import timed
+from src.utils.singleflight import SingleFlight, coalesced
+from .instrumentation import instrument_engine, query_stats
+from .models import Base, Journal, Author, Article, MeshTerm, article_authors, article_mesh_terms
 
 logger = get_logger("database")
 
+# max rows per IN (...) lookup in the bulk path
+LOOKUP_CHUNK_SIZE = 1000
+
+# how long a replica lag reading is reused before asking again
+REPLICA_CHECK_SECONDS = 5
+
+# seconds the replica is behind, 0 when it is streaming and has replayed
+# everything it received (an idle primary sends nothing, so the last replay
+# timestamp alone looks stale). a replica whose wal receiver is not streaming
+# has received nothing new for a while, its lag is the age of the last replay
+# and NULL (not serving) when it never replayed anything. the status column
+# needs pg_read_all_stats (pg_monitor), without it the shortcut is never taken
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+         AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+def compute_article_hash(article_data):
+    # sha256 over the fields we store, so a revised PubMed record gets a new hash.
+    # mesh term order carries no meaning and is sorted, author order is kept
+    canonical = {
+        'title': article_data.get('title') or '',
+        'abstract': article_data.get('abstract') or '',
+        'publication_year': article_data.get('publication_year'),
+        'journal_title': article_data.get('journal_title') or '',
+        'journal_issn': article_data.get('journal_issn') or '',
+        'authors': [
+            [a.get('last_name', ''), a.get('first_name', ''), a.get('middle_name', ''), a.get('full_name', '')]
+            for a in article_data.get('authors', [])
+        ],
+        'mesh_terms': sorted(set(article_data.get('mesh_terms', [])))
+    }
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def _author_key(author_data):
+    # authors are unique on (last_name, first_name), missing names are ''
+    return (author_data.get('last_name') or '', author_data.get('first_name') or '')
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, connection_string=None, read_connection_string=None, max_replica_lag=None):
+        # DB_READ_URL only applies to the default database, an explicit
+        # connection string without a read url reads from itself
+        if connection_string is None and read_connection_string is None:
+            read_connection_string = DB_READ_URL
+        
         # make connection string
-        self.connection_string = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
+        self.connection_string = connection_string or f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
         
         # create engine
         self.engine = create_engine(
@@ -24,15 +79,43 @@ class DatabaseManager:
             pool_recycle=3600,
             echo=False
         )
+        instrument_engine(self.engine)
+        
+        # read replica for dashboard and Q&A reads, writes always use self.engine
+        self.read_connection_string = read_connection_string
+        self.max_replica_lag = DB_READ_MAX_LAG_SECONDS if max_replica_lag is None else max_replica_lag
+        if read_connection_string and read_connection_string != self.connection_string:
+            self.read_engine = create_engine(
+                read_connection_string,
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                connect_args={'connect_timeout': 5},
+                echo=False
+            )
+            instrument_engine(self.read_engine)
+        else:
+            self.read_engine = self.engine
+        self._replica_lag = None
+        self._replica_checked_at = 0.0
+        self._replica_serving = True
+        self._replica_lock = threading.Lock()
+        
+        # identical reads running at the same time (several dashboard sessions)
+        # share one query, see src/utils/singleflight.py
+        self._flights = SingleFlight("database")
         
         # make session factory
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.SessionLocal = SessionLocal
     
     def create_tables(self):
-        # make all tables
+        # make all tables, postgres databases are brought to the latest migration
         try:
-            Base.metadata.create_all(bind=self.engine)
+            if self.engine.dialect.name == 'postgresql':
+                from .migrate import upgrade_database
+                upgrade_database(self.engine)
+            else:
+                Base.metadata.create_all(bind=self.engine)
             logger.info("Database tables created successfully!")
             return True
         except Exception as e:
@@ -43,71 +126,148 @@ class DatabaseManager:
         # get database session
         return self.SessionLocal()
     
-    def insert_article_data(self, article_data):
+    def has_replica(self):
+        return self.read_engine is not self.engine
+    
+    def replica_lag(self):
+        # seconds the replica is behind, None when it cannot be reached.
+        # the reading is cached for REPLICA_CHECK_SECONDS
+        with self._replica_lock:
+            if time.monotonic() - self._replica_checked_at < REPLICA_CHECK_SECONDS:
+                return self._replica_lag
+            try:
+                with self.read_engine.connect() as conn:
+                    lag = conn.exec_driver_sql(REPLICA_LAG_SQL).scalar()
+                if lag is None:
+                    logger.warning("Read replica is not streaming and has replayed nothing yet")
+                else:
+                    lag = float(lag)
+            except Exception as e:
+                logger.warning(f"Read replica check failed: {str(e)}")
+                lag = None
+            self._replica_lag = lag
+            self._replica_checked_at = time.monotonic()
+            return lag
+    
+    def _mark_replica_down(self):
+        with self._replica_lock:
+            self._replica_lag = None
+            self._replica_checked_at = time.monotonic()
+    
+    def get_read_engine(self, fresh=False):
+        # the replica when it is configured, reachable and caught up, otherwise
+        # the primary. fresh=True always reads from the primary
+        if fresh or not self.has_replica():
+            return self.engine
+        lag = self.replica_lag()
+        serving = lag is not None and lag <= self.max_replica_lag
+        if serving != self._replica_serving:
+            self._replica_serving = serving
+            if serving:
+                logger.info(f"Reads back on the replica (lag {lag:.1f}s)")
+            elif lag is None:
+                logger.warning("Read replica unreachable, reads moved to the primary")
+            else:
+                logger.warning(f"Read replica lags {lag:.1f}s, reads moved to the primary")
+        return self.read_engine if serving else self.engine
+    
+    def get_read_session(self, fresh=False):
+        # session for queries that may run on the replica
+        return self.SessionLocal(bind=self.get_read_engine(fresh))
+    
+    def get_replica_status(self):
+        if not self.has_replica():
+            return {'configured': False}
+        engine = self.get_read_engine()
+        return {
+            'configured': True,
+            'lag_seconds': self._replica_lag,
+            'max_lag_seconds': self.max_replica_lag,
+            'serving_reads': engine is self.read_engine
+        }
+    
+    def insert_article_data(self, article_data, metrics=None):
+        # insert a new article, or update it when its content hash changed
+        # metrics: optional RunMetrics, gets db_* stage timings
         session = self.get_session()
         try:
-            # find or make journal
-            journal = session.query(Journal).filter(Journal.title == article_data['journal_title']).first()
-            if not journal:
-                journal = Journal(
-                    title=article_data['journal_title'],
-                    issn=article_data.get('journal_issn')
-                )
-                session.add(journal)
-                session.flush()
+            content_hash = compute_article_hash(article_data)
             
-            # check if article exists
-            existing_article = session.query(Article).filter(Article.pmid == article_data['pmid']).first()
-            if existing_article:
-                logger.info(f"Article {article_data['pmid']} already exists, skipping")
+            # check if article exists and is unchanged
+            with timed(metrics, 'db_article_lookup'):
+                article = session.query(Article).filter(Article.pmid == article_data['pmid']).first()
+            if article is not None and article.content_hash == content_hash:
+                logger.debug("Article %s unchanged, skipping", article_data['pmid'])
                 return True
             
-            # make article
-            article = Article(
-                pmid=article_data['pmid'],
-                title=article_data['title'],
-                abstract=article_data.get('abstract'),
-                publication_year=article_data.get('publication_year'),
-                journal_id=journal.id
-            )
-            session.add(article)
-            
-            # add authors
-            for author_data in article_data.get('authors', []):
-                author = session.query(Author).filter(
-                    Author.last_name == author_data.get('last_name', ''),
-                    Author.first_name == author_data.get('first_name', '')
-                ).first()
-                
-                if not author:
-                    author = Author(
-                        last_name=author_data.get('last_name', ''),
-                        first_name=author_data.get('first_name', ''),
-                        middle_name=author_data.get('middle_name', ''),
-                        full_name=author_data.get('full_name', '')
+            # find or make journal
+            with timed(metrics, 'db_journal'):
+                journal = session.query(Journal).filter(Journal.title == article_data['journal_title']).first()
+                if not journal:
+                    journal = Journal(
+                        title=article_data['journal_title'],
+                        issn=article_data.get('journal_issn')
                     )
-                    session.add(author)
+                    session.add(journal)
                     session.flush()
-                
-                # connect author to article
-                if author not in article.authors:
-                    article.authors.append(author)
+            
+            is_new = article is None
+            if is_new:
+                # make article
+                article = Article(pmid=article_data['pmid'])
+                session.add(article)
+            article.title = article_data['title']
+            article.abstract = article_data.get('abstract')
+            article.publication_year = article_data.get('publication_year')
+            article.journal_id = journal.id
+            article.content_hash = content_hash
+            
+            # add authors
+            with timed(metrics, 'db_authors'):
+                authors = []
+                for author_data in article_data.get('authors', []):
+                    last_name, first_name = _author_key(author_data)
+                    author = session.query(Author).filter(
+                        Author.last_name == last_name,
+                        Author.first_name == first_name
+                    ).first()
+                    
+                    if not author:
+                        author = Author(
+                            last_name=last_name,
+                            first_name=first_name,
+                            middle_name=author_data.get('middle_name', ''),
+                            full_name=author_data.get('full_name', '')
+                        )
+                        session.add(author)
+                        session.flush()
+                    
+                    if author not in authors:
+                        authors.append(author)
+                # assigning the collection only writes the rows that differ
+                article.authors = authors
             
             # add mesh terms
-            for mesh_term_text in article_data.get('mesh_terms', []):
-                mesh_term = session.query(MeshTerm).filter(MeshTerm.term == mesh_term_text).first()
-                
-                if not mesh_term:
-                    mesh_term = MeshTerm(term=mesh_term_text)
-                    session.add(mesh_term)
-                    session.flush()
-                
-                # connect mesh term to article
-                if mesh_term not in article.mesh_terms:
-                    article.mesh_terms.append(mesh_term)
+            with timed(metrics, 'db_mesh_terms'):
+                mesh_terms = []
+                for mesh_term_text in article_data.get('mesh_terms', []):
+                    mesh_term = session.query(MeshTerm).filter(MeshTerm.term == mesh_term_text).first()
+                    
+                    if not mesh_term:
+                        mesh_term = MeshTerm(term=mesh_term_text)
+                        session.add(mesh_term)
+                        session.flush()
+                    
+                    if mesh_term not in mesh_terms:
+                        mesh_terms.append(mesh_term)
+                article.mesh_terms = mesh_terms
             
-            session.commit()
-            logger.info(f"Successfully inserted article {article_data['pmid']}")
+            with timed(metrics, 'db_commit'):
+                session.commit()
+            if is_new:
+                logger.debug("Successfully inserted article %s", article_data['pmid'])
+            else:
+                logger.debug("Updated changed article %s", article_data['pmid'])
             return True
             
         except SQLAlchemyError as e:
@@ -121,22 +281,234 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def execute_query(self, query, params=None):
-        # old method still works
+    def insert_articles_bulk(self, articles, metrics=None):
+        # insert new articles and update changed ones (content hash differs) in one
+        # transaction, unchanged articles cost one lookup. returns articles written,
+        # raises (after rolling back) if the batch could not be written
+        # journals, authors and mesh terms are resolved per batch, not per row
+        by_pmid = {}
+        for article_data in articles:
+            by_pmid[int(article_data['pmid'])] = article_data
+        if not by_pmid:
+            return 0
+        
+        session = self.get_session()
         try:
-            if params:
-                if isinstance(params, list):
-                    params = tuple(params)
-                df = pd.read_sql_query(query, self.engine, params=params)
-            else:
-                df = pd.read_sql_query(query, self.engine)
-            return df
+            existing = {}
+            pmids = list(by_pmid)
+            with timed(metrics, 'db_article_lookup'):
+                for start in range(0, len(pmids), LOOKUP_CHUNK_SIZE):
+                    chunk = pmids[start:start + LOOKUP_CHUNK_SIZE]
+                    existing.update(session.query(Article.pmid, Article.content_hash).filter(Article.pmid.in_(chunk)))
+            
+            hashes = {pmid: compute_article_hash(data) for pmid, data in by_pmid.items()}
+            new_articles = [data for pmid, data in by_pmid.items() if pmid not in existing]
+            changed_articles = [data for pmid, data in by_pmid.items()
+                                if pmid in existing and existing[pmid] != hashes[pmid]]
+            if metrics:
+                metrics.incr('articles_unchanged', len(existing) - len(changed_articles))
+            written = new_articles + changed_articles
+            if not written:
+                return 0
+            
+            with timed(metrics, 'db_journal'):
+                journal_ids = self._resolve_journals(session, written)
+            with timed(metrics, 'db_authors'):
+                author_ids = self._resolve_authors(session, written)
+            with timed(metrics, 'db_mesh_terms'):
+                mesh_ids = self._resolve_mesh_terms(session, written)
+            
+            def article_row(data):
+                return {
+                    'pmid': int(data['pmid']),
+                    'title': data['title'],
+                    'abstract': data.get('abstract'),
+                    'publication_year': data.get('publication_year'),
+                    'journal_id': journal_ids[data['journal_title']],
+                    'content_hash': hashes[int(data['pmid'])]
+                }
+            
+            with timed(metrics, 'db_article_insert'):
+                if new_articles:
+                    # a concurrent batch may have inserted some of them since the
+                    # lookup: those are its articles, including the association rows.
+                    # no conflict target, a partitioned articles table has no unique
+                    # index on the parent (src/database/partitioning.py)
+                    result = session.execute(
+                        pg_insert(Article).on_conflict_do_nothing().returning(Article.pmid),
+                        [article_row(data) for data in new_articles]
+                    )
+                    inserted = set(result.scalars())
+                    if len(inserted) < len(new_articles):
+                        taken = len(new_articles) - len(inserted)
+                        logger.info(f"{taken} articles were inserted by a concurrent batch")
+                        if metrics:
+                            metrics.incr('articles_unchanged', taken)
+                        new_articles = [data for data in new_articles if int(data['pmid']) in inserted]
+                        written = new_articles + changed_articles
+            with timed(metrics, 'db_article_update'):
+                if changed_articles:
+                    # bulk UPDATE ... WHERE pmid = :pmid
+                    session.execute(update(Article), [article_row(data) for data in changed_articles])
+            
+            # wanted association rows, deduplicated like the relationship append check
+            author_rows = set()
+            mesh_rows = set()
+            for data in written:
+                pmid = int(data['pmid'])
+                for author_data in data.get('authors', []):
+                    author_rows.add((pmid, author_ids[_author_key(author_data)]))
+                for term in data.get('mesh_terms', []):
+                    mesh_rows.add((pmid, mesh_ids[term]))
+            
+            with timed(metrics, 'db_associations'):
+                changed_pmids = [int(data['pmid']) for data in changed_articles]
+                self._sync_associations(session, article_authors, 'author_id', changed_pmids, author_rows)
+                self._sync_associations(session, article_mesh_terms, 'mesh_term_id', changed_pmids, mesh_rows)
+            
+            with timed(metrics, 'db_commit'):
+                session.commit()
+            if metrics:
+                metrics.incr('articles_inserted', len(new_articles))
+                metrics.incr('articles_updated', len(changed_articles))
+            logger.info(f"Bulk wrote {len(new_articles)} new and {len(changed_articles)} changed articles "
+                        f"({len(existing) - len(changed_articles)} unchanged)")
+            return len(written)
+            
+        except SQLAlchemyError as e:
+            # raised rather than returning 0: callers must not mistake a failed
+            # batch for one with nothing new and move on (daemon window, queue job)
+            session.rollback()
+            logger.error(f"Database error in bulk insert: {str(e)}")
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error in bulk insert: {str(e)}")
+            raise
+        finally:
+            session.close()
+    
+    def _sync_associations(self, session, table, column, changed_pmids, wanted_rows):
+        # make the association rows match wanted_rows: new articles only get inserts,
+        # changed articles get their current rows diffed so only differences are written
+        current = set()
+        for start in range(0, len(changed_pmids), LOOKUP_CHUNK_SIZE):
+            chunk = changed_pmids[start:start + LOOKUP_CHUNK_SIZE]
+            current.update(
+                (pmid, other_id) for pmid, other_id in session.execute(
+                    select(table.c.article_pmid, table.c[column]).where(table.c.article_pmid.in_(chunk))
+                )
+            )
+        
+        removed = list(current - wanted_rows)
+        added = wanted_rows - current
+        for start in range(0, len(removed), LOOKUP_CHUNK_SIZE):
+            chunk = removed[start:start + LOOKUP_CHUNK_SIZE]
+            session.execute(delete(table).where(tuple_(table.c.article_pmid, table.c[column]).in_(chunk)))
+        if added:
+            session.execute(insert(table), [{'article_pmid': pmid, column: other_id} for pmid, other_id in added])
+    
+    def _resolve_journals(self, session, articles):
+        # map journal title -> id, creating missing journals
+        issns = {}
+        for data in articles:
+            issns.setdefault(data['journal_title'], data.get('journal_issn'))
+        
+        journal_ids = {}
+        titles = list(issns)
+        for start in range(0, len(titles), LOOKUP_CHUNK_SIZE):
+            chunk = titles[start:start + LOOKUP_CHUNK_SIZE]
+            session.execute(
+                pg_insert(Journal)
+                .values([{'title': title, 'issn': issns[title]} for title in chunk])
+                .on_conflict_do_nothing(index_elements=['title'])
+            )
+            for journal_id, title in session.query(Journal.id, Journal.title).filter(Journal.title.in_(chunk)):
+                journal_ids[title] = journal_id
+        return journal_ids
+    
+    def _resolve_authors(self, session, articles):
+        # map (last_name, first_name) -> id, creating missing authors
+        wanted = {}
+        for data in articles:
+            for author_data in data.get('authors', []):
+                wanted.setdefault(_author_key(author_data), author_data)
+        
+        author_ids = {}
+        keys = sorted(wanted)
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            session.execute(
+                pg_insert(Author)
+                .values([
+                    {
+                        'last_name': last_name,
+                        'first_name': first_name,
+                        'middle_name': wanted[(last_name, first_name)].get('middle_name', ''),
+                        'full_name': wanted[(last_name, first_name)].get('full_name', '')
+                    }
+                    for last_name, first_name in chunk
+                ])
+                .on_conflict_do_nothing(index_elements=['last_name', 'first_name'])
+            )
+            rows = session.query(Author.id, Author.last_name, Author.first_name).filter(
+                tuple_(Author.last_name, Author.first_name).in_(chunk)
+            )
+            for author_id, last_name, first_name in rows:
+                author_ids[(last_name, first_name)] = author_id
+        return author_ids
+    
+    def _resolve_mesh_terms(self, session, articles):
+        # map mesh term -> id, creating missing terms
+        terms = sorted({term for data in articles for term in data.get('mesh_terms', [])})
+        if not terms:
+            return {}
+        
+        mesh_ids = {}
+        for start in range(0, len(terms), LOOKUP_CHUNK_SIZE):
+            chunk = terms[start:start + LOOKUP_CHUNK_SIZE]
+            session.execute(
+                pg_insert(MeshTerm)
+                .values([{'term': term} for term in chunk])
+                .on_conflict_do_nothing(index_elements=['term'])
+            )
+            for mesh_id, term in session.query(MeshTerm.id, MeshTerm.term).filter(MeshTerm.term.in_(chunk)):
+                mesh_ids[term] = mesh_id
+        return mesh_ids
+    
+    @coalesced
+    def execute_query(self, query, params=None, fresh=False):
+        # read query into a dataframe, runs on the replica unless fresh=True
+        import pandas as pd
+        if isinstance(params, list):
+            params = tuple(params)
+        engine = self.get_read_engine(fresh)
+        try:
+            try:
+                return pd.read_sql_query(query, engine, params=params or None)
+            except OperationalError:
+                if engine is self.engine:
+                    raise
+                # replica went away between the lag check and the query
+                logger.warning("Read replica query failed, retrying on the primary")
+                self._mark_replica_down()
+                return pd.read_sql_query(query, self.engine, params=params or None)
         except Exception as e:
             logger.error(f"Error executing query: {str(e)}")
             return pd.DataFrame()
     
-    def get_article_stats(self):
-        session = self.get_session()
+    def get_query_stats(self, limit=20):
+        # hottest statements and recent slow queries seen by this process
+        return {
+            'summary': query_stats.summary(),
+            'top_queries': query_stats.top(limit),
+            'slow_queries': query_stats.get_slow_queries(),
+            'coalesced': self._flights.get_stats()
+        }
+    
+    @coalesced
+    def get_article_stats(self, fresh=False):
+        session = self.get_read_session(fresh)
         try:
             stats = {}
             
@@ -163,9 +535,10 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def search_articles(self, search_term, year_filter="All", journal_filter="", limit=20):
-        # search articles with filters
-        session = self.get_session()
+    def search_articles(self, search_term, year_filter="All", journal_filter="", limit=20, fresh=False):
+        # search articles with filters. returns ORM instances, so it is not
+        # coalesced: sessions must not share them
+        session = self.get_read_session(fresh)
         try:
             query = session.query(Article).join(Journal)
             
@@ -217,9 +590,10 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_top_journals(self, limit=10):
+    @coalesced
+    def get_top_journals(self, limit=10, fresh=False):
         # get journals with most articles
-        session = self.get_session()
+        session = self.get_read_session(fresh)
         try:
             results = session.query(
                 Journal.title,
@@ -235,9 +609,10 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_top_authors(self, limit=10):
+    @coalesced
+    def get_top_authors(self, limit=10, fresh=False):
         # get authors with most articles
-        session = self.get_session()
+        session = self.get_read_session(fresh)
         try:
             results = session.query(
                 Author.full_name,
@@ -253,9 +628,10 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_common_mesh_terms(self, limit=15):
+    @coalesced
+    def get_common_mesh_terms(self, limit=15, fresh=False):
         # get most used mesh terms
-        session = self.get_session()
+        session = self.get_read_session(fresh)
         try:
             results = session.query(
                 MeshTerm.term,
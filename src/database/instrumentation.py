@@ -0,0 +1,211 @@
+"""
+SQLAlchemy query instrumentation.
+
+Hooks before_cursor_execute / after_cursor_execute to record duration, row
+count and the calling function for every statement. Statements slower than
+SLOW_QUERY_MS go to the slow query log together with their EXPLAIN plan
+(EXPLAIN ANALYZE, which runs the query again, only with
+SLOW_QUERY_EXPLAIN_ANALYZE), and per call site stats are kept in process for
+the UI and health check.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.config import SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_ANALYZE
+from src.utils.logger import get_logger
+
+logger = get_logger("database")
+slow_logger = get_logger("slow_query")
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# frames that only pass queries through, the interesting caller is further up
+_SKIP_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.py"),
+}
+_PASSTHROUGH_FUNCTIONS = {'execute_query'}
+
+# statements that lock rows (job claims) or write, e.g. in a data-modifying
+# CTE, are never explained: EXPLAIN ANALYZE would take the locks and do the writes
+_UNSAFE_TO_EXPLAIN = re.compile(
+    r'\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b|\b(?:INSERT|UPDATE|DELETE|MERGE)\b',
+    re.IGNORECASE
+)
+
+
+def normalize_statement(statement, max_length=300):
+    # collapse whitespace and replace literals so similar statements group together
+    text = re.sub(r'\s+', ' ', statement).strip()
+    text = re.sub(r"'(?:[^']|'')*'", "'?'", text)
+    text = re.sub(r'\b\d+\b', '?', text)
+    return text[:max_length]
+
+
+def find_call_site():
+    # first frame in project code outside this module, e.g. "src/ui/streamlit_app.py:show_article_details"
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (filename.startswith(_PROJECT_ROOT) and filename not in _SKIP_FILES
+                and frame.f_code.co_name not in _PASSTHROUGH_FUNCTIONS
+                and 'site-packages' not in filename):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+class QueryStats:
+    # aggregated statement stats per (call site, normalized statement)
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, explain_slow=SLOW_QUERY_EXPLAIN,
+                 explain_analyze=SLOW_QUERY_EXPLAIN_ANALYZE, max_slow_queries=50):
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self.explain_analyze = explain_analyze
+        self.entries = {}
+        self.slow_queries = deque(maxlen=max_slow_queries)
+        self._lock = threading.Lock()
+
+    def record(self, call_site, statement, duration_ms, rowcount):
+        key = (call_site, normalize_statement(statement))
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = {
+                    'call_site': call_site,
+                    'statement': key[1],
+                    'calls': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'rows': 0
+                }
+                self.entries[key] = entry
+            entry['calls'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['rows'] += max(rowcount, 0)
+
+    def record_slow(self, call_site, statement, parameters, duration_ms, plan):
+        slow = {
+            'call_site': call_site,
+            'statement': statement.strip(),
+            'parameters': repr(parameters)[:500],
+            'duration_ms': duration_ms,
+            'plan': plan,
+            'at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            self.slow_queries.append(slow)
+        slow_logger.warning(
+            f"Slow query ({duration_ms:.1f}ms) from {call_site}: {slow['statement']} "
+            f"params={slow['parameters']}" + (f"\n{plan}" if plan else "")
+        )
+
+    def top(self, limit=20, order_by='total_ms'):
+        # hottest statements first
+        with self._lock:
+            rows = [dict(entry) for entry in self.entries.values()]
+        for row in rows:
+            row['mean_ms'] = row['total_ms'] / row['calls'] if row['calls'] else 0.0
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def get_slow_queries(self):
+        with self._lock:
+            return list(self.slow_queries)
+
+    def summary(self):
+        with self._lock:
+            calls = sum(entry['calls'] for entry in self.entries.values())
+            total_ms = sum(entry['total_ms'] for entry in self.entries.values())
+            return {
+                'statements': len(self.entries),
+                'calls': calls,
+                'total_ms': total_ms,
+                'slow_queries': len(self.slow_queries),
+                'slow_query_ms': self.slow_query_ms
+            }
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+            self.slow_queries.clear()
+
+
+# process wide stats shared by every instrumented engine
+query_stats = QueryStats()
+
+
+def can_explain(statement):
+    # plain reads only, see _UNSAFE_TO_EXPLAIN
+    return (statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+            and not _UNSAFE_TO_EXPLAIN.search(statement))
+
+
+def _explain(cursor, statement, parameters, analyze=False):
+    # run EXPLAIN on the raw dbapi connection so it does not fire events. it runs
+    # in a savepoint (or its own transaction) that is always rolled back, so a
+    # failure cannot abort the caller's transaction and ANALYZE leaves nothing behind
+    dbapi_conn = cursor.connection
+    in_transaction = not getattr(dbapi_conn, 'autocommit', False)
+    explain_cursor = dbapi_conn.cursor()
+    options = "(ANALYZE, BUFFERS) " if analyze else ""
+    try:
+        explain_cursor.execute("SAVEPOINT query_stats_explain" if in_transaction else "BEGIN")
+        try:
+            explain_cursor.execute(f"EXPLAIN {options}{statement}", parameters)
+            return "\n".join(row[0] for row in explain_cursor.fetchall())
+        finally:
+            if in_transaction:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+                explain_cursor.execute("RELEASE SAVEPOINT query_stats_explain")
+            else:
+                explain_cursor.execute("ROLLBACK")
+    except Exception as e:
+        logger.debug(f"Could not explain slow query: {str(e)}")
+        return None
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000.0
+
+    stats = getattr(conn.engine, '_query_stats', query_stats)
+    call_site = find_call_site()
+    stats.record(call_site, statement, duration_ms, cursor.rowcount)
+
+    if stats.slow_query_ms and duration_ms >= stats.slow_query_ms:
+        plan = None
+        if stats.explain_slow and not executemany and can_explain(statement):
+            plan = _explain(cursor, statement, parameters, analyze=stats.explain_analyze)
+        stats.record_slow(call_site, statement, parameters, duration_ms, plan)
+
+
+def instrument_engine(engine, stats=None):
+    # attach the timing hooks once per engine
+    if getattr(engine, '_query_stats_instrumented', False):
+        return engine
+    if stats is not None:
+        engine._query_stats = stats
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    engine._query_stats_instrumented = True
+    return engine
@@ -0,0 +1,152 @@
+"""
+Schema migrations (Alembic) and index checks.
+
+DatabaseManager.create_tables() upgrades Postgres databases to the latest
+revision with upgrade_database(). The same migrations run from the command
+line with `alembic upgrade head` (alembic.ini in the repo root). Each
+migration runs in its own transaction, index builds on articles (0002,
+0004) run CONCURRENTLY outside of it.
+
+INDEX_CHECKS pairs each index of the performance migration with the query
+it is for. check_indexes() runs EXPLAIN on them and reports whether the
+planner picks the index.
+"""
+
+import json
+import sys
+from contextlib import contextmanager
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from src.database import queries
+from src.utils.logger import get_logger
+
+logger = get_logger("database")
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+# serializes upgrades when several workers start at the same time
+_MIGRATION_LOCK_ID = 727100
+
+# (name, where the query runs, sql, params, index the plan should use)
+INDEX_CHECKS = [
+    ('author lookup', 'DatabaseManager.insert_article_data / _resolve_authors',
+     "SELECT id FROM authors WHERE last_name = %s AND first_name = %s",
+     ('Smith', 'John'), 'uq_authors_last_name_first_name'),
+    ('articles of an author', 'DatabaseManager.get_top_authors',
+     """SELECT a.pmid, a.title FROM articles a
+        JOIN article_authors aa ON aa.article_pmid = a.pmid
+        WHERE aa.author_id = %s""",
+     (1,), 'ix_article_authors_author_id'),
+    ('articles with a mesh term', 'DatabaseManager.get_common_mesh_terms',
+     """SELECT amt.article_pmid FROM article_mesh_terms amt
+        JOIN mesh_terms mt ON mt.id = amt.mesh_term_id
+        WHERE mt.term = %s""",
+     ('Humans',), 'ix_article_mesh_terms_mesh_term_id'),
+    ('articles of a journal', 'DatabaseManager.get_top_journals',
+     "SELECT pmid, title FROM articles WHERE journal_id = %s ORDER BY pmid DESC LIMIT 20",
+     (1,), 'ix_articles_journal_id'),
+    ('year range', 'DatabaseManager.get_article_stats',
+     "SELECT min(publication_year), max(publication_year) FROM articles WHERE publication_year IS NOT NULL",
+     (), 'ix_articles_publication_year'),
+    ('search with year filter', 'streamlit_app search tab (queries.build_search_query)',
+     *queries.build_search_query('cancer', '2021-2023'), 'ix_articles_publication_year'),
+    ('abstract retrieval', 'qa.retrieval.AbstractRetriever.search',
+     f"SELECT pmid FROM articles WHERE {queries.ARTICLE_DOCUMENT} @@ to_tsquery('english', %s) LIMIT 200",
+     ('insulin & resistance',), 'ix_articles_fts'),
+]
+
+def alembic_config(connection=None):
+    config = Config()
+    config.set_main_option('script_location', MIGRATIONS_DIR)
+    if connection is not None:
+        config.attributes['connection'] = connection
+    return config
+
+def head_revision():
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(engine):
+    # None when the database was never migrated
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+@contextmanager
+def _migration_lock(engine):
+    # session level lock: migrations with an autocommit block (CREATE INDEX
+    # CONCURRENTLY) commit in the middle, a transaction lock would be released there.
+    # alembic runs one transaction per migration on the yielded connection
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"SELECT pg_advisory_lock({_MIGRATION_LOCK_ID})")
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            conn.exec_driver_sql(f"SELECT pg_advisory_unlock({_MIGRATION_LOCK_ID})")
+            conn.commit()
+
+def upgrade_database(engine, revision='head'):
+    # run pending migrations, returns the new revision
+    with _migration_lock(engine) as conn:
+        before = MigrationContext.configure(conn).get_current_revision()
+        conn.commit()
+        command.upgrade(alembic_config(conn), revision)
+        after = MigrationContext.configure(conn).get_current_revision()
+        conn.commit()
+    if before != after:
+        logger.info(f"Database migrated from {before or 'empty'} to {after}")
+    return after
+
+def downgrade_database(engine, revision):
+    with _migration_lock(engine) as conn:
+        command.downgrade(alembic_config(conn), revision)
+
+def _plan_indexes(node, found):
+    if 'Index Name' in node:
+        found.add(node['Index Name'])
+    for child in node.get('Plans', []):
+        _plan_indexes(child, found)
+    return found
+
+def explain(connection, sql, params=()):
+    # EXPLAIN (FORMAT JSON) of one query, returns the top plan node
+    result = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, tuple(params)).scalar()
+    plan = json.loads(result) if isinstance(result, str) else result
+    return plan[0]['Plan']
+
+def check_indexes(engine, force=False):
+    # EXPLAIN every INDEX_CHECKS query. force=True turns off sequential scans
+    # so a small test database still shows whether an index can serve the query
+    results = []
+    with engine.connect() as conn:
+        try:
+            if force:
+                conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            # plans of a partitioned table name the partition indexes, count them as their parent
+            parents = dict(conn.exec_driver_sql("""
+                SELECT c.relname, p.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE c.relkind = 'i'
+            """).all())
+            for name, source, sql, params, index in INDEX_CHECKS:
+                plan = explain(conn, sql, params)
+                used = _plan_indexes(plan, set())
+                used |= {parents[used_index] for used_index in used if used_index in parents}
+                results.append({
+                    'name': name,
+                    'source': source,
+                    'index': index,
+                    'uses_index': index in used,
+                    'indexes_in_plan': sorted(used),
+                    'total_cost': plan['Total Cost']
+                })
+        finally:
+            conn.rollback()
+    return results
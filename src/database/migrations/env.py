@@ -0,0 +1,63 @@
+from logging.config import fileConfig
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from src.config.config import DB_CONFIG
+from src.database.models import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+# expression indexes are created with the migration's own SQL and postgres
+# reflects them in its normalized form, which never matches the model text.
+# autogenerate / alembic check leave them alone
+_EXPRESSION_INDEXES = {index.name for table in target_metadata.tables.values()
+                       for index in table.indexes if index.info.get('expression')}
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == 'index' and name in _EXPRESSION_INDEXES)
+
+def _database_url():
+    # -x url=... on the command line, otherwise the app settings
+    url = context.get_x_argument(as_dictionary=True).get('url')
+    return url or (f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@"
+                   f"{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+
+def run_migrations_offline():
+    # alembic upgrade head --sql prints the statements instead of running them
+    context.configure(url=_database_url(), target_metadata=target_metadata, literal_binds=True,
+                      include_object=include_object, transaction_per_migration=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+# transaction_per_migration: a migration with an autocommit block (CREATE INDEX
+# CONCURRENTLY) commits the ones before it, never half of one
+def run_migrations_online():
+    # DatabaseManager.create_tables passes its own connection in config.attributes
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object, transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(_database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object, transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+# only the command line sets up logging from alembic.ini, the app keeps its own
+if config.config_file_name is not None and config.attributes.get('connection') is None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
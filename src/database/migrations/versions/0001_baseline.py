@@ -0,0 +1,129 @@
+"""baseline schema
+
+Everything create_tables() used to make with Base.metadata.create_all.
+Databases created that way have the tables already, so each table is only
+created when it is missing and that database is simply stamped at 0001.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table):
+    if context.is_offline_mode():
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade():
+    if _missing('journals'):
+        op.create_table(
+            'journals',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('title', sa.String(500), nullable=False, unique=True),
+            sa.Column('issn', sa.String(20)),
+            sa.Column('created_at', sa.DateTime)
+        )
+
+    if _missing('authors'):
+        op.create_table(
+            'authors',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('last_name', sa.String(100), nullable=False),
+            sa.Column('first_name', sa.String(100)),
+            sa.Column('middle_name', sa.String(100)),
+            sa.Column('full_name', sa.String(300), nullable=False),
+            sa.Column('created_at', sa.DateTime)
+        )
+
+    if _missing('mesh_terms'):
+        op.create_table(
+            'mesh_terms',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('term', sa.String(200), nullable=False, unique=True),
+            sa.Column('created_at', sa.DateTime)
+        )
+
+    if _missing('articles'):
+        op.create_table(
+            'articles',
+            sa.Column('pmid', sa.Integer, primary_key=True, autoincrement=False),
+            sa.Column('title', sa.Text, nullable=False),
+            sa.Column('abstract', sa.Text),
+            sa.Column('publication_year', sa.Integer),
+            sa.Column('journal_id', sa.Integer, sa.ForeignKey('journals.id')),
+            sa.Column('content_hash', sa.String(64)),
+            sa.Column('created_at', sa.DateTime)
+        )
+    else:
+        # added after the first release of the table
+        op.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+
+    if _missing('article_authors'):
+        op.create_table(
+            'article_authors',
+            sa.Column('article_pmid', sa.Integer, sa.ForeignKey('articles.pmid'), primary_key=True),
+            sa.Column('author_id', sa.Integer, sa.ForeignKey('authors.id'), primary_key=True)
+        )
+
+    if _missing('article_mesh_terms'):
+        op.create_table(
+            'article_mesh_terms',
+            sa.Column('article_pmid', sa.Integer, sa.ForeignKey('articles.pmid'), primary_key=True),
+            sa.Column('mesh_term_id', sa.Integer, sa.ForeignKey('mesh_terms.id'), primary_key=True)
+        )
+
+    if _missing('etl_jobs'):
+        op.create_table(
+            'etl_jobs',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('search_term', sa.Text),
+            sa.Column('pmids', sa.Text, nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('attempts', sa.Integer, nullable=False),
+            sa.Column('worker_id', sa.String(200)),
+            sa.Column('lease_expires_at', sa.DateTime(timezone=True)),
+            sa.Column('heartbeat_at', sa.DateTime(timezone=True)),
+            sa.Column('articles_inserted', sa.Integer),
+            sa.Column('last_error', sa.Text),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+        op.create_index('ix_etl_jobs_status', 'etl_jobs', ['status'])
+
+    if _missing('etl_rate_limits'):
+        op.create_table(
+            'etl_rate_limits',
+            sa.Column('name', sa.String(100), primary_key=True),
+            sa.Column('next_slot', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
+        )
+
+    if _missing('ingest_state'):
+        op.create_table(
+            'ingest_state',
+            sa.Column('name', sa.String(200), primary_key=True),
+            sa.Column('search_term', sa.Text, nullable=False),
+            sa.Column('last_run_at', sa.DateTime(timezone=True)),
+            sa.Column('last_success_at', sa.DateTime(timezone=True)),
+            sa.Column('last_window_end', sa.Date),
+            sa.Column('last_status', sa.String(20)),
+            sa.Column('last_error', sa.Text),
+            sa.Column('last_found', sa.Integer),
+            sa.Column('last_inserted', sa.Integer),
+            sa.Column('total_inserted', sa.Integer, nullable=False)
+        )
+
+
+def downgrade():
+    for table in ['ingest_state', 'etl_rate_limits', 'etl_jobs', 'article_mesh_terms',
+                  'article_authors', 'articles', 'mesh_terms', 'authors', 'journals']:
+        op.drop_table(table)
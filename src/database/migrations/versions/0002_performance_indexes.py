@@ -0,0 +1,65 @@
+"""indexes for the hot queries
+
+The association tables only had (article_pmid, other_id) primary keys, so
+anything starting from an author or mesh term scanned the whole table, and
+the author lookup of the insert paths scanned authors. Each index is checked
+with EXPLAIN against the query it is for, see INDEX_CHECKS in
+src/database/migrate.py.
+
+The articles indexes are built CONCURRENTLY outside the migration
+transaction, like the full-text index of 0004, so ingest keeps writing
+while they build. A partitioned articles table (src/database/partitioning.py)
+already has them from the conversion.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_article_authors_author_id', 'article_authors', ['author_id']),
+    ('ix_article_mesh_terms_mesh_term_id', 'article_mesh_terms', ['mesh_term_id']),
+    ('ix_articles_journal_id', 'articles', ['journal_id']),
+    ('ix_articles_publication_year', 'articles', ['publication_year']),
+    ('ix_authors_last_name_first_name', 'authors', ['last_name', 'first_name']),
+]
+
+
+def _drop_if_invalid(conn, name):
+    # a failed concurrent build leaves an invalid index that IF NOT EXISTS would keep
+    invalid = conn.exec_driver_sql(
+        "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND NOT indisvalid", (name,)).scalar()
+    if invalid:
+        conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY {name}")
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        if table != 'articles':
+            op.create_index(name, table, columns, if_not_exists=True)
+
+    with op.get_context().autocommit_block():
+        partitioned = False
+        if not op.get_context().as_sql:
+            conn = op.get_bind()
+            partitioned = conn.exec_driver_sql(
+                "SELECT relkind = 'p' FROM pg_class WHERE oid = 'articles'::regclass").scalar()
+        for name, table, columns in INDEXES:
+            if table != 'articles':
+                continue
+            if not op.get_context().as_sql and not partitioned:
+                _drop_if_invalid(conn, name)
+            op.create_index(name, table, columns, if_not_exists=True,
+                            postgresql_concurrently=not partitioned)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,36 @@
+"""qa sql cache
+
+Generated SQL per normalized question, so repeated Q&A questions skip the
+model round-trip.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'qa_sql_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('question', sa.Text, nullable=False),
+        sa.Column('sql', sa.Text, nullable=False),
+        sa.Column('schema_version', sa.String(16), nullable=False),
+        sa.Column('hit_count', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_qa_sql_cache_last_used_at', 'qa_sql_cache', ['last_used_at'])
+
+
+def downgrade():
+    op.drop_index('ix_qa_sql_cache_last_used_at', table_name='qa_sql_cache')
+    op.drop_table('qa_sql_cache')
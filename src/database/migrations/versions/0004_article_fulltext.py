@@ -0,0 +1,72 @@
+"""article full-text index
+
+GIN index over the english tsvector of title and abstract, used by the
+abstract retrieval of the Q&A tab (src/qa/retrieval.py). Queries have to
+repeat the indexed expression exactly, it is ARTICLE_DOCUMENT in
+src/database/queries.py.
+
+The index is built CONCURRENTLY outside the migration transaction, so
+writers are not blocked while it builds on a large articles table.
+Partitioned tables (src/database/partitioning.py) cannot build a parent
+index concurrently: each partition's index is built concurrently and
+attached to an index created ON ONLY the parent.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# frozen copy of queries.ARTICLE_DOCUMENT
+ARTICLE_DOCUMENT = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(abstract, ''))"
+
+
+def _drop_if_invalid(conn, name):
+    # a failed concurrent build leaves an invalid index that IF NOT EXISTS would keep
+    invalid = conn.exec_driver_sql(
+        "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND NOT indisvalid", (name,)).scalar()
+    if invalid:
+        conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY {name}")
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        if op.get_context().as_sql:
+            # alembic upgrade --sql cannot look at the table, plain layout assumed
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_fts ON articles USING gin ({ARTICLE_DOCUMENT})")
+            return
+        conn = op.get_bind()
+        partitioned = conn.exec_driver_sql(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = 'articles'::regclass").scalar()
+        if not partitioned:
+            _drop_if_invalid(conn, 'ix_articles_fts')
+            conn.exec_driver_sql(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_fts ON articles USING gin ({ARTICLE_DOCUMENT})")
+            return
+
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_articles_fts ON ONLY articles USING gin ({ARTICLE_DOCUMENT})")
+        partitions = conn.exec_driver_sql(
+            "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'articles'::regclass").scalars().all()
+        for partition in partitions:
+            index = f"{partition}_fts_idx"
+            _drop_if_invalid(conn, index)
+            conn.exec_driver_sql(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {partition} USING gin ({ARTICLE_DOCUMENT})")
+            conn.exec_driver_sql(f"ALTER INDEX ix_articles_fts ATTACH PARTITION {index}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        if op.get_context().as_sql:
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_fts")
+            return
+        # on a partitioned table the partition indexes go with the parent index
+        partitioned = op.get_bind().exec_driver_sql(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = 'articles'::regclass").scalar()
+        op.execute(f"DROP INDEX {'' if partitioned else 'CONCURRENTLY '}IF EXISTS ix_articles_fts")
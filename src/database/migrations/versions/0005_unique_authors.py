@@ -0,0 +1,52 @@
+"""unique authors on (last_name, first_name)
+
+The insert paths match authors by (last_name, first_name), but nothing kept
+two concurrent batches from both creating the same new author. Duplicates
+are merged into the oldest row, their article links moved over, and the
+lookup index is replaced by a unique one that the inserts use with
+ON CONFLICT DO NOTHING, like journals and mesh terms.
+
+NULL first names never matched an insert path lookup, they become ''.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # no new authors while the duplicates are merged and the index builds
+    op.execute("LOCK TABLE authors IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("UPDATE authors SET first_name = '' WHERE first_name IS NULL")
+    op.execute("""
+        CREATE TEMPORARY TABLE author_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, min(id) OVER (PARTITION BY last_name, first_name) AS keep_id FROM authors
+        ) ids
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        INSERT INTO article_authors (article_pmid, author_id)
+        SELECT aa.article_pmid, d.keep_id
+        FROM article_authors aa JOIN author_duplicates d ON d.id = aa.author_id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("DELETE FROM article_authors aa USING author_duplicates d WHERE aa.author_id = d.id")
+    op.execute("DELETE FROM authors a USING author_duplicates d WHERE a.id = d.id")
+
+    op.drop_index('ix_authors_last_name_first_name', table_name='authors', if_exists=True)
+    op.create_index('uq_authors_last_name_first_name', 'authors', ['last_name', 'first_name'],
+                    unique=True, if_not_exists=True)
+
+
+def downgrade():
+    # merged duplicates stay merged
+    op.drop_index('uq_authors_last_name_first_name', table_name='authors', if_exists=True)
+    op.create_index('ix_authors_last_name_first_name', 'authors', ['last_name', 'first_name'], if_not_exists=True)
@@ -1,23 +1,27 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Index, Table, func, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
+from .queries import ARTICLE_DOCUMENT
+
 Base = declarative_base()
 
-# tables to connect articles with authors and mesh terms
+# tables to connect articles with authors and mesh terms. the primary keys
+# start with article_pmid, the extra indexes cover lookups from the other side.
+# schema changes go through migrations (src/database/migrations)
 article_authors = Table(
     'article_authors',
     Base.metadata,
     Column('article_pmid', Integer, ForeignKey('articles.pmid'), primary_key=True),
-    Column('author_id', Integer, ForeignKey('authors.id'), primary_key=True)
+    Column('author_id', Integer, ForeignKey('authors.id'), primary_key=True, index=True)
 )
 
 article_mesh_terms = Table(
     'article_mesh_terms',
     Base.metadata,
     Column('article_pmid', Integer, ForeignKey('articles.pmid'), primary_key=True),
-    Column('mesh_term_id', Integer, ForeignKey('mesh_terms.id'), primary_key=True)
+    Column('mesh_term_id', Integer, ForeignKey('mesh_terms.id'), primary_key=True, index=True)
 )
 
 class Journal(Base):
@@ -33,6 +37,9 @@ class Journal(Base):
 
 class Author(Base):
     __tablename__ = 'authors'
+    # the insert paths match authors by (last_name, first_name) and insert
+    # with ON CONFLICT on this index
+    __table_args__ = (Index('uq_authors_last_name_first_name', 'last_name', 'first_name', unique=True),)
     
     id = Column(Integer, primary_key=True)
     last_name = Column(String(100), nullable=False)
@@ -46,12 +53,19 @@ class Author(Base):
 
 class Article(Base):
     __tablename__ = 'articles'
+    # full-text search over title and abstract (src/qa/retrieval.py), postgres only
+    __table_args__ = (
+        Index('ix_articles_fts', text(ARTICLE_DOCUMENT), postgresql_using='gin',
+              info={'expression': True}).ddl_if(dialect='postgresql'),
+    )
     
     pmid = Column(Integer, primary_key=True)
     title = Column(Text, nullable=False)
     abstract = Column(Text)
-    publication_year = Column(Integer)
-    journal_id = Column(Integer, ForeignKey('journals.id'))
+    publication_year = Column(Integer, index=True)
+    journal_id = Column(Integer, ForeignKey('journals.id'), index=True)
+    # sha256 of the parsed record, see compute_article_hash in db_manager.py
+    content_hash = Column(String(64))
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # links to other tables
@@ -68,3 +82,54 @@ class MeshTerm(Base):
     
     # link to articles
     articles = relationship("Article", secondary=article_mesh_terms, back_populates="mesh_terms")
+
+class EtlJob(Base):
+    # one batch of pmids in the distributed work queue (see src/etl/work_queue.py)
+    __tablename__ = 'etl_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    search_term = Column(Text)
+    pmids = Column(Text, nullable=False)  # comma separated
+    status = Column(String(20), nullable=False, default='pending', index=True)  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(200))
+    lease_expires_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    articles_inserted = Column(Integer)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class EtlRateLimit(Base):
+    # next free request slot for a rate limit shared by every worker
+    __tablename__ = 'etl_rate_limits'
+    
+    name = Column(String(100), primary_key=True)
+    next_slot = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+class IngestState(Base):
+    # last run of each saved search of the ingest daemon (see src/etl/daemon.py)
+    __tablename__ = 'ingest_state'
+    
+    name = Column(String(200), primary_key=True)
+    search_term = Column(Text, nullable=False)
+    last_run_at = Column(DateTime(timezone=True))
+    last_success_at = Column(DateTime(timezone=True))
+    last_window_end = Column(Date)  # maxdate of the last successful run
+    last_status = Column(String(20))
+    last_error = Column(Text)
+    last_found = Column(Integer)
+    last_inserted = Column(Integer)
+    total_inserted = Column(Integer, nullable=False, default=0)
+
+class QaSqlCache(Base):
+    # validated SQL for a normalized Q&A question (see src/qa/sql_cache.py)
+    __tablename__ = 'qa_sql_cache'
+    
+    key = Column(String(64), primary_key=True)  # sha256 of schema version + normalized question
+    question = Column(Text, nullable=False)
+    sql = Column(Text, nullable=False)
+    schema_version = Column(String(16), nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,138 @@
+"""
+Optional range partitioning of articles by publication_year.
+
+convert() turns the plain articles table into a partitioned one: one
+partition per year from start_year on, one for everything older
+(articles_before_<start_year>) and a default partition that takes rows
+without a year and years that have no partition yet. Year filters in
+searches and stats then only touch the matching partitions, and old years
+can be vacuumed, reindexed or detached for archiving on their own.
+
+Postgres only allows unique constraints on a partitioned table when they
+include the partition key, and publication_year can be NULL. Every partition
+gets its own primary key on pmid instead, which keeps pmid unique as long as
+a pmid keeps its year (the insert paths look articles up by pmid first).
+The article_pmid foreign keys of article_authors and article_mesh_terms are
+dropped for the same reason. Those tables carry no year and stay unpartitioned,
+their primary keys start with article_pmid so joins from a pruned set of
+articles stay index lookups.
+
+Opt in, not part of the migrations:
+
+    python scripts/partition_articles.py convert --start-year 1950
+    python scripts/partition_articles.py maintain     # new years, run daily or yearly
+"""
+
+from datetime import date
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.logger import get_logger
+from .migrate import _MIGRATION_LOCK_ID
+from .queries import ARTICLE_DOCUMENT
+
+logger = get_logger("database")
+
+DEFAULT_PARTITION = 'articles_default'
+
+def year_partition(year):
+    return f"articles_y{int(year)}"
+
+def is_partitioned(engine):
+    with engine.connect() as conn:
+        kind = conn.exec_driver_sql("SELECT relkind FROM pg_class WHERE oid = to_regclass('articles')").scalar()
+    return kind == 'p'
+
+def list_partitions(engine):
+    # [{'name', 'bound', 'rows', 'bytes'}] ordered by name, rows are planner estimates
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint,
+                   pg_total_relation_size(c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass('articles')
+            ORDER BY c.relname
+        """).all()
+    return [{'name': name, 'bound': bound, 'rows': max(count, 0), 'bytes': size}
+            for name, bound, count, size in rows]
+
+def _create_partition(conn, name, bound):
+    conn.exec_driver_sql(f"CREATE TABLE {name} PARTITION OF articles {bound}")
+    conn.exec_driver_sql(f"ALTER TABLE {name} ADD CONSTRAINT {name}_pkey PRIMARY KEY (pmid)")
+
+def convert(engine, start_year=1950, end_year=None):
+    # rebuild articles as a partitioned table, in one transaction
+    end_year = end_year or date.today().year + 1
+    if start_year > end_year:
+        raise ValueError("start_year must not be after end_year")
+    if is_partitioned(engine):
+        raise ValueError("articles is already partitioned")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_MIGRATION_LOCK_ID})")
+        conn.exec_driver_sql("ALTER TABLE articles RENAME TO articles_unpartitioned")
+        conn.exec_driver_sql(
+            "CREATE TABLE articles (LIKE articles_unpartitioned) PARTITION BY RANGE (publication_year)")
+
+        _create_partition(conn, f"articles_before_{start_year}", f"FOR VALUES FROM (MINVALUE) TO ({start_year})")
+        for year in range(start_year, end_year + 1):
+            _create_partition(conn, year_partition(year), f"FOR VALUES FROM ({year}) TO ({year + 1})")
+        _create_partition(conn, DEFAULT_PARTITION, "DEFAULT")
+
+        moved = conn.exec_driver_sql("INSERT INTO articles SELECT * FROM articles_unpartitioned").rowcount
+        # takes the article_pmid foreign keys and the old indexes with it
+        conn.exec_driver_sql("DROP TABLE articles_unpartitioned CASCADE")
+
+        conn.exec_driver_sql(
+            "ALTER TABLE articles ADD CONSTRAINT articles_journal_id_fkey "
+            "FOREIGN KEY (journal_id) REFERENCES journals (id)")
+        conn.exec_driver_sql("CREATE INDEX ix_articles_journal_id ON articles (journal_id)")
+        conn.exec_driver_sql("CREATE INDEX ix_articles_publication_year ON articles (publication_year)")
+        conn.exec_driver_sql(f"CREATE INDEX ix_articles_fts ON articles USING gin ({ARTICLE_DOCUMENT})")
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE articles")
+        conn.commit()
+    logger.info(f"Partitioned articles by year {start_year}-{end_year}, {moved} rows moved")
+    return moved
+
+def ensure_year_partition(engine, year):
+    # add a partition for one year, moving its rows out of the default
+    # partition first. returns False when the partition exists already
+    name = year_partition(year)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_MIGRATION_LOCK_ID})")
+        if conn.exec_driver_sql(f"SELECT to_regclass('{name}')").scalar() is not None:
+            return False
+
+        # attaching checks that the default partition holds no rows of the year
+        conn.exec_driver_sql(f"CREATE TABLE {name} (LIKE articles)")
+        moved = conn.exec_driver_sql(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE publication_year = %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved", (year,)).rowcount
+        conn.exec_driver_sql(f"ALTER TABLE {name} ADD CONSTRAINT {name}_pkey PRIMARY KEY (pmid)")
+        conn.exec_driver_sql(
+            f"ALTER TABLE articles ATTACH PARTITION {name} FOR VALUES FROM ({year}) TO ({year + 1})")
+    logger.info(f"Created partition {name}, {moved} rows moved from {DEFAULT_PARTITION}")
+    return True
+
+def maintain(engine, years_ahead=1):
+    # partitions for every year sitting in the default partition and for the
+    # coming years, returns the years that got a partition
+    with engine.connect() as conn:
+        years = {row[0] for row in conn.exec_driver_sql(
+            f"SELECT DISTINCT publication_year FROM {DEFAULT_PARTITION} WHERE publication_year IS NOT NULL")}
+    this_year = date.today().year
+    years.update(range(this_year, this_year + years_ahead + 1))
+    return [year for year in sorted(years) if ensure_year_partition(engine, year)]
+
+def detach_year(engine, year):
+    # detach one year into a standalone table, e.g. to pg_dump and drop it.
+    # its article_authors / article_mesh_terms rows are left alone
+    name = year_partition(year)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"ALTER TABLE articles DETACH PARTITION {name}")
+    logger.info(f"Detached {name}")
+    return name
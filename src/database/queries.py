@@ -0,0 +1,142 @@
+# raw sql used by the dashboard, kept here so benchmarks and tools
+# can run exactly the same statements without importing streamlit
+
+# english full-text document of an article, ix_articles_fts indexes exactly
+# this expression so queries must repeat it verbatim
+ARTICLE_DOCUMENT = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(abstract, ''))"
+
+YEAR_STATS = """
+SELECT publication_year, COUNT(*) as count
+FROM articles
+WHERE publication_year IS NOT NULL
+GROUP BY publication_year
+ORDER BY publication_year DESC
+"""
+
+AVAILABLE_YEARS = """
+SELECT DISTINCT publication_year
+FROM articles
+WHERE publication_year IS NOT NULL
+ORDER BY publication_year DESC
+"""
+
+RECENT_ARTICLES = """
+SELECT a.pmid, a.title, a.publication_year, j.title as journal_title
+FROM articles a
+JOIN journals j ON a.journal_id = j.id
+ORDER BY a.pmid DESC
+LIMIT %s
+"""
+
+ARTICLE_DETAILS = """
+SELECT a.pmid, a.title, a.abstract, a.publication_year, j.title as journal_title, j.issn
+FROM articles a
+JOIN journals j ON a.journal_id = j.id
+WHERE a.pmid = %s
+"""
+
+ARTICLE_AUTHORS = """
+SELECT a.full_name, a.last_name, a.first_name
+FROM authors a
+JOIN article_authors aa ON a.id = aa.author_id
+WHERE aa.article_pmid = %s
+ORDER BY aa.author_id
+"""
+
+ARTICLE_MESH_TERMS = """
+SELECT mt.term
+FROM mesh_terms mt
+JOIN article_mesh_terms amt ON mt.id = amt.mesh_term_id
+WHERE amt.article_pmid = %s
+ORDER BY mt.term
+"""
+
+EXPORT_ARTICLE_CSV = """
+SELECT
+    a.pmid,
+    a.title,
+    a.abstract,
+    a.publication_year,
+    j.title as journal_title,
+    j.issn,
+    STRING_AGG(DISTINCT au.full_name, '; ') as authors,
+    STRING_AGG(DISTINCT mt.term, '; ') as mesh_terms
+FROM articles a
+JOIN journals j ON a.journal_id = j.id
+LEFT JOIN article_authors aa ON a.pmid = aa.article_pmid
+LEFT JOIN authors au ON aa.author_id = au.id
+LEFT JOIN article_mesh_terms amt ON a.pmid = amt.article_pmid
+LEFT JOIN mesh_terms mt ON amt.mesh_term_id = mt.id
+WHERE a.pmid = %s
+GROUP BY a.pmid, a.title, a.abstract, a.publication_year, j.title, j.issn
+"""
+
+EXPORT_ARTICLE_JSON = """
+SELECT
+    a.pmid,
+    a.title,
+    a.abstract,
+    a.publication_year,
+    j.title as journal_title,
+    j.issn
+FROM articles a
+JOIN journals j ON a.journal_id = j.id
+WHERE a.pmid = %s
+"""
+
+EXPORT_AUTHORS = """
+SELECT full_name, last_name, first_name
+FROM authors a
+JOIN article_authors aa ON a.id = aa.author_id
+WHERE aa.article_pmid = %s
+"""
+
+EXPORT_MESH_TERMS = """
+SELECT term
+FROM mesh_terms mt
+JOIN article_mesh_terms amt ON mt.id = amt.mesh_term_id
+WHERE amt.article_pmid = %s
+"""
+
+ARTICLES_BY_YEAR = """
+SELECT
+    publication_year as year,
+    COUNT(*) as article_count
+FROM articles
+WHERE publication_year IS NOT NULL
+GROUP BY publication_year
+ORDER BY publication_year DESC
+"""
+
+def build_search_query(search_term, year_filter="All", journal_filter="", limit=20):
+    # keyword search used by the search tab, returns (query, params)
+    query = """
+    SELECT DISTINCT a.pmid, a.title, a.publication_year, j.title as journal_title
+    FROM articles a
+    JOIN journals j ON a.journal_id = j.id
+    WHERE (LOWER(a.title) LIKE LOWER(%s) OR
+           LOWER(a.abstract) LIKE LOWER(%s))
+    """
+
+    params = [f"%{search_term}%", f"%{search_term}%"]
+
+    # Handle year filter - check if it's a range or single year
+    if year_filter != "All":
+        if isinstance(year_filter, str) and "-" in year_filter:
+            # Handle year range (e.g., "2021-2023")
+            start_year, end_year = year_filter.split("-")
+            query += " AND a.publication_year >= %s AND a.publication_year <= %s"
+            params.extend([int(start_year), int(end_year)])
+        else:
+            # Handle single year
+            query += " AND a.publication_year = %s"
+            params.append(year_filter)
+
+    if journal_filter:
+        query += " AND LOWER(j.title) LIKE LOWER(%s)"
+        params.append(f"%{journal_filter}%")
+
+    query += " ORDER BY a.publication_year DESC, a.pmid DESC LIMIT %s"
+    params.append(limit)
+
+    return query, params
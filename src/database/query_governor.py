@@ -0,0 +1,126 @@
+"""
+Guard rails for SQL we did not write: Gemini generated queries and the
+manual SQL box in the AI Q&A tab.
+
+Every query runs in its own read-only transaction with SET LOCAL
+statement_timeout. Before it runs, EXPLAIN gives the planner's cost and row
+estimates. A plan above the limits is retried wrapped in an outer LIMIT
+(which lets streaming plans stop early), and rejected when it is still too
+expensive. Results are capped at row_limit rows either way.
+"""
+
+import json
+import re
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.config import QUERY_MAX_COST, QUERY_MAX_ROWS, QUERY_ROW_LIMIT, QUERY_TIMEOUT_MS
+from src.utils.logger import get_logger
+
+logger = get_logger("query_governor")
+
+_BLOCKED_KEYWORDS = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|DROP|ALTER|CREATE|TRUNCATE|GRANT|REVOKE|COPY|VACUUM|CALL|DO|EXECUTE)\b",
+    re.IGNORECASE
+)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+class QueryRejectedError(ValueError):
+    # the query was not run (or was cancelled), the message is shown to the user
+    pass
+
+def clean_sql(sql):
+    # one read statement without trailing semicolons, raises QueryRejectedError
+    sql = (sql or '').strip()
+    while sql.endswith(';'):
+        sql = sql[:-1].rstrip()
+    if not sql:
+        raise QueryRejectedError("Query is empty")
+    # string literals may contain anything, e.g. LIKE '%create%'
+    code = _STRING_LITERAL.sub("''", sql)
+    if ';' in code:
+        raise QueryRejectedError("Only a single statement is allowed")
+    if not code.upper().startswith(('SELECT', 'WITH')):
+        raise QueryRejectedError("Only SELECT queries are allowed")
+    blocked = _BLOCKED_KEYWORDS.search(code)
+    if blocked:
+        raise QueryRejectedError(f"Keyword not allowed: {blocked.group(1).upper()}")
+    return sql
+
+def _limited(sql, row_limit):
+    return f"SELECT * FROM (\n{sql}\n) AS governed_query LIMIT {int(row_limit)}"
+
+class QueryGovernor:
+    def __init__(self, db, max_cost=QUERY_MAX_COST, max_rows=QUERY_MAX_ROWS,
+                 row_limit=QUERY_ROW_LIMIT, timeout_ms=QUERY_TIMEOUT_MS):
+        # db: DatabaseManager (either one), reads go where its read routing says
+        self.db = getattr(db, 'improved_db', db)
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.row_limit = row_limit
+        self.timeout_ms = timeout_ms
+
+    def _explain(self, conn, sql):
+        result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + _escape(sql)).scalar()
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]['Plan']
+        return plan['Total Cost'], plan['Plan Rows']
+
+    def _within_limits(self, cost, rows):
+        return cost <= self.max_cost and rows <= self.max_rows
+
+    def run(self, sql, fresh=False):
+        # returns (dataframe, report), raises QueryRejectedError
+        sql = clean_sql(sql)
+        report = {'sql': sql, 'limited': False}
+        engine = self.db.get_read_engine(fresh)
+
+        with engine.connect() as conn:
+            try:
+                conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.timeout_ms)}")
+
+                try:
+                    cost, rows = self._explain(conn, sql)
+                except Exception as e:
+                    raise QueryRejectedError(f"Query could not be planned: {_short_error(e)}")
+                report.update(cost=cost, estimated_rows=rows)
+
+                # an outer LIMIT is always applied, when the plan is over the
+                # limits the limited plan has to be within them
+                limited_sql = _limited(sql, self.row_limit)
+                if not self._within_limits(cost, rows):
+                    cost, rows = self._explain(conn, limited_sql)
+                    if not self._within_limits(cost, rows):
+                        logger.warning(f"Rejected query with cost {report['cost']:.0f}: {sql[:200]}")
+                        raise QueryRejectedError(
+                            f"Query is too expensive (estimated cost {report['cost']:.0f}, "
+                            f"{report['estimated_rows']:.0f} rows, limit {self.max_cost:.0f}). "
+                            f"Add filters or aggregate further.")
+                    report.update(limited=True, cost=cost, estimated_rows=rows)
+
+                import pandas as pd
+                started = time.perf_counter()
+                try:
+                    df = pd.read_sql_query(_escape(limited_sql), conn)
+                except Exception as e:
+                    if 'statement timeout' in str(e):
+                        raise QueryRejectedError(f"Query cancelled after {self.timeout_ms / 1000:.1f}s")
+                    raise QueryRejectedError(f"Query failed: {_short_error(e)}")
+                report['elapsed_ms'] = (time.perf_counter() - started) * 1000
+                report['truncated'] = len(df) >= self.row_limit
+                return df, report
+            finally:
+                conn.rollback()
+
+def _escape(sql):
+    # the driver treats % as a parameter marker, e.g. in LIKE '%cancer%'
+    return sql.replace('%', '%%')
+
+def _short_error(error):
+    # first line of the database message without the sqlalchemy decoration
+    while getattr(error, '__cause__', None) is not None:
+        error = error.__cause__
+    message = str(getattr(error, 'orig', None) or error)
+    return message.strip().splitlines()[0] if message.strip() else type(error).__name__
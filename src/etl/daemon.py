@@ -0,0 +1,342 @@
+"""
+Long-running ingest daemon.
+
+Keeps the corpus current from a declarative list of saved searches, e.g.
+
+    {
+        "workers": 2,
+        "lookback_days": 30,
+        "searches": [
+            {"name": "immunotherapy", "term": "cancer immunotherapy", "interval_minutes": 60},
+            {"name": "covid-vaccine", "term": "COVID-19 vaccine", "interval_minutes": 360, "max_articles": 2000}
+        ]
+    }
+
+Every tick, each search whose interval has passed is handed to a bounded
+thread pool. A run only asks esearch for records that entered PubMed (EDAT)
+since the previous successful run, fetches them in batches and bulk inserts
+them. A window with more matches than max_articles is split into shorter EDAT
+ranges: the run loads as many whole ranges as fit, moves the window past
+them and is recorded as 'partial', so the next tick continues from there.
+Run state lives in the ingest_state table so restarts pick up where the
+last run stopped, and the daemon serves its status as JSON over HTTP.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.config import ETL_RATE_LIMIT, ETL_JOB_BATCH_SIZE
+from src.database.database import DatabaseManager
+from src.database.models import IngestState
+from src.etl.pubmed_etl import PubMedETL, ESEARCH_MAX_IDS
+from src.etl.rate_limit import RateLimiter
+from src.utils.logger import get_logger
+
+logger = get_logger("ingest_daemon")
+
+class SavedSearch:
+    def __init__(self, name, term, interval_minutes=60, max_articles=1000):
+        if not name or not term:
+            raise ValueError("Saved searches need a name and a term")
+        if interval_minutes <= 0:
+            raise ValueError(f"Search '{name}': interval_minutes must be positive")
+        self.name = name
+        self.term = term
+        self.interval = timedelta(minutes=interval_minutes)
+        self.max_articles = max_articles
+
+def load_search_config(path):
+    # reads the json config, returns (searches, options)
+    with open(path) as f:
+        config = json.load(f)
+
+    searches = [SavedSearch(**entry) for entry in config.get('searches', [])]
+    names = [search.name for search in searches]
+    if len(names) != len(set(names)):
+        raise ValueError("Saved search names must be unique")
+
+    options = {key: value for key, value in config.items() if key != 'searches'}
+    return searches, options
+
+def search_window(state, today, lookback_days):
+    # (mindate, maxdate) for the next run. the window starts on the day the last
+    # one ended, EDAT has day resolution so that day is fetched again and the
+    # overlap is dropped by the insert dedup
+    if state is not None and state.last_window_end is not None:
+        start = state.last_window_end
+    else:
+        start = today - timedelta(days=lookback_days)
+    return start, today
+
+def _format_date(day):
+    return day.strftime('%Y/%m/%d')
+
+def _next_run(state, search):
+    # partial runs continue on the next tick
+    if state is None or state.last_run_at is None:
+        return None
+    if state.last_status == 'partial':
+        return state.last_run_at.isoformat()
+    return (state.last_run_at + search.interval).isoformat()
+
+class IngestDaemon:
+    def __init__(self, searches, db=None, base_url=None, workers=2, lookback_days=30,
+                 batch_size=ETL_JOB_BATCH_SIZE, rate_limiter=None):
+        self.searches = {search.name: search for search in searches}
+        self.db = db or DatabaseManager()
+        self.base_url = base_url
+        self.workers = workers
+        self.lookback_days = lookback_days
+        self.batch_size = batch_size
+        # one budget for all pool threads
+        self.rate_limiter = rate_limiter or RateLimiter(ETL_RATE_LIMIT)
+
+        self.started_at = None
+        self.ticks = 0
+        self.running = set()
+        self.last_results = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._status_server = None
+
+    def _load_states(self):
+        session = self.db.get_session()
+        try:
+            return {state.name: state for state in session.query(IngestState).all()}
+        finally:
+            session.close()
+
+    def due_searches(self, now=None):
+        # searches whose interval has passed since their last run and are not running now
+        now = now or datetime.now(timezone.utc)
+        states = self._load_states()
+        due = []
+        for name, search in self.searches.items():
+            with self._lock:
+                if name in self.running:
+                    continue
+            state = states.get(name)
+            # a partial run left part of its window for the next tick
+            if (state is None or state.last_run_at is None or state.last_status == 'partial'
+                    or state.last_run_at + search.interval <= now):
+                due.append(search)
+        return due
+
+    def run_search(self, search):
+        # one incremental refresh, returns a result dict
+        started = time.perf_counter()
+        session = self.db.get_session()
+        try:
+            state = session.get(IngestState, search.name)
+            mindate, maxdate = search_window(state, datetime.now(timezone.utc).date(), self.lookback_days)
+            if state is None:
+                state = IngestState(name=search.name, search_term=search.term, total_inserted=0)
+                session.add(state)
+            state.search_term = search.term
+            state.last_run_at = datetime.now(timezone.utc)
+
+            etl = PubMedETL(base_url=self.base_url, rate_limiter=self.rate_limiter, db=self.db)
+            found, inserted, lost, matched = 0, 0, 0, None
+            start = mindate
+            while start <= maxdate:
+                budget = search.max_articles - found
+                if budget <= 0:
+                    break
+                end, pmids, count, window_matched = self._fit_range(etl, search.term, start, maxdate, budget)
+                matched = window_matched if matched is None else matched
+                if count > len(pmids):
+                    # one day holds more than the budget left. a later run starts
+                    # with it, the first range of a run is fetched whole
+                    if found:
+                        break
+                    pmids, count = etl.esearch_with_count(search.term, ESEARCH_MAX_IDS,
+                                                          mindate=_format_date(start), maxdate=_format_date(end))
+                    lost += count - len(pmids)
+                inserted += self._load(etl, pmids)
+                found += len(pmids)
+
+                # every record of start..end is in, the next range starts the day after.
+                # a window that reached today keeps today, it is fetched again next run
+                start = end + timedelta(days=1)
+                state.last_window_end = maxdate if start > maxdate else start
+                state.last_found = found
+                session.commit()
+
+            complete = start > maxdate
+            if lost:
+                state.last_status = 'truncated'
+                state.last_error = (f"{lost} articles of {_format_date(mindate)}..{_format_date(state.last_window_end)} "
+                                    f"were not fetched, esearch returns at most {ESEARCH_MAX_IDS} ids per day")
+                logger.warning(f"Search '{search.name}': {state.last_error}")
+            elif not complete:
+                state.last_status = 'partial'
+                state.last_error = (f"{matched} articles matched {mindate}..{maxdate}, more than max_articles "
+                                    f"({search.max_articles}): fetched up to {state.last_window_end}, "
+                                    f"the rest on the next tick")
+                logger.info(f"Search '{search.name}': {state.last_error}")
+            else:
+                state.last_status = 'ok'
+                state.last_error = None
+            state.last_success_at = state.last_run_at
+            state.last_found = found
+            state.last_inserted = inserted
+            state.total_inserted = (state.total_inserted or 0) + inserted
+            session.commit()
+
+            result = {
+                'status': state.last_status,
+                'window': [str(mindate), str(maxdate)],
+                'window_end': str(state.last_window_end),
+                'found': found,
+                'matched': matched,
+                'inserted': inserted,
+                'seconds': time.perf_counter() - started
+            }
+            logger.info(f"Search '{search.name}' {mindate}..{maxdate}: {found} found, {inserted} new")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Search '{search.name}' failed: {str(e)}")
+            self._record_failure(search, e)
+            result = {'status': 'error', 'error': str(e), 'seconds': time.perf_counter() - started}
+        finally:
+            session.close()
+            with self._lock:
+                self.running.discard(search.name)
+                self.last_results[search.name] = result
+        return result
+
+    def _fit_range(self, etl, term, start, end, budget):
+        # (end, pmids, count, matched) of the longest range from start whose matches
+        # fit in budget, halving end until they do or the range is one day.
+        # matched counts the whole start..end asked for
+        matched = None
+        while True:
+            pmids, count = etl.esearch_with_count(term, budget, mindate=_format_date(start), maxdate=_format_date(end))
+            matched = count if matched is None else matched
+            if count <= len(pmids) or end <= start:
+                return end, pmids, count, matched
+            end = start + timedelta(days=(end - start).days // 2)
+
+    def _load(self, etl, pmids):
+        # fetch and bulk insert in batches, returns articles written
+        inserted = 0
+        for i in range(0, len(pmids), self.batch_size):
+            articles = etl.fetch_articles_batch(pmids[i:i + self.batch_size])
+            if articles is None:
+                raise RuntimeError("efetch failed")
+            inserted += self.db.insert_articles_bulk(articles)
+        return inserted
+
+    def _record_failure(self, search, error):
+        # failed runs count as runs for scheduling, the window is not advanced
+        session = self.db.get_session()
+        try:
+            state = session.get(IngestState, search.name)
+            if state is None:
+                state = IngestState(name=search.name, search_term=search.term, total_inserted=0)
+                session.add(state)
+            state.last_run_at = datetime.now(timezone.utc)
+            state.last_status = 'error'
+            state.last_error = str(error)[:2000]
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Could not record failure of '{search.name}': {str(e)}")
+        finally:
+            session.close()
+
+    def tick(self):
+        # submit every due search to the pool, returns the futures
+        self.ticks += 1
+        futures = []
+        for search in self.due_searches():
+            with self._lock:
+                self.running.add(search.name)
+            futures.append(self._pool.submit(self.run_search, search))
+        return futures
+
+    def run_forever(self, tick_seconds=30):
+        self.db.create_tables()
+        self.started_at = datetime.now(timezone.utc)
+        logger.info(f"Ingest daemon started with {len(self.searches)} searches, {self.workers} workers")
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Tick failed: {str(e)}")
+            self._stop.wait(tick_seconds)
+        self._pool.shutdown(wait=True)
+        logger.info("Ingest daemon stopped")
+
+    def stop(self):
+        self._stop.set()
+        if self._status_server:
+            self._status_server.shutdown()
+            self._status_server.server_close()
+            self._status_server = None
+
+    def get_status(self):
+        states = self._load_states()
+        with self._lock:
+            running = sorted(self.running)
+            last_results = dict(self.last_results)
+
+        searches = []
+        for name, search in self.searches.items():
+            state = states.get(name)
+            last_run = state.last_run_at if state else None
+            searches.append({
+                'name': name,
+                'term': search.term,
+                'interval_minutes': search.interval.total_seconds() / 60,
+                'running': name in running,
+                'last_run_at': last_run.isoformat() if last_run else None,
+                'next_run_at': _next_run(state, search),
+                'last_status': state.last_status if state else None,
+                'last_error': state.last_error if state else None,
+                'last_window_end': str(state.last_window_end) if state and state.last_window_end else None,
+                'last_found': state.last_found if state else None,
+                'last_inserted': state.last_inserted if state else None,
+                'total_inserted': state.total_inserted if state else 0,
+                'last_result': last_results.get(name)
+            })
+
+        return {
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'ticks': self.ticks,
+            'workers': self.workers,
+            'running': running,
+            'searches': searches
+        }
+
+    def serve_status(self, host="127.0.0.1", port=8766):
+        # GET /status returns get_status() as json, port 0 picks a free port
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/status'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.get_status(), default=str).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+        self._status_server = ThreadingHTTPServer((host, port), StatusHandler)
+        threading.Thread(target=self._status_server.serve_forever, daemon=True).start()
+        logger.info(f"Status endpoint on http://{host}:{self._status_server.server_port}/status")
+        return self._status_server.server_port
@@ -0,0 +1,474 @@
+"""
+Local stand-in for the NCBI E-utilities used by the ETL.
+
+Serves esearch.fcgi and efetch.fcgi (including the history server, i.e.
+usehistory=y / WebEnv / query_key) from recorded or synthetic PubmedArticle
+XML, with configurable latency, error injection and rate limiting. Point the
+ETL at it with PUBMED_BASE_URL=http://127.0.0.1:8765/ to benchmark ingest
+without network access.
+
+Run it with:
+    python -m src.etl.eutils_server --port 8765 --latency-ms 50 --rate-limit 3
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig, SYNTHETIC_PMID_START
+from src.utils.logger import get_logger
+
+logger = get_logger("eutils_server")
+
+NCBI_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+
+
+def _term_key(term):
+    # normalize search term so recordings match regardless of spacing/case
+    return re.sub(r'\s+', ' ', (term or "").strip().lower())
+
+
+def _parse_date(value):
+    # esearch mindate/maxdate, YYYY/MM/DD
+    return datetime.strptime(value, '%Y/%m/%d').date() if value else None
+
+
+class ArticleStore:
+    # recorded and/or synthetic pubmed data served by the stub
+    #
+    # data_dir layout:
+    #   searches.json        {"normalized term": ["pmid", ...]}
+    #   articles/<pmid>.xml  one PubmedArticle element per file
+
+    def __init__(self, data_dir=None, upstream_url=None, synthetic=True,
+                 synthetic_count=200, seed=42, corpus=None, synthetic_days=30):
+        self.data_dir = data_dir
+        self.upstream_url = upstream_url
+        self.synthetic = synthetic
+        self.synthetic_count = synthetic_count
+        # synthetic records entered PubMed (EDAT) during the last synthetic_days days
+        self.synthetic_days = synthetic_days
+        self.seed = seed
+        self.corpus = corpus or SyntheticCorpus(CorpusConfig(seed=seed))
+
+        self.searches = {}
+        self.articles = {}
+        self._lock = threading.Lock()
+
+        if data_dir:
+            self._load()
+
+    @property
+    def recording(self):
+        return bool(self.upstream_url and self.data_dir)
+
+    def _load(self):
+        # read existing recordings from disk
+        searches_path = os.path.join(self.data_dir, "searches.json")
+        if os.path.exists(searches_path):
+            with open(searches_path) as f:
+                self.searches = json.load(f)
+
+        articles_dir = os.path.join(self.data_dir, "articles")
+        if os.path.isdir(articles_dir):
+            for name in os.listdir(articles_dir):
+                if name.endswith(".xml"):
+                    with open(os.path.join(articles_dir, name)) as f:
+                        self.articles[name[:-4]] = f.read()
+
+        logger.info(f"Loaded {len(self.searches)} searches and {len(self.articles)} articles from {self.data_dir}")
+
+    def _save_search(self, key, pmids):
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.searches[key] = pmids
+        with open(os.path.join(self.data_dir, "searches.json"), "w") as f:
+            json.dump(self.searches, f, indent=2)
+
+    def _save_article(self, pmid, xml_text):
+        articles_dir = os.path.join(self.data_dir, "articles")
+        os.makedirs(articles_dir, exist_ok=True)
+        self.articles[pmid] = xml_text
+        with open(os.path.join(articles_dir, f"{pmid}.xml"), "w") as f:
+            f.write(xml_text)
+
+    def _synthetic_pmids(self, key):
+        rng = random.Random(f"{self.seed}:{key}")
+        pmids = set()
+        while len(pmids) < self.synthetic_count:
+            pmids.add(str(SYNTHETIC_PMID_START + rng.randint(0, 9999999)))
+        return sorted(pmids, reverse=True)
+
+    def entry_date(self, pmid):
+        # EDAT of a synthetic record, the same for the same seed (UTC days, like the daemon)
+        days_ago = random.Random(f"{self.seed}:edat:{pmid}").randrange(self.synthetic_days)
+        return datetime.now(timezone.utc).date() - timedelta(days=days_ago)
+
+    def search(self, term, max_results=100000, mindate=None, maxdate=None):
+        # return every pmid matching a term. mindate/maxdate (dates) only filter
+        # synthetic results, recordings have no entry dates
+        key = _term_key(term)
+        with self._lock:
+            if key in self.searches:
+                return list(self.searches[key])
+
+            if self.recording:
+                pmids = self._record_search(term, max_results)
+                self._save_search(key, pmids)
+                return pmids
+
+        if self.synthetic:
+            pmids = self._synthetic_pmids(key)
+            if mindate or maxdate:
+                pmids = [pmid for pmid in pmids
+                         if (mindate or date.min) <= self.entry_date(pmid) <= (maxdate or date.max)]
+            return pmids
+        return []
+
+    def get_articles(self, pmids):
+        # return PubmedArticle xml strings for the pmids we can serve
+        with self._lock:
+            missing = [pmid for pmid in pmids if pmid not in self.articles]
+            if missing and self.recording:
+                for pmid, xml_text in self._record_articles(missing).items():
+                    self._save_article(pmid, xml_text)
+
+            results = []
+            for pmid in pmids:
+                if pmid in self.articles:
+                    results.append(self.articles[pmid])
+                elif self.synthetic:
+                    results.append(self.corpus.to_xml(self.corpus.article(pmid)))
+            return results
+
+    def _record_search(self, term, max_results):
+        import requests
+
+        response = requests.get(
+            f"{self.upstream_url}esearch.fcgi",
+            params={'db': 'pubmed', 'term': term, 'retmax': max_results, 'retmode': 'xml'},
+            timeout=30
+        )
+        response.raise_for_status()
+        root = ET.fromstring(response.content)
+        pmids = [elem.text for elem in root.findall('.//IdList/Id')]
+        logger.info(f"Recorded search '{term}' ({len(pmids)} pmids)")
+        return pmids
+
+    def _record_articles(self, pmids):
+        import requests
+
+        recorded = {}
+        for start in range(0, len(pmids), 200):
+            batch = pmids[start:start + 200]
+            response = requests.post(
+                f"{self.upstream_url}efetch.fcgi",
+                data={'db': 'pubmed', 'id': ",".join(batch), 'retmode': 'xml'},
+                timeout=60
+            )
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+            for article in root.findall('PubmedArticle'):
+                pmid_elem = article.find('.//PMID')
+                if pmid_elem is not None:
+                    recorded[pmid_elem.text] = ET.tostring(article, encoding="unicode")
+            # stay under the public ncbi limit while recording
+            time.sleep(0.4)
+
+        logger.info(f"Recorded {len(recorded)} articles")
+        return recorded
+
+
+class _TokenBucket:
+    # simple thread-safe token bucket for the rate limit
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class EUtilsRequestHandler(BaseHTTPRequestHandler):
+    server_version = "EUtilsStub/1.0"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        self._dispatch(parsed.path, parse_qs(parsed.query))
+
+    def do_POST(self):
+        # efetch accepts long id lists as a form post
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        params = parse_qs(parsed.query)
+        params.update(parse_qs(body))
+        self._dispatch(parsed.path, params)
+
+    def _dispatch(self, path, raw_params):
+        stub = self.server.stub
+        params = {key: values[-1] for key, values in raw_params.items()}
+
+        if path.endswith("/stats"):
+            self._send(200, json.dumps(stub.get_stats()), "application/json")
+            return
+
+        if path.endswith("esearch.fcgi"):
+            endpoint = "esearch"
+        elif path.endswith("efetch.fcgi"):
+            endpoint = "efetch"
+        else:
+            self._send(404, "Unknown endpoint", "text/plain")
+            return
+
+        rejected = stub.before_request(endpoint)
+        if rejected:
+            status, body, content_type, headers = rejected
+            self._send(status, body, content_type, headers)
+            return
+
+        try:
+            if endpoint == "esearch":
+                status, body = stub.handle_esearch(params)
+            else:
+                status, body = stub.handle_efetch(params)
+        except Exception as e:
+            logger.error(f"Error handling {endpoint}: {str(e)}")
+            status, body = 500, f"<ERROR>{escape(str(e))}</ERROR>"
+
+        stub.record_response(endpoint, status, len(body.encode()))
+        self._send(status, body, "text/xml")
+
+    def _send(self, status, body, content_type, headers=None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class EUtilsStubServer:
+    """Local HTTP server implementing esearch.fcgi and efetch.fcgi"""
+
+    def __init__(self, store=None, host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, error_statuses=(500, 502, 503), rate_limit=None, seed=None):
+        self.store = store or ArticleStore()
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rate_limiter = _TokenBucket(rate_limit) if rate_limit else None
+
+        self.httpd = None
+        self._thread = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # history server: WebEnv -> {query_key: [pmids]}
+        self.history = {}
+        self.stats = {
+            'esearch_requests': 0,
+            'efetch_requests': 0,
+            'bytes_sent': 0,
+            'errors_injected': 0,
+            'rate_limited': 0
+        }
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/entrez/eutils/"
+
+    def start(self):
+        # serve in a background thread; port 0 picks a free port
+        self.httpd = ThreadingHTTPServer((self.host, self.port), EUtilsRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"E-utilities stub listening on {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def record_response(self, endpoint, status, size):
+        with self._lock:
+            self.stats[f"{endpoint}_requests"] += 1
+            self.stats['bytes_sent'] += size
+
+    def before_request(self, endpoint):
+        # apply rate limit, latency and error injection before serving
+        if self.rate_limiter and not self.rate_limiter.try_acquire():
+            with self._lock:
+                self.stats['rate_limited'] += 1
+            body = json.dumps({"error": "API rate limit exceeded",
+                               "limit": str(self.rate_limiter.rate)})
+            return 429, body, "application/json", {"Retry-After": "1"}
+
+        with self._lock:
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            inject_error = self.error_rate > 0 and self._rng.random() < self.error_rate
+            status = self._rng.choice(self.error_statuses) if inject_error else None
+            if inject_error:
+                self.stats['errors_injected'] += 1
+
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        if inject_error:
+            return status, f"<ERROR>Injected {endpoint} failure</ERROR>", "text/xml", {}
+        return None
+
+    def handle_esearch(self, params):
+        term = params.get('term', '')
+        retstart = int(params.get('retstart', 0))
+        retmax = int(params.get('retmax', 20))
+
+        mindate, maxdate = (_parse_date(params.get(name)) for name in ('mindate', 'maxdate'))
+        pmids = self.store.search(term, mindate=mindate, maxdate=maxdate)
+        page = pmids[retstart:retstart + retmax]
+
+        history = ""
+        if params.get('usehistory', '').lower() == 'y':
+            webenv, query_key = self._store_history(params.get('WebEnv'), pmids)
+            history = f"<QueryKey>{query_key}</QueryKey><WebEnv>{webenv}</WebEnv>"
+
+        ids = "".join(f"<Id>{pmid}</Id>" for pmid in page)
+        body = (
+            '<?xml version="1.0" encoding="UTF-8" ?>\n'
+            f"<eSearchResult><Count>{len(pmids)}</Count><RetMax>{len(page)}</RetMax>"
+            f"<RetStart>{retstart}</RetStart>{history}<IdList>{ids}</IdList>"
+            f"<QueryTranslation>{escape(term)}</QueryTranslation></eSearchResult>"
+        )
+        return 200, body
+
+    def handle_efetch(self, params):
+        if params.get('id'):
+            pmids = [pmid.strip() for pmid in params['id'].split(',') if pmid.strip()]
+        elif params.get('WebEnv') and params.get('query_key'):
+            pmids = self._lookup_history(params['WebEnv'], params['query_key'])
+            if pmids is None:
+                return 400, "<eFetchResult><ERROR>Unable to obtain query #1</ERROR></eFetchResult>"
+            retstart = int(params.get('retstart', 0))
+            retmax = int(params.get('retmax', 10000))
+            pmids = pmids[retstart:retstart + retmax]
+        else:
+            return 400, "<eFetchResult><ERROR>Empty id list - nothing todo</ERROR></eFetchResult>"
+
+        articles = self.store.get_articles(pmids)
+        body = (
+            '<?xml version="1.0" ?>\n'
+            f"<PubmedArticleSet>{''.join(articles)}</PubmedArticleSet>"
+        )
+        return 200, body
+
+    def _store_history(self, webenv, pmids):
+        with self._lock:
+            if not webenv or webenv not in self.history:
+                webenv = f"MCID_{uuid.uuid4().hex}"
+                self.history[webenv] = {}
+            query_key = str(len(self.history[webenv]) + 1)
+            self.history[webenv][query_key] = list(pmids)
+            return webenv, query_key
+
+    def _lookup_history(self, webenv, query_key):
+        with self._lock:
+            return self.history.get(webenv, {}).get(str(query_key))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the NCBI E-utilities")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", help="directory with recorded searches/articles")
+    parser.add_argument("--record", action="store_true",
+                        help="fetch misses from NCBI and save them to --data-dir")
+    parser.add_argument("--upstream-url", default=NCBI_BASE_URL)
+    parser.add_argument("--no-synthetic", action="store_true",
+                        help="only serve recorded data")
+    parser.add_argument("--synthetic-count", type=int, default=200,
+                        help="pmids returned per unknown search term")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, help="requests per second (429 above it)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.record and not args.data_dir:
+        parser.error("--record needs --data-dir")
+
+    store = ArticleStore(
+        data_dir=args.data_dir,
+        upstream_url=args.upstream_url if args.record else None,
+        synthetic=not args.no_synthetic,
+        synthetic_count=args.synthetic_count,
+        seed=args.seed
+    )
+    server = EUtilsStubServer(
+        store=store,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
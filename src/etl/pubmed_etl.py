@@ -1,52 +1,122 @@
+import logging
 import requests
 import time
 import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.database.database import DatabaseManager
-from src.config.config import PUBMED_BASE_URL, MAX_ARTICLES
-from src.utils.logger import get_logger
+from src.config.config import PUBMED_BASE_URL, MAX_ARTICLES, ESEARCH_PAGE_SIZE, NCBI_API_KEY, LOG_SAMPLE_EVERY, LOG_SAMPLE_INTERVAL
+from src.utils.logger import get_logger, LogSampler
+from src.utils.metrics import RunMetrics, timed
+from src.utils.profiling import maybe_profile
 
 logger = get_logger("etl")
 
+# esearch will not page past the first 10,000 ids of a PubMed query
+ESEARCH_MAX_IDS = 10000
+
 class PubMedETL:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, base_url: Optional[str] = None, rate_limiter=None, db=None):
+        self.db = db or DatabaseManager()
         self.session = requests.Session()
         
-    def search_articles(self, search_term: str, max_results: int = MAX_ARTICLES) -> List[str]:
-        search_url = f"{PUBMED_BASE_URL}esearch.fcgi"
+        # e-utilities endpoint, can be a local stand-in server
+        self.base_url = base_url or PUBMED_BASE_URL
+        if not self.base_url.endswith('/'):
+            self.base_url += '/'
+        
+        # RunMetrics for the current process_articles run, None otherwise
+        self.metrics = None
+        # time spent in _clean_text for the article being parsed
+        self._clean_seconds = 0.0
+        
+        # per-article progress is sampled so logging stays off the hot path
+        self.progress_log = LogSampler(every=LOG_SAMPLE_EVERY, interval=LOG_SAMPLE_INTERVAL)
+        
+        # optional limiter with acquire(), e.g. SharedRateLimiter for a worker fleet,
+        # without one process_articles keeps its fixed delay between articles
+        self.rate_limiter = rate_limiter
+    
+    def _eutils_request(self, endpoint: str, params: Dict, post: bool = False):
+        # one e-utilities call, waits for the rate limiter first
+        if self.rate_limiter:
+            with timed(self.metrics, 'rate_limit_wait'):
+                self.rate_limiter.acquire()
+        if NCBI_API_KEY:
+            params = dict(params, api_key=NCBI_API_KEY)
+        
+        url = f"{self.base_url}{endpoint}"
+        if post:
+            # long id lists do not fit in a query string
+            response = self.session.post(url, data=params)
+        else:
+            response = self.session.get(url, params=params)
+        response.raise_for_status()
+        return response
+        
+    def search_articles(self, search_term: str, max_results: int = MAX_ARTICLES,
+                        mindate: Optional[str] = None, maxdate: Optional[str] = None,
+                        datetype: str = 'edat') -> List[str]:
+        try:
+            return self.esearch(search_term, max_results, mindate, maxdate, datetype)
+        except Exception as e:
+            logger.error(f"Error searching articles: {str(e)}")
+            return []
+    
+    def esearch(self, search_term: str, max_results: int = MAX_ARTICLES,
+                mindate: Optional[str] = None, maxdate: Optional[str] = None,
+                datetype: str = 'edat') -> List[str]:
+        # like search_articles but raises on errors, for callers that must not
+        # mistake a failed request for an empty result.
+        # mindate/maxdate (YYYY/MM/DD) restrict results to a date range on datetype,
+        # edat is the date the record entered PubMed
+        return self.esearch_with_count(search_term, max_results, mindate, maxdate, datetype)[0]
+    
+    def esearch_with_count(self, search_term: str, max_results: int = MAX_ARTICLES,
+                           mindate: Optional[str] = None, maxdate: Optional[str] = None,
+                           datetype: str = 'edat') -> Tuple[List[str], int]:
+        # (pmids, count): up to max_results ids, paged with retstart
+        # ESEARCH_PAGE_SIZE at a time, and the number of matching records.
+        # PubMed serves at most the first ESEARCH_MAX_IDS ids of a query, a
+        # count above len(pmids) tells the caller it did not get everything
         params = {
             'db': 'pubmed',
             'term': search_term,
-            'retmax': max_results,
             'retmode': 'xml'
         }
+        if mindate or maxdate:
+            params.update({
+                'datetype': datetype,
+                'mindate': mindate or '1800/01/01',
+                'maxdate': maxdate or '3000/12/31'
+            })
         
-        try:
-            response = self.session.get(search_url, params=params)
-            response.raise_for_status()
+        limit = min(max_results, ESEARCH_MAX_IDS)
+        pmids = []
+        count = 0
+        while len(pmids) < limit:
+            params['retstart'] = len(pmids)
+            params['retmax'] = min(ESEARCH_PAGE_SIZE, limit - len(pmids))
+            with timed(self.metrics, 'esearch'):
+                response = self._eutils_request('esearch.fcgi', params)
             
             root = ET.fromstring(response.content)
-            pmids = []
-            
-            for id_elem in root.findall('.//Id'):
-                pmids.append(id_elem.text)
-            
-            logger.info(f"Found {len(pmids)} articles for search term: {search_term}")
-            return pmids
-            
-        except Exception as e:
-            logger.error(f"Error searching articles: {str(e)}")
-            return []
+            count = int(root.findtext('Count') or 0)
+            page = [id_elem.text for id_elem in root.findall('./IdList/Id')]
+            pmids.extend(page)
+            if not page or len(pmids) >= count:
+                break
+        
+        # records added while paging shift later pages, drop the repeats
+        pmids = list(dict.fromkeys(pmids))
+        logger.info(f"Found {len(pmids)} of {count} articles for search term: {search_term}")
+        return pmids, max(count, len(pmids))
     
     def fetch_article_details(self, pmid: str) -> Optional[Dict]:
-        fetch_url = f"{PUBMED_BASE_URL}efetch.fcgi"
         params = {
             'db': 'pubmed',
             'id': pmid,
@@ -54,33 +124,95 @@ class PubMedETL:
         }
         
         try:
-            response = self.session.get(fetch_url, params=params)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            article = root.find('.//PubmedArticle')
+            with timed(self.metrics, 'efetch'):
+                response = self._eutils_request('efetch.fcgi', params)
+            if self.metrics:
+                self.metrics.observe('efetch_bytes', len(response.content))
             
-            if article is None:
-                return None
+            # parse time includes the clean time, recorded per article by parse_article
+            with timed(self.metrics, 'parse'):
+                root = ET.fromstring(response.content)
+                article = root.find('.//PubmedArticle')
+                
+                if article is None:
+                    return None
+                
+                return self.parse_article(article, pmid)
             
-            # get article info
-            article_data = {
-                'pmid': pmid,
-                'title': self._extract_title(article),
-                'abstract': self._extract_abstract(article),
-                'publication_year': self._extract_year(article),
-                'journal_title': self._extract_journal_title(article),
-                'journal_issn': self._extract_journal_issn(article),
-                'authors': self._extract_authors(article),
-                'mesh_terms': self._extract_mesh_terms(article)
-            }
+        except Exception as e:
+            logger.error(f"Error fetching article {pmid}: {str(e)}")
+            return None
+    
+    def fetch_articles_batch(self, pmids: List[str]) -> Optional[List[Dict]]:
+        # one efetch call for many pmids, None if the request failed
+        params = {
+            'db': 'pubmed',
+            'id': ','.join(str(pmid) for pmid in pmids),
+            'retmode': 'xml'
+        }
+        
+        try:
+            with timed(self.metrics, 'efetch'):
+                response = self._eutils_request('efetch.fcgi', params, post=True)
+            if self.metrics:
+                self.metrics.observe('efetch_bytes', len(response.content))
             
-            return article_data
+            with timed(self.metrics, 'parse'):
+                return self.parse_articles(response.content)
             
         except Exception as e:
-            logger.error(f"Error fetching article {pmid}: {str(e)}")
+            logger.error(f"Error fetching batch of {len(pmids)} articles: {str(e)}")
             return None
     
+    def parse_article(self, article, pmid: Optional[str] = None) -> Dict:
+        # turn a PubmedArticle element into an article dict
+        if pmid is None:
+            pmid_elem = article.find('.//MedlineCitation/PMID')
+            pmid = pmid_elem.text if pmid_elem is not None else None
+        
+        # _clean_text adds to this, recorded as one 'clean' sample per article
+        self._clean_seconds = 0.0
+        parsed = {
+            'pmid': pmid,
+            'title': self._extract_title(article),
+            'abstract': self._extract_abstract(article),
+            'publication_year': self._extract_year(article),
+            'journal_title': self._extract_journal_title(article),
+            'journal_issn': self._extract_journal_issn(article),
+            'authors': self._extract_authors(article),
+            'mesh_terms': self._extract_mesh_terms(article)
+        }
+        if self.metrics:
+            self.metrics.observe('clean', self._clean_seconds)
+        return parsed
+    
+    def parse_articles(self, xml_content) -> List[Dict]:
+        # parse a PubmedArticleSet document (efetch response or file contents)
+        root = ET.fromstring(xml_content)
+        if root.tag == 'PubmedArticle':
+            return [self.parse_article(root)]
+        return [self.parse_article(article) for article in root.iter('PubmedArticle')]
+    
+    def iter_xml_file(self, path: str):
+        # stream articles from a PubmedArticleSet file without loading it all
+        for _, elem in ET.iterparse(path, events=('end',)):
+            if elem.tag == 'PubmedArticle':
+                yield self.parse_article(elem)
+                elem.clear()
+    
+    def load_articles(self, articles, batch_size: int = 500) -> int:
+        # bulk insert article dicts in batches, returns number inserted
+        inserted = 0
+        batch = []
+        for article_data in articles:
+            batch.append(article_data)
+            if len(batch) >= batch_size:
+                inserted += self.db.insert_articles_bulk(batch, self.metrics)
+                batch = []
+        if batch:
+            inserted += self.db.insert_articles_bulk(batch, self.metrics)
+        return inserted
+    
     def _extract_title(self, article) -> str:
         title_elem = article.find('.//ArticleTitle')
         if title_elem is not None:
@@ -157,22 +289,39 @@ class PubMedETL:
         if not text:
             return ""
         
+        started = time.perf_counter()
         # clean up text
         text = re.sub(r'\s+', ' ', text.strip())
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(text, 'html.parser')
         text = soup.get_text()
+        self._clean_seconds += time.perf_counter() - started
         
         return text
     
     def process_articles(self, search_term: str, max_articles: int = MAX_ARTICLES):
         logger.info(f"Starting ETL process for search term: {search_term}")
         
+        self.metrics = RunMetrics("etl")
+        try:
+            # profiled when PROFILE is set, the report is written after the profiler stops
+            with maybe_profile("etl") as profiler:
+                processed = self._process_articles(search_term, max_articles)
+            if not processed:
+                return None
+            return self._write_run_report(search_term, max_articles, profiler)
+        finally:
+            self.metrics = None
+    
+    def _process_articles(self, search_term: str, max_articles: int):
+        metrics = self.metrics
+        
         self.db.create_tables()
         pmids = self.search_articles(search_term, max_articles)
         
         if not pmids:
             logger.warning("No articles found!")
-            return
+            return None
         
         logger.info(f"Processing {len(pmids)} articles...")
         
@@ -180,20 +329,26 @@ class PubMedETL:
         error_count = 0
         
         for i, pmid in enumerate(pmids, 1):
-            logger.info(f"Processing article {i}/{len(pmids)}: {pmid}")
+            self.progress_log.log(logger, logging.INFO, 'process_article',
+                                  "Processing article %d/%d: %s", i, len(pmids), pmid)
             
             article_data = self.fetch_article_details(pmid)
             
             if article_data:
-                if self.db.insert_article_data(article_data):
+                with metrics.timer('db_insert'):
+                    inserted = self.db.insert_article_data(article_data, metrics)
+                if inserted:
                     success_count += 1
                 else:
                     error_count += 1
             else:
                 error_count += 1
+            metrics.incr('articles_processed')
             
             # small delay to not overwhelm the API
-            time.sleep(0.5)
+            if self.rate_limiter is None:
+                with metrics.timer('rate_limit_wait'):
+                    time.sleep(0.5)
         
         logger.info(f"ETL process completed!")
         logger.info(f"Successfully processed: {success_count} articles")
@@ -207,6 +362,22 @@ class PubMedETL:
         logger.info(f"MeSH terms: {stats['total_mesh_terms']}")
         if 'year_range' in stats:
             logger.info(f"Years: {stats['year_range']}")
+        
+        metrics.incr('articles_succeeded', success_count)
+        metrics.incr('articles_failed', error_count)
+        return True
+    
+    def _write_run_report(self, search_term: str, max_articles: int, profiler=None):
+        # per-stage timings, plus the top profiled functions when profiling was on
+        extra = {'search_term': search_term, 'max_articles': max_articles}
+        if profiler:
+            extra['profile'] = profiler.summary
+        
+        report_path = self.metrics.write_report(**extra)
+        logger.info(f"Run summary:\n{self.metrics.format_summary()}")
+        logger.info(f"Run report written to {report_path}")
+        
+        return self.metrics.report(report_path=report_path, **extra)
 
 def main():
     # get articles from different years
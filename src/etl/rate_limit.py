@@ -0,0 +1,68 @@
+"""
+Request rate limiters for the NCBI E-utilities.
+
+RateLimiter spaces requests inside one process. SharedRateLimiter keeps the
+next free request slot in a Postgres row, so every worker process on every
+host draws from the same budget.
+"""
+
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# the reservation, the update takes the row lock so concurrent reservations
+# queue up behind each other and each one gets its own slot
+RESERVE_SLOT_SQL = """
+UPDATE etl_rate_limits
+SET next_slot = GREATEST(next_slot, clock_timestamp()) + make_interval(secs => :interval)
+WHERE name = :name
+RETURNING EXTRACT(EPOCH FROM next_slot - make_interval(secs => :interval) - clock_timestamp())
+"""
+
+class RateLimiter:
+    # at most `rate` acquires per second in this process
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # reserve the next slot and sleep until it starts, returns seconds waited
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+class SharedRateLimiter:
+    # at most `rate` acquires per second across every process using the same name
+
+    def __init__(self, db, rate, name="ncbi_eutils"):
+        # sqlalchemy is imported here, RateLimiter alone (the CLI) does not need it
+        from sqlalchemy import text
+        self.db = db
+        self.rate = rate
+        self.name = name
+        self.interval = 1.0 / rate if rate else 0.0
+        self._reserve = text(RESERVE_SLOT_SQL)
+        self._ensure_row()
+
+    def _ensure_row(self):
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        from src.database.models import EtlRateLimit
+        with self.db.engine.begin() as conn:
+            conn.execute(pg_insert(EtlRateLimit).values(name=self.name).on_conflict_do_nothing())
+
+    def acquire(self):
+        with self.db.engine.begin() as conn:
+            wait = conn.execute(self._reserve, {'name': self.name, 'interval': self.interval}).scalar()
+        wait = float(wait or 0.0)
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
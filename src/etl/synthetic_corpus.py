@@ -0,0 +1,243 @@
+"""
+Synthetic PubMed corpus generator for scale testing.
+
+Produces realistic article dicts (same shape as PubMedETL.fetch_article_details)
+and PubmedArticle XML, with configurable distributions for authors per article,
+MeSH terms per article, journal popularity, abstract length and publication
+year. Output can be fed to the ETL parser (PubMedETL.parse_articles /
+iter_xml_file) or straight into DatabaseManager.insert_articles_bulk.
+"""
+
+import math
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterator, List
+from xml.sax.saxutils import escape
+
+# synthetic pmids start here, far above real PubMed pmids (about 40M), so
+# synthetic rows never overwrite real articles in a shared database or back
+SYNTHETIC_PMID_START = 900000000
+
+_WORDS = [
+    "machine", "learning", "cancer", "therapy", "clinical", "outcomes", "patients",
+    "model", "risk", "imaging", "genomic", "analysis", "cohort", "treatment",
+    "diabetes", "vaccine", "response", "neural", "network", "prediction", "protein",
+    "expression", "cell", "tumor", "immune", "infection", "randomized", "trial",
+    "mortality", "association", "biomarker", "sequencing", "inflammation", "brain",
+    "cardiovascular", "screening", "surgery", "children", "elderly", "survival",
+    "resistance", "pathway", "mutation", "receptor", "dose", "efficacy", "safety",
+    "population", "incidence", "diagnosis",
+]
+_JOURNAL_PREFIXES = ["Journal of", "Annals of", "International Journal of",
+                     "Archives of", "Reviews in", "Frontiers in"]
+_JOURNAL_FIELDS = ["Medicine", "Oncology", "Cardiology", "Immunology", "Neurology",
+                   "Genetics", "Epidemiology", "Pediatrics", "Radiology", "Surgery",
+                   "Informatics", "Pharmacology", "Public Health", "Microbiology"]
+_LAST_NAMES = ["Smith", "Wang", "Garcia", "Kumar", "Muller", "Kim", "Silva", "Rossi",
+               "Nguyen", "Ivanov", "Cohen", "Tanaka", "Okafor", "Larsen", "Dubois",
+               "Novak", "Haddad", "Chen", "Lopez", "Patel", "Schmidt", "Sato", "Ali"]
+_NAME_SUFFIXES = ["", "son", "er", "ova", "ez", "i", "berg", "ski", "ani", "o"]
+_FIRST_NAMES = ["John", "Wei", "Maria", "Priya", "Anna", "Jae", "Lucas", "Giulia",
+                "Ahmed", "Olga", "Kenji", "Chidi", "Ingrid", "Pierre", "Sofia", "Li"]
+_MESH_HEADINGS = ["Humans", "Female", "Male", "Adult", "Middle Aged", "Aged",
+                  "Animals", "Mice", "Child", "Adolescent", "Neoplasms", "Retrospective Studies",
+                  "Machine Learning", "COVID-19", "Diabetes Mellitus", "Risk Factors",
+                  "Prognosis", "Treatment Outcome", "Cohort Studies", "Young Adult"]
+_MESH_QUALIFIERS = ["Therapy", "Diagnosis", "Genetics", "Metabolism", "Epidemiology",
+                    "Pathology", "Immunology", "Prevention", "Drug Effects", "Physiology"]
+
+
+class CorpusConfig:
+    # distribution settings for the generator
+
+    def __init__(self, seed=42, pmid_start=SYNTHETIC_PMID_START,
+                 authors_mean=6.0, authors_sigma=0.6, authors_max=50, author_pool_size=200000,
+                 mesh_mean=10.0, mesh_sigma=0.5, mesh_max=40, mesh_missing_rate=0.1,
+                 mesh_vocabulary_size=5000,
+                 journal_count=2000, journal_zipf=1.1,
+                 abstract_words_mean=220, abstract_words_sd=80, abstract_missing_rate=0.05,
+                 year_start=1990, year_end=2025, year_growth=1.06):
+        self.seed = seed
+        self.pmid_start = pmid_start
+        self.authors_mean = authors_mean
+        self.authors_sigma = authors_sigma
+        self.authors_max = authors_max
+        self.author_pool_size = author_pool_size
+        self.mesh_mean = mesh_mean
+        self.mesh_sigma = mesh_sigma
+        self.mesh_max = mesh_max
+        self.mesh_missing_rate = mesh_missing_rate
+        self.mesh_vocabulary_size = mesh_vocabulary_size
+        self.journal_count = journal_count
+        self.journal_zipf = journal_zipf
+        self.abstract_words_mean = abstract_words_mean
+        self.abstract_words_sd = abstract_words_sd
+        self.abstract_missing_rate = abstract_missing_rate
+        self.year_start = year_start
+        self.year_end = year_end
+        self.year_growth = year_growth
+
+
+def _zipf_cum_weights(n, exponent):
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _lognormal_count(rng, mean, sigma, low, high):
+    # lognormal count with the requested mean, clipped to [low, high]
+    mu = math.log(max(mean, 0.1)) - sigma * sigma / 2
+    return max(low, min(high, int(round(rng.lognormvariate(mu, sigma)))))
+
+
+class SyntheticCorpus:
+    """Deterministic generator of PubMed-like articles"""
+
+    def __init__(self, config: CorpusConfig = None):
+        self.config = config or CorpusConfig()
+        cfg = self.config
+
+        # popularity: a few journals/authors/terms account for most rows
+        self._journal_weights = _zipf_cum_weights(cfg.journal_count, cfg.journal_zipf)
+        self._author_weights = _zipf_cum_weights(cfg.author_pool_size, 1.0)
+        self._mesh_weights = _zipf_cum_weights(cfg.mesh_vocabulary_size, 1.0)
+
+        years = list(range(cfg.year_start, cfg.year_end + 1))
+        self._years = years
+        self._year_weights = list(accumulate(cfg.year_growth ** (year - cfg.year_start) for year in years))
+
+    @staticmethod
+    def _pick(rng, cum_weights):
+        # index drawn according to cumulative weights
+        return bisect_left(cum_weights, rng.random() * cum_weights[-1])
+
+    def journal(self, index):
+        # deterministic journal title/issn for a journal index
+        prefix = _JOURNAL_PREFIXES[index % len(_JOURNAL_PREFIXES)]
+        field = _JOURNAL_FIELDS[(index // len(_JOURNAL_PREFIXES)) % len(_JOURNAL_FIELDS)]
+        series = index // (len(_JOURNAL_PREFIXES) * len(_JOURNAL_FIELDS))
+        title = f"{prefix} {field}" + (f" {series + 1}" if series else "")
+        issn = f"{1000 + index % 9000:04d}-{(index * 7919) % 10000:04d}"
+        return title, issn
+
+    def author(self, index):
+        # deterministic author for an author index
+        last = _LAST_NAMES[index % len(_LAST_NAMES)]
+        rest = index // len(_LAST_NAMES)
+        last += _NAME_SUFFIXES[rest % len(_NAME_SUFFIXES)]
+        rest //= len(_NAME_SUFFIXES)
+        first = _FIRST_NAMES[rest % len(_FIRST_NAMES)]
+        rest //= len(_FIRST_NAMES)
+        if rest:
+            # keep every (last, first) pair unique for large pools
+            last += f"-{_LAST_NAMES[(rest - 1) % len(_LAST_NAMES)]}"
+            if rest > len(_LAST_NAMES):
+                first += f" {rest // len(_LAST_NAMES)}"
+        middle = chr(ord('A') + index % 26) if index % 3 == 0 else ""
+        return {
+            'last_name': last,
+            'first_name': first,
+            'middle_name': middle,
+            'full_name': " ".join(part for part in [first, middle, last] if part)
+        }
+
+    def mesh_term(self, index):
+        # deterministic, unique mesh term for a vocabulary index
+        if index < len(_MESH_HEADINGS):
+            return _MESH_HEADINGS[index]
+        index -= len(_MESH_HEADINGS)
+        word = _WORDS[index % len(_WORDS)].capitalize()
+        qualifier = _MESH_QUALIFIERS[(index // len(_WORDS)) % len(_MESH_QUALIFIERS)]
+        series = index // (len(_WORDS) * len(_MESH_QUALIFIERS))
+        return f"{word} {qualifier}" + (f" {series + 1}" if series else "")
+
+    def article(self, pmid) -> Dict:
+        # build the article dict for a pmid, always the same for the same seed
+        cfg = self.config
+        rng = random.Random(f"{cfg.seed}:{pmid}")
+
+        title_words = [rng.choice(_WORDS) for _ in range(rng.randint(6, 18))]
+        title = " ".join(title_words).capitalize() + "."
+
+        abstract = ""
+        if rng.random() >= cfg.abstract_missing_rate:
+            n_words = max(20, int(rng.gauss(cfg.abstract_words_mean, cfg.abstract_words_sd)))
+            words = [rng.choice(_WORDS) for _ in range(n_words)]
+            sentences = [" ".join(words[i:i + 15]).capitalize() + "." for i in range(0, n_words, 15)]
+            abstract = " ".join(sentences)
+
+        journal_title, journal_issn = self.journal(self._pick(rng, self._journal_weights))
+
+        authors = []
+        seen = set()
+        for _ in range(_lognormal_count(rng, cfg.authors_mean, cfg.authors_sigma, 1, cfg.authors_max)):
+            author_index = self._pick(rng, self._author_weights)
+            if author_index not in seen:
+                seen.add(author_index)
+                authors.append(self.author(author_index))
+
+        mesh_terms = []
+        if rng.random() >= cfg.mesh_missing_rate:
+            seen = set()
+            for _ in range(_lognormal_count(rng, cfg.mesh_mean, cfg.mesh_sigma, 1, cfg.mesh_max)):
+                mesh_index = self._pick(rng, self._mesh_weights)
+                if mesh_index not in seen:
+                    seen.add(mesh_index)
+                    mesh_terms.append(self.mesh_term(mesh_index))
+
+        return {
+            'pmid': str(pmid),
+            'title': title,
+            'abstract': abstract,
+            'publication_year': self._years[self._pick(rng, self._year_weights)],
+            'journal_title': journal_title,
+            'journal_issn': journal_issn,
+            'authors': authors,
+            'mesh_terms': mesh_terms
+        }
+
+    def iter_articles(self, count, start=0) -> Iterator[Dict]:
+        # articles for pmids pmid_start + start ... pmid_start + start + count - 1
+        first = self.config.pmid_start + start
+        for pmid in range(first, first + count):
+            yield self.article(pmid)
+
+    def articles(self, count, start=0) -> List[Dict]:
+        return list(self.iter_articles(count, start))
+
+    @staticmethod
+    def to_xml(article: Dict) -> str:
+        # render an article dict as a PubmedArticle element
+        authors = []
+        for author in article['authors']:
+            middle = f"<MiddleName>{escape(author['middle_name'])}</MiddleName>" if author['middle_name'] else ""
+            authors.append(
+                f"<Author><LastName>{escape(author['last_name'])}</LastName>"
+                f"<ForeName>{escape(author['first_name'])}</ForeName>{middle}</Author>"
+            )
+        mesh = "".join(
+            f"<MeshHeading><DescriptorName>{escape(term)}</DescriptorName></MeshHeading>"
+            for term in article['mesh_terms']
+        )
+        abstract = (f"<Abstract><AbstractText>{escape(article['abstract'])}</AbstractText></Abstract>"
+                    if article['abstract'] else "")
+        year = article['publication_year']
+
+        return (
+            f"<PubmedArticle><MedlineCitation><PMID>{article['pmid']}</PMID><Article>"
+            f"<Journal><ISSN>{escape(article['journal_issn'] or '')}</ISSN>"
+            f"<JournalIssue><PubDate><Year>{year}</Year></PubDate></JournalIssue>"
+            f"<Title>{escape(article['journal_title'])}</Title></Journal>"
+            f"<ArticleTitle>{escape(article['title'])}</ArticleTitle>{abstract}"
+            f"<AuthorList>{''.join(authors)}</AuthorList></Article>"
+            f"<MeshHeadingList>{mesh}</MeshHeadingList>"
+            f"</MedlineCitation></PubmedArticle>"
+        )
+
+    def write_xml(self, path, count, start=0):
+        # stream a PubmedArticleSet file, memory use does not grow with count
+        with open(path, "w") as f:
+            f.write('<?xml version="1.0" ?>\n<PubmedArticleSet>\n')
+            for article in self.iter_articles(count, start):
+                f.write(self.to_xml(article))
+                f.write("\n")
+            f.write("</PubmedArticleSet>\n")
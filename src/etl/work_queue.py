@@ -0,0 +1,262 @@
+"""
+Postgres-backed work queue for running the ETL on many workers.
+
+PMIDs are enqueued in batches as rows of etl_jobs. Workers claim a batch with
+SELECT ... FOR UPDATE SKIP LOCKED, hold a lease on it that a heartbeat thread
+keeps extending, then fetch, parse and bulk insert the batch. A job whose lease
+ran out (crashed or stuck worker) is claimed again by the next worker, up to
+max_attempts. Lease times come from the database clock so hosts do not need
+synchronized clocks.
+"""
+
+import os
+import socket
+import sys
+import threading
+from datetime import timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from sqlalchemy import func, or_, and_
+
+from src.config.config import ETL_JOB_BATCH_SIZE, ETL_LEASE_SECONDS, ETL_MAX_ATTEMPTS
+from src.database.models import EtlJob
+from src.utils.logger import get_logger
+
+logger = get_logger("work_queue")
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    # the etl_jobs table, shared by every worker connected to the same database
+
+    def __init__(self, db, lease_seconds=ETL_LEASE_SECONDS, max_attempts=ETL_MAX_ATTEMPTS):
+        self.db = db
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, pmids, batch_size=ETL_JOB_BATCH_SIZE, search_term=None):
+        # split pmids into jobs, returns the number of jobs created
+        pmids = [str(pmid) for pmid in pmids]
+        session = self.db.get_session()
+        try:
+            jobs = [
+                EtlJob(search_term=search_term, pmids=','.join(pmids[i:i + batch_size]))
+                for i in range(0, len(pmids), batch_size)
+            ]
+            session.add_all(jobs)
+            session.commit()
+            logger.info(f"Enqueued {len(pmids)} pmids as {len(jobs)} jobs")
+            return len(jobs)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error enqueueing jobs: {str(e)}")
+            return 0
+        finally:
+            session.close()
+
+    def _lease_expiry(self):
+        return func.now() + timedelta(seconds=self.lease_seconds)
+
+    def claim(self, worker_id):
+        # lock the oldest claimable job, skipping rows other workers hold locks on,
+        # and lease it to this worker. returns {'id', 'pmids', 'attempts'} or None
+        session = self.db.get_session()
+        try:
+            job = session.query(EtlJob).filter(
+                EtlJob.attempts < self.max_attempts,
+                or_(
+                    EtlJob.status == 'pending',
+                    and_(EtlJob.status == 'running', EtlJob.lease_expires_at < func.now())
+                )
+            ).order_by(EtlJob.id).with_for_update(skip_locked=True).first()
+
+            if job is None:
+                session.rollback()
+                return None
+
+            if job.status == 'running':
+                logger.warning(f"Reclaiming job {job.id} from {job.worker_id}, lease expired")
+            job.status = 'running'
+            job.worker_id = worker_id
+            job.attempts += 1
+            job.lease_expires_at = self._lease_expiry()
+            job.heartbeat_at = func.now()
+            job.updated_at = func.now()
+            claimed = {'id': job.id, 'pmids': job.pmids.split(','), 'attempts': job.attempts}
+            session.commit()
+            return claimed
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming job: {str(e)}")
+            return None
+        finally:
+            session.close()
+
+    def _update_owned(self, job_id, worker_id, values):
+        # only touches the job while this worker still holds its lease
+        session = self.db.get_session()
+        try:
+            updated = session.query(EtlJob).filter(
+                EtlJob.id == job_id,
+                EtlJob.worker_id == worker_id,
+                EtlJob.status == 'running'
+            ).update(dict(values, updated_at=func.now()), synchronize_session=False)
+            session.commit()
+            return updated == 1
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating job {job_id}: {str(e)}")
+            return False
+        finally:
+            session.close()
+
+    def heartbeat(self, job_id, worker_id):
+        # extend the lease, False means the job was reclaimed by someone else
+        return self._update_owned(job_id, worker_id, {
+            'lease_expires_at': self._lease_expiry(),
+            'heartbeat_at': func.now()
+        })
+
+    def complete(self, job_id, worker_id, articles_inserted):
+        return self._update_owned(job_id, worker_id, {
+            'status': 'done',
+            'articles_inserted': articles_inserted,
+            'lease_expires_at': None,
+            'last_error': None
+        })
+
+    def fail(self, job_id, worker_id, error, attempts):
+        # back to pending for another try, or failed once attempts run out
+        status = 'failed' if attempts >= self.max_attempts else 'pending'
+        return self._update_owned(job_id, worker_id, {
+            'status': status,
+            'worker_id': None,
+            'lease_expires_at': None,
+            'last_error': str(error)[:2000]
+        })
+
+    def fail_exhausted(self):
+        # expired leases that have no attempts left will never be claimed again
+        session = self.db.get_session()
+        try:
+            updated = session.query(EtlJob).filter(
+                EtlJob.status == 'running',
+                EtlJob.lease_expires_at < func.now(),
+                EtlJob.attempts >= self.max_attempts
+            ).update({'status': 'failed', 'last_error': 'lease expired', 'updated_at': func.now()},
+                     synchronize_session=False)
+            session.commit()
+            return updated
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error failing exhausted jobs: {str(e)}")
+            return 0
+        finally:
+            session.close()
+
+    def get_status(self):
+        # job counts by status and articles inserted so far
+        session = self.db.get_session()
+        try:
+            counts = dict(session.query(EtlJob.status, func.count(EtlJob.id)).group_by(EtlJob.status).all())
+            inserted = session.query(func.coalesce(func.sum(EtlJob.articles_inserted), 0)).scalar()
+            workers = session.query(func.count(func.distinct(EtlJob.worker_id))).filter(
+                EtlJob.status == 'running').scalar()
+            return {
+                'pending': counts.get('pending', 0),
+                'running': counts.get('running', 0),
+                'done': counts.get('done', 0),
+                'failed': counts.get('failed', 0),
+                'articles_inserted': int(inserted),
+                'active_workers': workers
+            }
+        except Exception as e:
+            logger.error(f"Error getting queue status: {str(e)}")
+            return {}
+        finally:
+            session.close()
+
+class _Heartbeat:
+    # extends a job lease in the background while the worker is busy with it
+
+    def __init__(self, queue, job_id, worker_id, interval):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.queue.heartbeat(self.job_id, self.worker_id):
+                logger.warning(f"Lost lease on job {self.job_id}")
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+class EtlWorker:
+    # pulls jobs off the queue and runs fetch -> parse -> bulk insert
+
+    def __init__(self, queue, etl, worker_id=None, heartbeat_interval=None, idle_sleep=5.0):
+        self.queue = queue
+        self.etl = etl
+        self.worker_id = worker_id or default_worker_id()
+        self.heartbeat_interval = heartbeat_interval or max(queue.lease_seconds / 3.0, 1.0)
+        self.idle_sleep = idle_sleep
+        self.stats = {'jobs_done': 0, 'jobs_failed': 0, 'articles_inserted': 0}
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def process_job(self, job):
+        with _Heartbeat(self.queue, job['id'], self.worker_id, self.heartbeat_interval) as heartbeat:
+            try:
+                articles = self.etl.fetch_articles_batch(job['pmids'])
+                if articles is None:
+                    raise RuntimeError("efetch failed")
+                # raises when the batch could not be written, the job is failed below
+                inserted = self.etl.db.insert_articles_bulk(articles, self.etl.metrics)
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed on attempt {job['attempts']}: {str(e)}")
+                self.queue.fail(job['id'], self.worker_id, e, job['attempts'])
+                self.stats['jobs_failed'] += 1
+                return False
+
+        if heartbeat.lost:
+            # another worker owns the job now, rows inserted here are skipped there
+            return False
+        self.queue.complete(job['id'], self.worker_id, inserted)
+        self.stats['jobs_done'] += 1
+        self.stats['articles_inserted'] += inserted
+        logger.info(f"Job {job['id']}: {inserted} of {len(job['pmids'])} articles inserted")
+        return True
+
+    def run(self, max_jobs=None, exit_when_empty=False):
+        # claim and process jobs until stopped, returns the worker stats
+        logger.info(f"Worker {self.worker_id} started")
+        processed = 0
+        while not self._stop.is_set():
+            if max_jobs is not None and processed >= max_jobs:
+                break
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                self.queue.fail_exhausted()
+                if exit_when_empty:
+                    break
+                self._stop.wait(self.idle_sleep)
+                continue
+            self.process_job(job)
+            processed += 1
+        logger.info(f"Worker {self.worker_id} stopped: {self.stats}")
+        return self.stats
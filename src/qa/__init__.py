@@ -0,0 +1 @@
+# AI Q&A module
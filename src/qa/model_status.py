@@ -0,0 +1,115 @@
+"""
+Shared, cached answer to "is the Q&A model usable right now".
+
+Page renders and health checks read the last known status and never wait
+for the model: when the status is older than its TTL a probe starts on a
+background thread and the caller gets the previous answer (or 'checking'
+on the very first call). The probe is the provider's check(), for Gemini
+a metadata lookup that costs no generation call. Real Q&A calls report their
+outcome too, so a failing model shows up without waiting for the next probe.
+"""
+
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.config import GEMINI_STATUS_TTL_SECONDS, GEMINI_STATUS_RETRY_SECONDS
+from src.utils.logger import get_logger
+
+logger = get_logger("qa")
+
+CHECKING = 'checking'
+AVAILABLE = 'available'
+UNAVAILABLE = 'unavailable'
+NOT_CONFIGURED = 'not_configured'
+
+class ModelStatus:
+    def __init__(self, probe=None, ttl_seconds=GEMINI_STATUS_TTL_SECONDS,
+                 retry_seconds=GEMINI_STATUS_RETRY_SECONDS):
+        # probe: callable returning (ok, message), None when no model is configured
+        self.probe = probe
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._state = CHECKING if probe else NOT_CONFIGURED
+        self._message = '' if probe else "LLM provider not configured"
+        self._checked_at = None
+        self._latency_ms = None
+        self._probing = None
+        self._lock = threading.Lock()
+
+    def _stale(self, now):
+        if self._checked_at is None:
+            return True
+        ttl = self.ttl_seconds if self._state == AVAILABLE else self.retry_seconds
+        return now - self._checked_at >= ttl
+
+    def _run_probe(self):
+        started = time.perf_counter()
+        try:
+            ok, message = self.probe()
+        except Exception as e:
+            ok, message = False, str(e)
+        self._set(ok, message, (time.perf_counter() - started) * 1000, probed=True)
+
+    def _set(self, ok, message, latency_ms=None, probed=False):
+        with self._lock:
+            changed = self._state != (AVAILABLE if ok else UNAVAILABLE)
+            self._state = AVAILABLE if ok else UNAVAILABLE
+            self._message = message
+            self._checked_at = time.monotonic()
+            if latency_ms is not None:
+                self._latency_ms = latency_ms
+            if probed:
+                self._probing = None
+        if changed:
+            log = logger.info if ok else logger.warning
+            log(f"LLM model {self._state}: {message}")
+
+    def refresh(self, wait=None):
+        # start a probe unless one is running, wait up to `wait` seconds for it
+        if self.probe is None:
+            return self.status()
+        with self._lock:
+            thread = self._probing
+            if thread is None:
+                thread = threading.Thread(target=self._run_probe, name="gemini-status", daemon=True)
+                self._probing = thread
+                thread.start()
+        if wait:
+            thread.join(wait)
+        return self.status()
+
+    def status(self):
+        # {'state', 'message', 'age_seconds', 'latency_ms'}, probes in the
+        # background when the cached answer is too old. never blocks
+        now = time.monotonic()
+        if self.probe is not None and self._probing is None and self._stale(now):
+            self.refresh()
+        with self._lock:
+            return {
+                'state': self._state,
+                'message': self._message,
+                'age_seconds': None if self._checked_at is None else now - self._checked_at,
+                'latency_ms': self._latency_ms,
+            }
+
+    def record_success(self):
+        self._set(True, "Last request succeeded")
+
+    def record_failure(self, error):
+        self._set(False, str(error))
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_model_status():
+    # one status per process, shared by the UI and the health checks
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from src.qa.providers import get_provider
+            provider = get_provider()
+            _shared = ModelStatus(provider.check if provider else None)
+        return _shared
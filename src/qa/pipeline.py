@@ -0,0 +1,30 @@
+"""
+The whole Q&A round trip behind the AI Q&A tab: question -> SQL (cache or
+provider) -> governed query. The Streamlit app renders its result, the
+Q&A benchmark drives it directly.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.database.query_governor import QueryRejectedError
+
+def answer_question(generator, governor, question):
+    # {'sql', 'cached', 'results', 'report', 'error'}; results is None and
+    # error is set when the governor rejected the SQL. generation problems
+    # raise SqlGenerationError / ProviderError
+    sql_query, cached = generator.generate(question)
+    answer = {'sql': sql_query, 'cached': cached, 'results': None, 'report': None, 'error': None}
+    try:
+        answer['results'], answer['report'] = governor.run(sql_query)
+    except QueryRejectedError as e:
+        answer['error'] = str(e)
+        # don't keep serving SQL that no longer runs
+        if cached:
+            generator.forget(question)
+        return answer
+
+    if not cached:
+        generator.remember(question, sql_query)
+    return answer
@@ -0,0 +1,171 @@
+"""
+Prompts for the question -> SQL path.
+
+The schema part is rendered from models.Base.metadata: one line per table
+with compact column types, primary keys, indexed columns and foreign keys
+(`-> table.column`), which are the join paths the indexes cover. It only
+changes with the models, so it is rendered once per schema version.
+
+Few-shot examples are the verified question/SQL pairs closest to the new
+question: a handful of curated seed examples plus SQL from the Q&A cache,
+which only holds queries that ran successfully. Similarity is word overlap
+of the normalized questions, good enough to pick "top journals in 2020"
+for "top journals in 2023" and cheap to compute per request.
+"""
+
+import re
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from sqlalchemy import Integer, DateTime, Date
+
+from src.config.config import QA_FEW_SHOT_EXAMPLES, QA_EXAMPLES_REFRESH_SECONDS
+from src.database.models import Base
+from src.qa.sql_cache import QA_TABLES, normalize_question, schema_version
+from src.utils.logger import get_logger
+
+logger = get_logger("qa")
+
+# bookkeeping columns the model never needs
+HIDDEN_COLUMNS = {'created_at', 'content_hash'}
+
+RULES = """Rules: PostgreSQL. Reply with one SELECT statement only, no markdown or explanation.
+Join only along the -> keys. Add LIMIT 100 unless the result is aggregated.
+Match text case-insensitively with ILIKE '%word%'. Filter years with publication_year = N."""
+
+# verified examples, also the answers of the offline stub provider
+SEED_EXAMPLES = [
+    ("How many articles are there?", "SELECT COUNT(*) AS articles FROM articles"),
+    ("How many articles were published in 2024?",
+     "SELECT COUNT(*) AS articles FROM articles WHERE publication_year = 2024"),
+    ("Which journals have the most articles?",
+     "SELECT j.title, COUNT(*) AS articles FROM articles a JOIN journals j ON j.id = a.journal_id "
+     "GROUP BY j.title ORDER BY articles DESC LIMIT 10"),
+    ("Who are the most prolific authors?",
+     "SELECT au.full_name, COUNT(*) AS articles FROM article_authors aa JOIN authors au ON au.id = aa.author_id "
+     "GROUP BY au.full_name ORDER BY articles DESC LIMIT 10"),
+    ("What are the most common MeSH terms?",
+     "SELECT m.term, COUNT(*) AS articles FROM article_mesh_terms am JOIN mesh_terms m ON m.id = am.mesh_term_id "
+     "GROUP BY m.term ORDER BY articles DESC LIMIT 15"),
+]
+
+_STOPWORDS = {'a', 'an', 'the', 'of', 'in', 'on', 'for', 'to', 'and', 'or', 'with', 'by', 'from', 'is', 'are',
+              'was', 'were', 'be', 'what', 'which', 'who', 'how', 'do', 'does', 'did', 'me', 'show', 'list',
+              'give', 'all', 'that', 'there', 'have', 'has'}
+
+def _type_name(column):
+    if isinstance(column.type, Integer):
+        return 'int'
+    if isinstance(column.type, DateTime):
+        return 'timestamp'
+    if isinstance(column.type, Date):
+        return 'date'
+    return 'text'
+
+def _render_table(table):
+    indexed = set()
+    composite = []
+    for index in table.indexes:
+        names = [column.name for column in index.columns]
+        if len(names) == 1:
+            indexed.add(names[0])
+        else:
+            composite.append(names)
+    unique = {column.name for column in table.columns if column.unique}
+
+    columns = []
+    for column in table.columns:
+        if column.name in HIDDEN_COLUMNS:
+            continue
+        parts = [column.name, _type_name(column)]
+        if column.primary_key:
+            parts.append('pk')
+        elif column.name in unique:
+            parts.append('unique')
+        if column.name in indexed:
+            parts.append('idx')
+        for key in column.foreign_keys:
+            parts.append(f"-> {key.target_fullname}")
+        columns.append(' '.join(parts))
+
+    line = f"{table.name}({', '.join(columns)})"
+    for names in composite:
+        line += f" idx({', '.join(names)})"
+    return line
+
+_schema_cache = {}
+_schema_lock = threading.Lock()
+
+def render_schema():
+    # compact schema of the Q&A tables, rendered once per schema version
+    version = schema_version()
+    with _schema_lock:
+        if version not in _schema_cache:
+            _schema_cache[version] = '\n'.join(
+                _render_table(Base.metadata.tables[name]) for name in QA_TABLES)
+        return _schema_cache[version]
+
+def _words(question):
+    return set(re.findall(r'[a-z0-9]+', normalize_question(question))) - _STOPWORDS
+
+def similarity(a, b):
+    # word overlap (jaccard) of two questions, 0..1
+    words_a, words_b = _words(a), _words(b)
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+class PromptBuilder:
+    def __init__(self, cache=None, max_examples=QA_FEW_SHOT_EXAMPLES, min_similarity=0.2,
+                 refresh_seconds=QA_EXAMPLES_REFRESH_SECONDS, seed_examples=SEED_EXAMPLES):
+        # cache: SqlCache whose entries become few-shot candidates
+        self.cache = cache
+        self.max_examples = max_examples
+        self.min_similarity = min_similarity
+        self.refresh_seconds = refresh_seconds
+        self.seed_examples = list(seed_examples)
+        self._cached_examples = []
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _candidates(self):
+        # seed examples plus a snapshot of the cache, reloaded every refresh_seconds
+        if self.cache is not None:
+            with self._lock:
+                now = time.monotonic()
+                if self._loaded_at is None or now - self._loaded_at >= self.refresh_seconds:
+                    self._cached_examples = self.cache.verified_examples()
+                    self._loaded_at = now
+                cached = self._cached_examples
+        else:
+            cached = []
+        return self.seed_examples + cached
+
+    def examples(self, question):
+        # the most similar verified (question, sql) pairs, best first
+        target = normalize_question(question)
+        scored = {}
+        for example_question, sql in self._candidates():
+            normalized = normalize_question(example_question)
+            if normalized == target or normalized in scored:
+                continue
+            score = similarity(question, example_question)
+            if score >= self.min_similarity:
+                scored[normalized] = (score, example_question, sql)
+        best = sorted(scored.values(), key=lambda item: item[0], reverse=True)[:self.max_examples]
+        return [(example_question, sql) for _, example_question, sql in best]
+
+    def build(self, question):
+        parts = ["Schema:", render_schema(), "", RULES]
+        examples = self.examples(question)
+        if examples:
+            parts.append("")
+            parts.append("Examples:")
+            for example_question, sql in examples:
+                parts.append(f"Q: {example_question}\nSQL: {sql}")
+        parts.append("")
+        parts.append(f"Q: {question.strip()}\nSQL:")
+        return '\n'.join(parts)
@@ -0,0 +1,187 @@
+"""
+LLM providers for the question -> SQL path.
+
+LLMProvider does the bookkeeping every backend needs: a concurrency limit
+(callers wait up to the timeout for a slot), a per-request timeout, retries
+with exponential backoff for transient errors, and latency counters.
+Backends implement _generate(prompt, question, kind, timeout) and check().
+
+    gemini  google.generativeai, the default
+    stub    offline and deterministic: known questions map to fixed SQL after
+            a configurable latency, for tests and load tests
+
+LLM_PROVIDER picks the backend for the app, see get_provider().
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.config import (LLM_PROVIDER, LLM_TIMEOUT_SECONDS, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF_SECONDS,
+                               LLM_MAX_CONCURRENCY, LLM_STUB_LATENCY_MS, LLM_STUB_JITTER_MS, LLM_STUB_ANSWERS)
+from src.qa.prompt_builder import SEED_EXAMPLES
+from src.qa.sql_cache import normalize_question
+from src.utils.logger import get_logger
+
+logger = get_logger("qa")
+
+PROVIDERS = ['gemini', 'stub']
+
+# google.api_core exception names worth another attempt (rate limits, overload, timeouts)
+_TRANSIENT_ERRORS = {'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded',
+                     'InternalServerError', 'TooManyRequests', 'GatewayTimeout'}
+
+class ProviderError(RuntimeError):
+    # the provider gave no answer: busy, timed out or failed after retries
+    pass
+
+class TransientProviderError(ProviderError):
+    # raised by backends for failures a retry may fix
+    pass
+
+def _is_transient(error):
+    return (isinstance(error, (TransientProviderError, TimeoutError, ConnectionError))
+            or type(error).__name__ in _TRANSIENT_ERRORS)
+
+class LLMProvider:
+    name = 'base'
+
+    def __init__(self, timeout=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES,
+                 retry_backoff=LLM_RETRY_BACKOFF_SECONDS, max_concurrency=LLM_MAX_CONCURRENCY):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'failures': 0, 'retries': 0, 'busy': 0, 'total_ms': 0.0}
+
+    def _generate(self, prompt, question, kind, timeout):
+        # returns the model's text
+        raise NotImplementedError
+
+    def check(self):
+        # (ok, message) without a generation call where the backend allows it
+        raise NotImplementedError
+
+    def _count(self, key, value=1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def generate(self, prompt, question=None, kind='sql'):
+        # the model's answer to prompt, raises ProviderError. question (the raw
+        # user question) and kind ('sql' or 'answer') are only read by the stub
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count('busy')
+            raise ProviderError(f"{self.name}: no free slot within {self.timeout:.0f}s "
+                                f"({self.max_concurrency} requests running)")
+        try:
+            attempt = 0
+            while True:
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    raise ProviderError(f"{self.name}: timed out after {self.timeout:.0f}s")
+                try:
+                    return self._generate(prompt, question, kind, remaining)
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_transient(e):
+                        self._count('failures')
+                        if isinstance(e, ProviderError):
+                            raise
+                        raise ProviderError(f"{self.name}: {str(e)}") from e
+                    attempt += 1
+                    self._count('retries')
+                    delay = self.retry_backoff * 2 ** (attempt - 1)
+                    logger.warning(f"{self.name} request failed ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+                    time.sleep(delay)
+        finally:
+            self._slots.release()
+            self._count('requests')
+            self._count('total_ms', (time.perf_counter() - started) * 1000)
+
+class GeminiProvider(LLMProvider):
+    name = 'gemini'
+
+    def __init__(self, config=None, **kwargs):
+        super().__init__(**kwargs)
+        from src.config.gemini_model_config import GeminiModelConfig
+        self.config = config or GeminiModelConfig()
+        self.model_name = self.config.model_name
+        self._model = None
+
+    def _generate(self, prompt, question, kind, timeout):
+        if self._model is None:
+            self._model = self.config.get_client()
+        response = self._model.generate_content(prompt, request_options={'timeout': timeout})
+        return response.text
+
+    def check(self):
+        return self.config.check_model(timeout=min(self.timeout, 10))
+
+# answers for the example questions in the Q&A tab
+DEFAULT_STUB_ANSWERS = dict(SEED_EXAMPLES)
+
+STUB_FALLBACK_SQL = "SELECT pmid, title, publication_year FROM articles ORDER BY pmid DESC LIMIT 100"
+
+class StubProvider(LLMProvider):
+    # deterministic offline provider: answer after latency_ms (+ up to jitter_ms),
+    # fail a failure_rate share of requests with a transient error. answers
+    # from abstracts cite the first PMIDs of the prompt
+    name = 'stub'
+
+    def __init__(self, answers=None, latency_ms=LLM_STUB_LATENCY_MS, jitter_ms=LLM_STUB_JITTER_MS,
+                 failure_rate=0.0, fallback_sql=STUB_FALLBACK_SQL, seed=42, **kwargs):
+        super().__init__(**kwargs)
+        self.model_name = 'stub'
+        self.answers = {normalize_question(q): sql for q, sql in (answers or DEFAULT_STUB_ANSWERS).items()}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.fallback_sql = fallback_sql
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        # {"question": "sql", ...}
+        with open(path) as f:
+            return cls(answers=json.load(f), **kwargs)
+
+    def _generate(self, prompt, question, kind, timeout):
+        with self._random_lock:
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+            fail = self._random.random() < self.failure_rate
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"stub latency {delay * 1000:.0f} ms is over the timeout")
+        time.sleep(delay)
+        if fail:
+            raise TransientProviderError("stub failure")
+        if kind == 'answer':
+            pmids = list(dict.fromkeys(re.findall(r"\[PMID (\d+)\]", prompt)))
+            citations = ' '.join(f"[PMID {pmid}]" for pmid in pmids[:3])
+            return f"Stub answer from {len(pmids)} abstracts. {citations}".strip()
+        return self.answers.get(normalize_question(question), self.fallback_sql)
+
+    def check(self):
+        return True, f"stub provider, {len(self.answers)} known questions"
+
+def get_provider(name=None, **kwargs):
+    # provider for LLM_PROVIDER, None when gemini has no api key
+    name = (name or LLM_PROVIDER).lower()
+    if name == 'stub':
+        if LLM_STUB_ANSWERS:
+            return StubProvider.from_file(LLM_STUB_ANSWERS, **kwargs)
+        return StubProvider(**kwargs)
+    if name == 'gemini':
+        from src.config.config import GEMINI_API_KEY
+        if not GEMINI_API_KEY:
+            return None
+        return GeminiProvider(**kwargs)
+    raise ValueError(f"Unknown LLM provider {name!r}, expected one of {PROVIDERS}")
@@ -0,0 +1,259 @@
+"""
+Answers from the abstracts themselves, for questions SQL cannot answer
+("what do recent abstracts say about insulin resistance").
+
+1. Keywords of the question become a full-text query against
+   ix_articles_fts (title + abstract). All keywords must match; when that
+   finds fewer than top_k articles any keyword may match. Only the newest
+   `candidates` matching rows are ranked. Finding them is still a top-N sort
+   over every match, so broad keywords cost more on a large corpus: the
+   search runs under QUERY_TIMEOUT_MS and a cancelled one raises
+   QueryTooBroadError, asking for more specific keywords.
+   Relevance is approximate: a better match older than those is not seen.
+   Questions asking for recent work are ordered by year before rank.
+2. The top_k articles are packed into a token budget, each abstract cut to
+   abstract_tokens. With strategy 'truncate' whatever does not fit is left
+   out (one model call). With 'map_reduce' the rest is summarized chunk by
+   chunk, at most max_chunks extra calls, and the notes are combined.
+3. The model answers with [PMID n] citations; citations of articles that
+   were not in the context are dropped.
+
+Tokens are estimated as characters / 4, close enough for English text.
+"""
+
+import re
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from src.config.config import (RETRIEVAL_TOP_K, RETRIEVAL_CANDIDATES, RETRIEVAL_TOKEN_BUDGET,
+                               RETRIEVAL_ABSTRACT_TOKENS, RETRIEVAL_STRATEGY, RETRIEVAL_MAX_CHUNKS,
+                               QUERY_TIMEOUT_MS)
+from src.database.queries import ARTICLE_DOCUMENT
+from src.utils.logger import get_logger
+
+logger = get_logger("qa")
+
+STRATEGIES = ['truncate', 'map_reduce']
+
+class QueryTooBroadError(ValueError):
+    # the keywords match too many articles to search within the timeout
+    pass
+
+# words that describe the request rather than the topic
+_IGNORED_WORDS = {
+    'a', 'an', 'the', 'of', 'in', 'on', 'for', 'to', 'and', 'or', 'with', 'by', 'from', 'about', 'into', 'as',
+    'is', 'are', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'what', 'which', 'who', 'how', 'why', 'when',
+    'me', 'us', 'we', 'i', 'you', 'it', 'its', 'this', 'that', 'these', 'those', 'there', 'any', 'some', 'all',
+    'can', 'could', 'should', 'would', 'tell', 'say', 'says', 'said', 'show', 'shows', 'give', 'list', 'find',
+    'know', 'known', 'abstract', 'abstracts', 'article', 'articles', 'paper', 'papers', 'study', 'studies',
+    'research', 'literature', 'publication', 'publications', 'published', 'report', 'reports', 'findings',
+    'evidence', 'recent', 'recently', 'latest', 'new', 'newest', 'current', 'summarize', 'summary', 'explain',
+}
+_RECENT_WORDS = {'recent', 'recently', 'latest', 'new', 'newest', 'current'}
+
+_PMID_CITATION = re.compile(r"PMID:?\s*(\d+)")
+
+SEARCH_SQL = f"""
+SELECT pmid, title, abstract, publication_year, rank FROM (
+    SELECT pmid, title, abstract, publication_year, ts_rank_cd({ARTICLE_DOCUMENT}, query) AS rank
+    FROM articles, to_tsquery('english', %(query)s) query
+    WHERE {ARTICLE_DOCUMENT} @@ query
+    ORDER BY publication_year DESC NULLS LAST, pmid DESC
+    LIMIT %(candidates)s
+) candidates
+ORDER BY {{order}}
+LIMIT %(top_k)s
+"""
+
+ANSWER_PROMPT = """Answer the question using only the abstracts below. Cite the PMID of every
+statement in brackets, like [PMID 12345]. If the abstracts do not answer the
+question, say so.
+
+Abstracts:
+{context}
+
+Question: {question}
+Answer:"""
+
+MAP_PROMPT = """Note what these abstracts say that helps answer the question, in a few
+sentences. Keep a [PMID n] citation on every statement. Answer "nothing" if
+none of them is relevant.
+
+Abstracts:
+{context}
+
+Question: {question}
+Notes:"""
+
+REDUCE_PROMPT = """Answer the question from these notes, which were taken from PubMed abstracts.
+Keep the [PMID n] citations of the statements you use. If the notes do not
+answer the question, say so.
+
+Notes:
+{context}
+
+Question: {question}
+Answer:"""
+
+def estimate_tokens(text):
+    return len(text or '') // 4 + 1
+
+def truncate_tokens(text, max_tokens):
+    # cut at a word boundary so the estimate stays within max_tokens
+    text = text or ''
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1].rsplit(' ', 1)[0]
+    return cut + '…'
+
+def extract_keywords(question):
+    # topic words, lowercase and unique, in question order
+    words = []
+    for word in re.findall(r"[a-z0-9]+", (question or '').lower()):
+        if word not in _IGNORED_WORDS and len(word) > 1 and word not in words:
+            words.append(word)
+    return words
+
+def format_article(article, max_tokens):
+    year = article.get('publication_year') or 'n.d.'
+    return (f"[PMID {article['pmid']}] ({year}) {article['title']}\n"
+            f"{truncate_tokens(article.get('abstract') or '', max_tokens)}")
+
+def extract_citations(answer, pmids):
+    # cited pmids in order of first citation, only those from the context
+    cited = []
+    for match in _PMID_CITATION.finditer(answer or ''):
+        pmid = int(match.group(1))
+        if pmid in pmids and pmid not in cited:
+            cited.append(pmid)
+    return cited
+
+class AbstractRetriever:
+    def __init__(self, db, provider, top_k=RETRIEVAL_TOP_K, candidates=RETRIEVAL_CANDIDATES,
+                 token_budget=RETRIEVAL_TOKEN_BUDGET, abstract_tokens=RETRIEVAL_ABSTRACT_TOKENS,
+                 strategy=RETRIEVAL_STRATEGY, max_chunks=RETRIEVAL_MAX_CHUNKS, timeout_ms=QUERY_TIMEOUT_MS):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown retrieval strategy {strategy!r}, expected one of {STRATEGIES}")
+        # db: DatabaseManager (either one), the search goes where its read routing says
+        self.db = getattr(db, 'improved_db', db)
+        self.provider = provider
+        self.top_k = top_k
+        self.candidates = max(candidates, top_k)
+        self.token_budget = token_budget
+        self.abstract_tokens = abstract_tokens
+        self.strategy = strategy
+        self.max_chunks = max_chunks
+        self.timeout_ms = timeout_ms
+
+    def _search(self, conn, terms, operator, recent):
+        if recent:
+            order = "publication_year DESC NULLS LAST, rank DESC, pmid DESC"
+        else:
+            order = "rank DESC, publication_year DESC NULLS LAST, pmid DESC"
+        rows = conn.exec_driver_sql(SEARCH_SQL.format(order=order), {
+            'query': f" {operator} ".join(terms), 'candidates': self.candidates, 'top_k': self.top_k
+        }).mappings().all()
+        return [dict(row) for row in rows]
+
+    def search(self, question):
+        # the top_k matching articles, best first
+        keywords = extract_keywords(question)
+        if not keywords:
+            return []
+        recent = bool(_RECENT_WORDS & set(re.findall(r"[a-z]+", question.lower())))
+
+        engine = self.db.get_read_engine()
+        with engine.connect() as conn:
+            try:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.timeout_ms)}")
+                articles = self._search(conn, keywords, '&', recent)
+                if len(articles) < self.top_k and len(keywords) > 1:
+                    seen = {article['pmid'] for article in articles}
+                    articles += [article for article in self._search(conn, keywords, '|', recent)
+                                 if article['pmid'] not in seen][:self.top_k - len(articles)]
+            except OperationalError as e:
+                if 'statement timeout' not in str(e):
+                    raise
+                logger.warning(f"Abstract search cancelled after {self.timeout_ms} ms: {keywords}")
+                raise QueryTooBroadError(
+                    f"The keywords {', '.join(keywords)} match too many abstracts to search within "
+                    f"{self.timeout_ms / 1000:.1f}s. Ask about something more specific.")
+            finally:
+                conn.rollback()
+        return articles
+
+    def pack(self, articles, budget=None):
+        # split formatted articles into chunks of at most `budget` tokens
+        budget = budget or self.token_budget
+        chunks = []
+        current, used = [], 0
+        for article in articles:
+            block = format_article(article, self.abstract_tokens)
+            tokens = estimate_tokens(block)
+            if current and used + tokens > budget:
+                chunks.append(current)
+                current, used = [], 0
+            current.append((article['pmid'], truncate_tokens(block, budget)))
+            used += min(tokens, budget)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _ask(self, prompt, question):
+        return self.provider.generate(prompt, question=question, kind='answer').strip()
+
+    def answer(self, question):
+        # {'answer', 'citations', 'sources', 'keywords', 'strategy', 'context_tokens',
+        #  'model_calls', 'left_out', 'elapsed_ms'}, raises ProviderError
+        started = time.perf_counter()
+        question = question.strip()
+        result = {'answer': None, 'citations': [], 'sources': [], 'keywords': extract_keywords(question),
+                  'strategy': 'none', 'context_tokens': 0, 'model_calls': 0, 'left_out': 0}
+
+        articles = self.search(question)
+        if not articles:
+            result['answer'] = "No abstracts match this question."
+            result['elapsed_ms'] = (time.perf_counter() - started) * 1000
+            return result
+
+        chunks = self.pack(articles)
+        if self.strategy == 'map_reduce' and len(chunks) > 1:
+            chunks = chunks[:self.max_chunks]
+            notes = []
+            for chunk in chunks:
+                note = self._ask(MAP_PROMPT.format(context="\n\n".join(block for _, block in chunk),
+                                                   question=question), question)
+                result['model_calls'] += 1
+                result['context_tokens'] += sum(estimate_tokens(block) for _, block in chunk)
+                if note.lower().strip('. ') != 'nothing':
+                    notes.append(note)
+            context = truncate_tokens("\n\n".join(notes) or "nothing", self.token_budget)
+            result['context_tokens'] += estimate_tokens(context)
+            answer = self._ask(REDUCE_PROMPT.format(context=context, question=question), question)
+            result['strategy'] = 'map_reduce'
+        else:
+            chunks = chunks[:1]
+            context = "\n\n".join(block for _, block in chunks[0])
+            result['context_tokens'] = estimate_tokens(context)
+            answer = self._ask(ANSWER_PROMPT.format(context=context, question=question), question)
+            result['strategy'] = 'single'
+        result['model_calls'] += 1
+
+        used = [pmid for chunk in chunks for pmid, _ in chunk]
+        result['left_out'] = len(articles) - len(used)
+        result['answer'] = answer
+        result['citations'] = extract_citations(answer, set(used))
+        result['sources'] = [
+            {'pmid': article['pmid'], 'title': article['title'], 'publication_year': article['publication_year'],
+             'rank': round(float(article['rank']), 4), 'cited': article['pmid'] in result['citations']}
+            for article in articles if article['pmid'] in used
+        ]
+        result['elapsed_ms'] = (time.perf_counter() - started) * 1000
+        logger.info(f"Answered from {len(used)} abstracts, {result['model_calls']} model calls, "
+                    f"~{result['context_tokens']} context tokens")
+        return result
@@ -0,0 +1,254 @@
+"""
+Cache of generated SQL per question.
+
+Questions are normalized (case, whitespace, trailing punctuation) and keyed
+together with a schema version, a hash of the tables and columns in
+models.py, so a schema change makes old entries unreachable instead of
+returning SQL for columns that no longer exist.
+
+Entries live in the qa_sql_cache table so they survive restarts and are
+shared by every app process, with a small in-process LRU in front of it.
+Entries expire ttl_seconds after they were written; when the table grows
+past max_entries the least recently used ones are evicted.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from sqlalchemy import func
+
+from src.config.config import QA_CACHE_TTL_HOURS, QA_CACHE_MAX_ENTRIES, QA_CACHE_MEMORY_ENTRIES
+from src.database.models import Base, QaSqlCache
+from src.utils.logger import get_logger
+
+logger = get_logger("qa")
+
+# tables the Q&A model may query, anything else in models.py is ETL bookkeeping
+QA_TABLES = ['articles', 'journals', 'authors', 'mesh_terms', 'article_authors', 'article_mesh_terms']
+
+_schema_version = None
+
+def schema_version():
+    # short hash of the Q&A tables and their columns
+    global _schema_version
+    if _schema_version is None:
+        parts = []
+        for name in QA_TABLES:
+            table = Base.metadata.tables[name]
+            parts.append(name + '(' + ','.join(f"{c.name}:{c.type}" for c in table.columns) + ')')
+        _schema_version = hashlib.sha256(';'.join(parts).encode()).hexdigest()[:16]
+    return _schema_version
+
+def normalize_question(question):
+    # "  Which journals have the MOST articles?? " -> "which journals have the most articles"
+    text = (question or '').lower().replace('’', "'").replace('“', '"').replace('”', '"')
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.rstrip('?.!;: ')
+
+def cache_key(question, version=None):
+    version = version or schema_version()
+    return hashlib.sha256(f"{version}\n{normalize_question(question)}".encode()).hexdigest()
+
+class SqlCache:
+    def __init__(self, db, ttl_seconds=QA_CACHE_TTL_HOURS * 3600, max_entries=QA_CACHE_MAX_ENTRIES,
+                 memory_entries=QA_CACHE_MEMORY_ENTRIES):
+        self.db = db
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._memory = OrderedDict()  # key -> (sql, created_at)
+        self._lock = threading.Lock()
+
+    def _expired(self, created_at, now):
+        return created_at is not None and created_at + self.ttl < now
+
+    def _remember(self, key, sql, created_at):
+        with self._lock:
+            self._memory[key] = (sql, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, question):
+        # cached SQL for the question or None
+        key = cache_key(question)
+        now = datetime.now(timezone.utc)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None and not self._expired(entry[1], now):
+            self.stats['memory_hits'] += 1
+            self._touch(key)
+            return entry[0]
+
+        session = self.db.get_session()
+        try:
+            row = session.get(QaSqlCache, key)
+            if row is None or self._expired(row.created_at, now):
+                if row is not None:
+                    session.delete(row)
+                    session.commit()
+                self.stats['misses'] += 1
+                return None
+            row.hit_count += 1
+            row.last_used_at = func.now()
+            sql, created_at = row.sql, row.created_at
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"SQL cache lookup failed: {str(e)}")
+            self.stats['misses'] += 1
+            return None
+        finally:
+            session.close()
+
+        self.stats['db_hits'] += 1
+        self._remember(key, sql, created_at)
+        return sql
+
+    def _touch(self, key):
+        # keep hit counts and recency in the table up to date for memory hits
+        session = self.db.get_session()
+        try:
+            session.query(QaSqlCache).filter(QaSqlCache.key == key).update(
+                {'hit_count': QaSqlCache.hit_count + 1, 'last_used_at': func.now()},
+                synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"SQL cache update failed: {str(e)}")
+        finally:
+            session.close()
+
+    def put(self, question, sql):
+        # store SQL that passed validation and ran
+        key = cache_key(question)
+        session = self.db.get_session()
+        try:
+            row = session.get(QaSqlCache, key)
+            if row is None:
+                row = QaSqlCache(key=key, hit_count=0)
+                session.add(row)
+            row.question = question.strip()
+            row.sql = sql
+            row.schema_version = schema_version()
+            row.created_at = func.now()
+            row.last_used_at = func.now()
+            session.commit()
+            self.stats['stores'] += 1
+        except Exception as e:
+            session.rollback()
+            logger.error(f"SQL cache store failed: {str(e)}")
+            return
+        finally:
+            session.close()
+
+        self._remember(key, sql, datetime.now(timezone.utc))
+        self.evict()
+
+    def invalidate(self, question):
+        # drop one entry, e.g. when its SQL stopped working
+        key = cache_key(question)
+        with self._lock:
+            self._memory.pop(key, None)
+        session = self.db.get_session()
+        try:
+            session.query(QaSqlCache).filter(QaSqlCache.key == key).delete(synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"SQL cache invalidate failed: {str(e)}")
+        finally:
+            session.close()
+
+    def evict(self):
+        # expired entries, old schema versions and everything past max_entries
+        # by last use. returns the number of rows removed
+        session = self.db.get_session()
+        try:
+            cutoff = datetime.now(timezone.utc) - self.ttl
+            removed = session.query(QaSqlCache).filter(
+                (QaSqlCache.created_at < cutoff) | (QaSqlCache.schema_version != schema_version())
+            ).delete(synchronize_session=False)
+
+            keep = session.query(QaSqlCache.key).order_by(
+                QaSqlCache.last_used_at.desc()).limit(self.max_entries).subquery()
+            removed += session.query(QaSqlCache).filter(
+                QaSqlCache.key.notin_(session.query(keep.c.key))
+            ).delete(synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"SQL cache eviction failed: {str(e)}")
+            return 0
+        finally:
+            session.close()
+
+        if removed:
+            self.stats['evictions'] += removed
+            with self._lock:
+                self._memory.clear()
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        session = self.db.get_session()
+        try:
+            session.query(QaSqlCache).delete(synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"SQL cache clear failed: {str(e)}")
+        finally:
+            session.close()
+
+    def verified_examples(self, limit=500):
+        # (question, sql) pairs of the current schema, most used first, the
+        # prompt builder picks few-shot examples from them
+        session = self.db.get_session()
+        try:
+            return [tuple(row) for row in session.query(QaSqlCache.question, QaSqlCache.sql).filter(
+                QaSqlCache.schema_version == schema_version()
+            ).order_by(QaSqlCache.hit_count.desc(), QaSqlCache.last_used_at.desc()).limit(limit)]
+        except Exception as e:
+            logger.error(f"SQL cache examples failed: {str(e)}")
+            return []
+        finally:
+            session.close()
+
+    def get_stats(self, top=10):
+        # hit rate of this process plus what the table holds
+        lookups = self.stats['memory_hits'] + self.stats['db_hits'] + self.stats['misses']
+        hits = self.stats['memory_hits'] + self.stats['db_hits']
+        result = dict(self.stats, lookups=lookups, hit_rate=hits / lookups if lookups else 0.0,
+                      entries=0, total_hits=0, top_questions=[])
+        session = self.db.get_session()
+        try:
+            entries, total_hits = session.query(
+                func.count(QaSqlCache.key), func.coalesce(func.sum(QaSqlCache.hit_count), 0)).one()
+            result['entries'] = entries
+            result['total_hits'] = int(total_hits)
+            # stored entries were misses once, so hits / (hits + entries) is the
+            # hit rate over everything the table has seen
+            result['overall_hit_rate'] = total_hits / (total_hits + entries) if entries else 0.0
+            result['top_questions'] = [
+                {'question': question, 'hits': hit_count, 'last_used_at': last_used_at}
+                for question, hit_count, last_used_at in session.query(
+                    QaSqlCache.question, QaSqlCache.hit_count, QaSqlCache.last_used_at
+                ).order_by(QaSqlCache.hit_count.desc()).limit(top)
+            ]
+        except Exception as e:
+            logger.error(f"SQL cache stats failed: {str(e)}")
+        finally:
+            session.close()
+        return result
@@ -0,0 +1,70 @@
+"""
+Natural language question -> SQL through an LLM provider, moved out of the
+Streamlit app so it can be cached, tested and load tested without a UI.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.qa.prompt_builder import PromptBuilder
+from src.qa.sql_cache import cache_key
+from src.utils.singleflight import SingleFlight
+from src.utils.logger import get_logger
+
+logger = get_logger("qa")
+
+DANGEROUS_KEYWORDS = ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'CREATE']
+
+class SqlGenerationError(ValueError):
+    # the model answered with something that is not a usable query
+    pass
+
+def clean_response(text):
+    # strip markdown code fences around the query
+    sql_query = text.strip()
+    if sql_query.startswith('```'):
+        lines = sql_query.split('\n')
+        sql_query = '\n'.join([line for line in lines if not line.startswith('```')])
+    return sql_query.strip()
+
+def validate_generated_sql(sql_query):
+    # returns the query or raises SqlGenerationError
+    sql_upper = sql_query.upper().strip()
+    if sql_upper.startswith(('SELECT', 'WITH')):
+        if not any(keyword in sql_upper for keyword in DANGEROUS_KEYWORDS):
+            return sql_query
+    raise SqlGenerationError(f"Generated query didn't pass validation: {sql_query}")
+
+class SqlGenerator:
+    def __init__(self, provider, cache=None, prompt_builder=None):
+        # provider: an LLMProvider from src/qa/providers.py
+        self.provider = provider
+        self.cache = cache
+        self.prompt_builder = prompt_builder or PromptBuilder(cache)
+        # the same question asked in several sessions at once makes one model call
+        self._flights = SingleFlight("sql_generator")
+
+    def generate(self, question):
+        # returns (sql, cached), raises SqlGenerationError or ProviderError
+        result, _ = self._flights.do(cache_key(question), self._generate, question)
+        return result
+
+    def _generate(self, question):
+        if self.cache is not None:
+            sql_query = self.cache.get(question)
+            if sql_query:
+                logger.info("SQL cache hit for question")
+                return sql_query, True
+
+        text = self.provider.generate(self.prompt_builder.build(question), question=question)
+        return validate_generated_sql(clean_response(text)), False
+
+    def remember(self, question, sql_query):
+        # called once the query ran, only working SQL is cached
+        if self.cache is not None:
+            self.cache.put(question, sql_query)
+
+    def forget(self, question):
+        if self.cache is not None:
+            self.cache.invalidate(question)
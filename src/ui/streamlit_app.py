@@ -6,8 +6,16 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.database.database import DatabaseManager
-from src.config.config import GEMINI_API_KEY
-from src.config.gemini_model_config import GeminiModelConfig
+from src.database import queries
+from src.database.query_governor import QueryGovernor, QueryRejectedError
+from src.qa.sql_cache import SqlCache
+from src.qa.sql_generator import SqlGenerator, SqlGenerationError
+from src.qa.providers import get_provider, ProviderError
+from src.qa.pipeline import answer_question
+from src.qa.retrieval import AbstractRetriever, QueryTooBroadError
+from src.qa.model_status import get_model_status, AVAILABLE, CHECKING
+from src.utils.profiling import maybe_profile
+from src.config.config import DASHBOARD_CACHE_TTL_SECONDS
 from datetime import datetime
 
 # setup page
@@ -25,15 +33,73 @@ def init_database():
 
 db = init_database()
 
-# setup gemini
-gemini_config = None
-if GEMINI_API_KEY:
-    try:
-        gemini_config = GeminiModelConfig()
-    except Exception as e:
-        st.error(f"Gemini model configuration error: {str(e)}")
+# EXPLAIN cost guard, timeout and read-only transaction for generated and manual SQL
+governor = QueryGovernor(db)
+
+# setup the LLM provider (LLM_PROVIDER, gemini by default), one per process so
+# its concurrency limit covers every session
+@st.cache_resource
+def init_provider():
+    return get_provider()
+
+llm_provider = None
+try:
+    llm_provider = init_provider()
+except Exception as e:
+    st.error(f"LLM provider configuration error: {str(e)}")
+
+# generated SQL is cached per normalized question (see src/qa/sql_cache.py)
+@st.cache_resource
+def init_sql_cache():
+    return SqlCache(db)
+
+sql_cache = init_sql_cache()
+
+# one generator per process so the same question asked in several sessions
+# at once waits on a single model call
+@st.cache_resource
+def init_sql_generator():
+    return SqlGenerator(llm_provider, sql_cache)
+
+sql_generator = init_sql_generator()
+
+# answers from the abstracts, token budgeted (see src/qa/retrieval.py)
+retriever = AbstractRetriever(db, llm_provider)
+
+# probed in the background, renders only read the cached status
+model_status = get_model_status()
+
+# choices for the number of search results, the grid scrolls through them all
+RESULT_LIMITS = [20, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# sidebar numbers and filter options only change when the ETL runs, so they
+# are cached for DASHBOARD_CACHE_TTL_SECONDS instead of queried on every rerun
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_article_stats():
+    stats = db.get_article_stats()
+    if not stats:
+        # errors come back as {}, raising keeps them out of the cache
+        raise RuntimeError("statistics query failed")
+    return stats
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_year_stats():
+    return db.execute_query(queries.YEAR_STATS)
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_available_years():
+    return db.execute_query(queries.AVAILABLE_YEARS)['publication_year'].tolist()
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def load_sql_cache_stats():
+    return sql_cache.get_stats()
 
 def main():
+    # every script run is profiled when PROFILE is set
+    with maybe_profile("streamlit"):
+        render_dashboard()
+
+def render_dashboard():
     st.title("🔬 PubMed ETL Dashboard")
     st.markdown("Explore PubMed research articles with search, details, and AI-powered Q&A")
     
@@ -41,7 +107,7 @@ def main():
     with st.sidebar:
         st.header("📊 Database Statistics")
         try:
-            stats = db.get_article_stats()
+            stats = load_article_stats()
             st.metric("Total Articles", stats['total_articles'])
             st.metric("Total Authors", stats['total_authors'])
             st.metric("Total Journals", stats['total_journals'])
@@ -55,14 +121,7 @@ def main():
         st.markdown("---")
         st.subheader("📅 Articles by Year")
         try:
-            year_stats_query = """
-            SELECT publication_year, COUNT(*) as count
-            FROM articles 
-            WHERE publication_year IS NOT NULL
-            GROUP BY publication_year 
-            ORDER BY publication_year DESC
-            """
-            year_stats = db.execute_query(year_stats_query)
+            year_stats = load_year_stats()
             
             if not year_stats.empty:
                 for _, row in year_stats.iterrows():
@@ -71,6 +130,14 @@ def main():
                 st.info("No year data available")
         except Exception as e:
             st.info("📊 Year statistics not available")
+        
+        # Query performance section
+        st.markdown("---")
+        with st.expander("⏱️ Query Performance"):
+            show_query_stats()
+        
+        with st.expander("🧠 SQL Cache"):
+            show_sql_cache_stats()
     
     # Check if we need to show details tab directly
     if 'selected_pmid' in st.session_state and st.session_state.selected_pmid:
@@ -86,31 +153,58 @@ def main():
         st.markdown("---")
         show_article_details(st.session_state.selected_pmid)
     else:
-        # Main tabs
-        tab1, tab2, tab3 = st.tabs(["🔍 Search Articles", "📄 Article Details", "🤖 AI Q&A"])
-        
-        with tab1:
-            search_tab()
-        
-        with tab2:
-            details_tab()
-        
-        with tab3:
-            qa_tab()
+        # only the selected view runs, st.tabs would run all three on every rerun.
+        # views are fragments: their own widgets rerun the view, not the sidebar
+        views = {
+            "🔍 Search Articles": search_tab,
+            "📄 Article Details": details_tab,
+            "🤖 AI Q&A": qa_tab
+        }
+        view = st.radio("View", list(views), horizontal=True, key="view", label_visibility="collapsed")
+        views[view]()
 
+def show_query_stats():
+    """Show the hottest queries and recent slow queries for this process"""
+    query_stats = db.get_query_stats(15)
+    summary = query_stats['summary']
+    st.caption(f"{summary['calls']} statements, {summary['total_ms']:.0f} ms total, "
+               f"{summary['slow_queries']} slower than {summary['slow_query_ms']:.0f} ms")
+    if query_stats['coalesced']['shared']:
+        st.caption(f"{query_stats['coalesced']['shared']} reads shared an identical query already running")
+    
+    if query_stats['top_queries']:
+        df = pd.DataFrame(query_stats['top_queries'])[
+            ['call_site', 'calls', 'total_ms', 'mean_ms', 'max_ms', 'rows', 'statement']
+        ]
+        st.dataframe(df.round(1), hide_index=True)
+    
+    for slow in reversed(query_stats['slow_queries'][-5:]):
+        st.markdown(f"**{slow['duration_ms']:.0f} ms** · `{slow['call_site']}` · {slow['at']}")
+        st.code(slow['plan'] or slow['statement'], language="sql")
+
+def show_sql_cache_stats():
+    """Show how often Q&A questions are answered from the SQL cache"""
+    cache_stats = load_sql_cache_stats()
+    col1, col2 = st.columns(2)
+    col1.metric("Hit rate (session)", f"{cache_stats['hit_rate']:.0%}", help=f"{cache_stats['lookups']} lookups")
+    col2.metric("Hit rate (all time)", f"{cache_stats['overall_hit_rate']:.0%}" if 'overall_hit_rate' in cache_stats else "n/a")
+    st.caption(f"{cache_stats['entries']} cached questions, {cache_stats['total_hits']} hits")
+    
+    if cache_stats['top_questions']:
+        st.dataframe(pd.DataFrame(cache_stats['top_questions'])[['question', 'hits']], hide_index=True)
+    
+    if st.button("Clear SQL cache"):
+        sql_cache.clear()
+        load_sql_cache_stats.clear()
+        st.rerun()
+
+@st.fragment
 def search_tab():
     st.header("Search Articles")
     
     # Get available years from database
     try:
-        years_query = """
-        SELECT DISTINCT publication_year 
-        FROM articles 
-        WHERE publication_year IS NOT NULL 
-        ORDER BY publication_year DESC
-        """
-        available_years = db.execute_query(years_query)
-        year_options = ["All"] + available_years['publication_year'].tolist()
+        year_options = ["All"] + load_available_years()
     except:
         year_options = ["All", 2025, 2024, 2023, 2022, 2021]
     
@@ -128,52 +222,30 @@ def search_tab():
         journal_filter = st.text_input("Filter by journal (optional):", placeholder="e.g., Nature, Science")
     
     with col4:
-        limit = st.slider("Number of results:", 10, 100, 20)
+        limit = st.select_slider("Number of results:", RESULT_LIMITS, value=100)
     
     
     # Search button
     if st.button("🔍 Search", type="primary"):
         if search_term:
-            search_articles(search_term, year_filter, journal_filter, limit)
+            st.session_state.search = (search_term, year_filter, journal_filter, limit)
         else:
             st.warning("Please enter a search term")
     
+    # results stay up across reruns (selecting a row is a rerun) until the term changes
+    search = st.session_state.get('search')
+    if search_term and search and search[0] == search_term:
+        search_articles(*search)
+    
     # Show recent articles if no search
     if not search_term:
         st.subheader("📚 Recent Articles")
-        show_recent_articles(10)
+        show_recent_articles(50)
 
 def search_articles(search_term, year_filter, journal_filter, limit):
     try:
         # build query
-        query = """
-        SELECT DISTINCT a.pmid, a.title, a.publication_year, j.title as journal_title
-        FROM articles a
-        JOIN journals j ON a.journal_id = j.id
-        WHERE (LOWER(a.title) LIKE LOWER(%s) OR 
-               LOWER(a.abstract) LIKE LOWER(%s))
-        """
-        
-        params = [f"%{search_term}%", f"%{search_term}%"]
-        
-        # Handle year filter - check if it's a range or single year
-        if year_filter != "All":
-            if isinstance(year_filter, str) and "-" in year_filter:
-                # Handle year range (e.g., "2021-2023")
-                start_year, end_year = year_filter.split("-")
-                query += " AND a.publication_year >= %s AND a.publication_year <= %s"
-                params.extend([int(start_year), int(end_year)])
-            else:
-                # Handle single year
-                query += " AND a.publication_year = %s"
-                params.append(year_filter)
-        
-        if journal_filter:
-            query += " AND LOWER(j.title) LIKE LOWER(%s)"
-            params.append(f"%{journal_filter}%")
-        
-        query += " ORDER BY a.publication_year DESC, a.pmid DESC LIMIT %s"
-        params.append(limit)
+        query, params = queries.build_search_query(search_term, year_filter, journal_filter, limit)
         
         results = db.execute_query(query, params)
         
@@ -181,65 +253,51 @@ def search_articles(search_term, year_filter, journal_filter, limit):
             st.warning("No articles found matching your criteria")
             return
         
-        st.success(f"Found {len(results)} articles")
-        
-        # show results
-        for idx, row in results.iterrows():
-            with st.expander(f"📄 {row['title'][:100]}{'...' if len(row['title']) > 100 else ''}"):
-                col1, col2, col3 = st.columns([3, 1, 1])
-                
-                with col1:
-                    st.write(f"**Title:** {row['title']}")
-                    st.write(f"**Journal:** {row['journal_title']}")
-                    if row['publication_year']:
-                        st.write(f"**Year:** {row['publication_year']}")
-                
-                with col2:
-                    st.write(f"**PMID:** {row['pmid']}")
-                
-                with col3:
-                    if st.button("📄 View Details", key=f"details_{row['pmid']}", help="View full article details"):
-                        st.session_state.selected_pmid = row['pmid']
-                        st.rerun()
+        st.success(f"Found {len(results)} articles, select one to see its details")
+        show_results_table(results, "search_results")
     
     except Exception as e:
         st.error(f"Error searching articles: {str(e)}")
 
 def show_recent_articles(limit):
     try:
-        query = """
-        SELECT a.pmid, a.title, a.publication_year, j.title as journal_title
-        FROM articles a
-        JOIN journals j ON a.journal_id = j.id
-        ORDER BY a.pmid DESC
-        LIMIT %s
-        """
-        
-        results = db.execute_query(query, [limit])
+        results = db.execute_query(queries.RECENT_ARTICLES, [limit])
         
         if results.empty:
             st.info("No articles in database. Run the ETL script first!")
             return
         
-        for idx, row in results.iterrows():
-            with st.expander(f"📄 {row['title'][:80]}{'...' if len(row['title']) > 80 else ''}"):
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    st.write(f"**Title:** {row['title']}")
-                    st.write(f"**Journal:** {row['journal_title']}")
-                    if row['publication_year']:
-                        st.write(f"**Year:** {row['publication_year']}")
-                
-                with col2:
-                    st.write(f"**PMID:** {row['pmid']}")
-                    if st.button("📄 View Details", key=f"recent_{row['pmid']}", help="View full article details"):
-                        st.session_state.selected_pmid = row['pmid']
-                        st.rerun()
+        show_results_table(results, "recent_articles")
     
     except Exception as e:
         st.error(f"Error loading recent articles: {str(e)}")
 
+def show_results_table(results, key):
+    """One scrollable grid for a result list, selecting a row opens its details"""
+    # the grid only renders the visible rows, so thousands of hits stay cheap
+    # where an expander and button per row did not. the version in the key
+    # gives a fresh, unselected grid after a selection
+    version = st.session_state.get(f"{key}_version", 0)
+    event = st.dataframe(
+        results[['pmid', 'title', 'journal_title', 'publication_year']],
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{key}_{version}",
+        column_config={
+            'pmid': st.column_config.NumberColumn("PMID", format="%d"),
+            'title': st.column_config.TextColumn("Title", width="large"),
+            'journal_title': st.column_config.TextColumn("Journal"),
+            'publication_year': st.column_config.NumberColumn("Year", format="%d")
+        }
+    )
+    
+    if event.selection.rows:
+        st.session_state[f"{key}_version"] = version + 1
+        st.session_state.selected_pmid = int(results.iloc[event.selection.rows[0]]['pmid'])
+        st.rerun()
+
+@st.fragment
 def details_tab():
     st.header("Article Details")
     
@@ -266,14 +324,7 @@ def details_tab():
 def show_article_details(pmid):
     try:
         # get article info
-        query = """
-        SELECT a.pmid, a.title, a.abstract, a.publication_year, j.title as journal_title, j.issn
-        FROM articles a
-        JOIN journals j ON a.journal_id = j.id
-        WHERE a.pmid = %s
-        """
-        
-        article = db.execute_query(query, [pmid])
+        article = db.execute_query(queries.ARTICLE_DETAILS, [pmid])
         
         if article.empty:
             st.error("Article not found in database")
@@ -295,15 +346,7 @@ def show_article_details(pmid):
                 st.write(f"**Year:** {article['publication_year']}")
         
         # get authors
-        authors_query = """
-        SELECT a.full_name, a.last_name, a.first_name
-        FROM authors a
-        JOIN article_authors aa ON a.id = aa.author_id
-        WHERE aa.article_pmid = %s
-        ORDER BY aa.author_id
-        """
-        
-        authors = db.execute_query(authors_query, [pmid])
+        authors = db.execute_query(queries.ARTICLE_AUTHORS, [pmid])
         
         if not authors.empty:
             st.subheader("👥 Authors")
@@ -311,15 +354,7 @@ def show_article_details(pmid):
             st.write("\n".join(author_list))
         
         # get mesh terms
-        mesh_query = """
-        SELECT mt.term
-        FROM mesh_terms mt
-        JOIN article_mesh_terms amt ON mt.id = amt.mesh_term_id
-        WHERE amt.article_pmid = %s
-        ORDER BY mt.term
-        """
-        
-        mesh_terms = db.execute_query(mesh_query, [pmid])
+        mesh_terms = db.execute_query(queries.ARTICLE_MESH_TERMS, [pmid])
         
         if not mesh_terms.empty:
             st.subheader("🏷️ MeSH Terms")
@@ -353,27 +388,7 @@ def show_export_options(pmid):
 def export_article_csv(pmid):
     try:
         # get article data
-        query = """
-        SELECT 
-            a.pmid,
-            a.title,
-            a.abstract,
-            a.publication_year,
-            j.title as journal_title,
-            j.issn,
-            STRING_AGG(DISTINCT au.full_name, '; ') as authors,
-            STRING_AGG(DISTINCT mt.term, '; ') as mesh_terms
-        FROM articles a
-        JOIN journals j ON a.journal_id = j.id
-        LEFT JOIN article_authors aa ON a.pmid = aa.article_pmid
-        LEFT JOIN authors au ON aa.author_id = au.id
-        LEFT JOIN article_mesh_terms amt ON a.pmid = amt.article_pmid
-        LEFT JOIN mesh_terms mt ON amt.mesh_term_id = mt.id
-        WHERE a.pmid = %s
-        GROUP BY a.pmid, a.title, a.abstract, a.publication_year, j.title, j.issn
-        """
-        
-        data = db.execute_query(query, [pmid])
+        data = db.execute_query(queries.EXPORT_ARTICLE_CSV, [pmid])
         
         if not data.empty:
             csv = data.to_csv(index=False)
@@ -392,42 +407,17 @@ def export_article_csv(pmid):
 def export_article_json(pmid):
     try:
         # get article data
-        query = """
-        SELECT 
-            a.pmid,
-            a.title,
-            a.abstract,
-            a.publication_year,
-            j.title as journal_title,
-            j.issn
-        FROM articles a
-        JOIN journals j ON a.journal_id = j.id
-        WHERE a.pmid = %s
-        """
-        
-        article_data = db.execute_query(query, [pmid])
+        article_data = db.execute_query(queries.EXPORT_ARTICLE_JSON, [pmid])
         
         if not article_data.empty:
             article = article_data.iloc[0].to_dict()
             
             # add authors
-            authors_query = """
-            SELECT full_name, last_name, first_name
-            FROM authors a
-            JOIN article_authors aa ON a.id = aa.author_id
-            WHERE aa.article_pmid = %s
-            """
-            authors = db.execute_query(authors_query, [pmid])
+            authors = db.execute_query(queries.EXPORT_AUTHORS, [pmid])
             article['authors'] = authors.to_dict('records')
             
             # add mesh terms
-            mesh_query = """
-            SELECT term
-            FROM mesh_terms mt
-            JOIN article_mesh_terms amt ON mt.id = amt.mesh_term_id
-            WHERE amt.article_pmid = %s
-            """
-            mesh_terms = db.execute_query(mesh_query, [pmid])
+            mesh_terms = db.execute_query(queries.EXPORT_MESH_TERMS, [pmid])
             article['mesh_terms'] = mesh_terms['term'].tolist()
             
             json_data = json.dumps(article, indent=2, default=str)
@@ -444,28 +434,28 @@ def export_article_json(pmid):
     except Exception as e:
         st.error(f"Error exporting JSON: {str(e)}")
 
+@st.fragment
 def qa_tab():
     st.header("🤖 AI-Powered Q&A")
     
     # Show connection status but don't exit early
     model_available = False
     
-    if not gemini_config:
+    if not llm_provider:
         st.warning("⚠️ Gemini model not configured. Please set GEMINI_API in your environment variables to use this feature.")
         st.info("You can still explore the database using the Search and Details tabs.")
     else:
-        # Test Gemini model connection
-        try:
-            success, response = gemini_config.test_connection()
-            if success:
-                st.success("✅ **Gemini Model Connected**: Using gemini-2.0-flash model")
-                model_available = True
-            else:
-                st.error(f"❌ **Gemini Model Error**: {response}")
-                st.info("🔧 The model configuration is correct, but there might be an authentication issue.")
-                st.info("📝 **Fallback Mode**: You can still explore your data using predefined queries below!")
-        except Exception as e:
-            st.error(f"❌ **Gemini Model Error**: {str(e)}")
+        # cached model status, a stale one is re-probed in the background
+        status = model_status.status()
+        if status['state'] == AVAILABLE:
+            st.success(f"✅ **{llm_provider.name.title()} Model Connected**: Using {llm_provider.model_name} model")
+            model_available = True
+        elif status['state'] == CHECKING:
+            st.info(f"⏳ Checking the {llm_provider.model_name} model, you can already ask questions")
+            model_available = True
+        else:
+            st.error(f"❌ **{llm_provider.name.title()} Model Error**: {status['message']}")
+            st.info("🔧 The model configuration is correct, but there might be an authentication issue.")
             st.info("📝 **Fallback Mode**: You can still explore your data using predefined queries below!")
     
     st.markdown("Ask natural language questions about the articles in your database. The AI will translate your question into SQL and show you the results.")
@@ -481,13 +471,25 @@ def qa_tab():
     
     # Show different interface based on model availability
     if model_available:
-        question = st.text_area("Ask a question:", placeholder="e.g., How many articles were published in 2024?")
+        mode = st.radio(
+            "Answer from:",
+            ["📊 Database (SQL)", "📚 Abstracts (with citations)"],
+            horizontal=True,
+            help="SQL answers counts and rankings, abstracts answer what the research says about a topic"
+        )
+        if mode.startswith("📚"):
+            placeholder = "e.g., What do recent abstracts say about insulin resistance?"
+        else:
+            placeholder = "e.g., How many articles were published in 2024?"
+        question = st.text_area("Ask a question:", placeholder=placeholder)
         
         if st.button("🔍 Ask Question", type="primary"):
-            if question:
-                process_question(question)
-            else:
+            if not question:
                 st.warning("Please enter a question")
+            elif mode.startswith("📚"):
+                process_retrieval_question(question)
+            else:
+                process_question(question)
     else:
         st.markdown("### 📊 Quick Database Queries")
         st.markdown("While the AI model is being configured, you can explore your data with these predefined queries:")
@@ -526,15 +528,20 @@ def qa_tab():
 
 def process_question(question):
     try:
-        # generate sql query
-        sql_query = generate_sql_query(question)
+        # generate sql query (or take it from the cache) and run it
+        answer = get_answer(question)
         
-        if sql_query:
+        if answer:
             st.subheader("🔍 Generated SQL Query")
-            st.code(sql_query, language="sql")
+            st.code(answer['sql'], language="sql")
+            if answer['cached']:
+                st.caption("⚡ From cache, no model call needed")
             
-            # run query
-            results = db.execute_query(sql_query)
+            if answer['error']:
+                st.error(f"🛑 {answer['error']}")
+                return
+            show_query_report(answer['report'])
+            results = answer['results']
             
             if not results.empty:
                 st.subheader("📊 Results")
@@ -567,77 +574,63 @@ def process_question(question):
     except Exception as e:
         st.error(f"Error processing question: {str(e)}")
 
-def generate_sql_query(question):
+def process_retrieval_question(question):
+    # answer from the top matching abstracts with PMID citations
     try:
-        # database schema
-        schema_info = """
-        Database Schema:
-        - articles (pmid, title, abstract, publication_year, journal_id)
-        - journals (id, title, issn)
-        - authors (id, last_name, first_name, middle_name, full_name)
-        - mesh_terms (id, term)
-        - article_authors (article_pmid, author_id)
-        - article_mesh_terms (article_pmid, mesh_term_id)
-        """
-        
-        prompt = f"""
-        {schema_info}
-        
-        Convert this natural language question to a SQL query: "{question}"
-        
-        IMPORTANT RULES:
-        1. Return ONLY the SQL query, no explanations or markdown
-        2. Start with SELECT
-        3. Use proper JOINs when needed
-        4. Use LIMIT 100 to avoid too many results
-        5. Use appropriate WHERE clauses for filtering
-        6. For counting, use COUNT(*) and GROUP BY when needed
-        7. For text searches, use LOWER() and LIKE with % wildcards
-        
-        Example: SELECT COUNT(*) FROM articles;
-        """
-        
-        # use gemini model
-        model = gemini_config.get_client()
-        
-        response = model.generate_content(prompt)
-        
-        sql_query = response.text.strip()
-        
-        # clean up response
-        if sql_query.startswith('```'):
-            lines = sql_query.split('\n')
-            sql_query = '\n'.join([line for line in lines if not line.startswith('```')])
-        
-        # validate sql
-        sql_upper = sql_query.upper().strip()
-        if sql_upper.startswith(('SELECT', 'WITH')):
-            # safety check
-            dangerous_keywords = ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'CREATE']
-            if not any(keyword in sql_upper for keyword in dangerous_keywords):
-                return sql_query
-        
+        with st.spinner("Searching abstracts..."):
+            result = retriever.answer(question)
+        model_status.record_success()
+    except ProviderError as e:
+        model_status.record_failure(e)
+        st.error(f"Error answering from abstracts: {str(e)}")
+        return
+    except QueryTooBroadError as e:
+        st.warning(str(e))
+        return
+    except Exception as e:
+        st.error(f"Error searching abstracts: {str(e)}")
+        return
+    
+    st.subheader("📚 Answer")
+    st.markdown(result['answer'])
+    if not result['sources']:
+        return
+    
+    note = (f"{len(result['sources'])} abstracts · ~{result['context_tokens']} context tokens · "
+            f"{result['model_calls']} model call{'s' if result['model_calls'] != 1 else ''} · "
+            f"{result['elapsed_ms']:.0f} ms")
+    if result['left_out']:
+        note += f" · {result['left_out']} more matches left out by the token budget"
+    st.caption(note)
+    
+    st.subheader("🔗 Sources")
+    sources = pd.DataFrame(result['sources'])
+    sources['cited'] = sources['cited'].map({True: '✅', False: ''})
+    st.dataframe(sources[['cited', 'pmid', 'title', 'publication_year']], hide_index=True)
+
+def get_answer(question):
+    # see src/qa/pipeline.py, returns None when generation failed
+    try:
+        answer = answer_question(sql_generator, governor, question)
+        if not answer['cached']:
+            model_status.record_success()
+        return answer
+    
+    except SqlGenerationError as e:
+        model_status.record_success()
         # show error if validation fails
-        st.warning(f"Generated query didn't pass validation: {sql_query}")
+        st.warning(str(e))
         return None
     
-    except Exception as e:
+    except ProviderError as e:
+        model_status.record_failure(e)
         st.error(f"Error generating SQL query: {str(e)}")
         return None
 
 def show_articles_by_year():
     """Show articles grouped by year"""
     try:
-        query = """
-        SELECT 
-            publication_year as year,
-            COUNT(*) as article_count
-        FROM articles 
-        WHERE publication_year IS NOT NULL
-        GROUP BY publication_year 
-        ORDER BY publication_year DESC
-        """
-        results = db.execute_query(query)
+        results = db.execute_query(queries.ARTICLES_BY_YEAR)
         
         if not results.empty:
             st.subheader("📈 Articles by Year")
@@ -698,17 +691,31 @@ def show_common_mesh_terms():
     except Exception as e:
         st.error(f"Error loading MeSH terms: {str(e)}")
 
+def run_governed_query(sql_query):
+    # run through the query governor, returns None when it was rejected
+    try:
+        results, report = governor.run(sql_query)
+    except QueryRejectedError as e:
+        st.error(f"🛑 {str(e)}")
+        return None
+    
+    show_query_report(report)
+    return results
+
+def show_query_report(report):
+    note = f"Estimated cost {report['cost']:.0f} · {report['elapsed_ms']:.0f} ms"
+    if report['truncated']:
+        note += f" · showing the first {governor.row_limit} rows"
+    st.caption(note)
+
 def run_custom_query(query):
     """Run a custom SQL query"""
     try:
-        # Basic safety check - only allow SELECT statements
-        query_upper = query.strip().upper()
-        if not query_upper.startswith('SELECT'):
-            st.error("Only SELECT queries are allowed for safety reasons.")
+        # read-only, cost checked and time limited (see query_governor.py)
+        results = run_governed_query(query)
+        if results is None:
             return
         
-        results = db.execute_query(query)
-        
         if not results.empty:
             st.subheader("📊 Query Results")
             st.dataframe(results)
@@ -0,0 +1,145 @@
+"""
+Small benchmark harness.
+
+Results are saved as JSON in the same shape pytest-benchmark uses
+(machine_info / commit_info / benchmarks[].stats), and compare_results
+flags regressions against a stored baseline.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+def summarize(times):
+    # timing stats in seconds for a list of round durations
+    ordered = sorted(times)
+    quartile = max(1, len(ordered) // 4)
+    mean = statistics.mean(ordered)
+    return {
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': mean,
+        'median': statistics.median(ordered),
+        'stddev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'iqr': ordered[-quartile] - ordered[quartile - 1] if len(ordered) >= 4 else 0.0,
+        'rounds': len(ordered),
+        'ops': 1.0 / mean if mean else 0.0
+    }
+
+def _commit_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, timeout=5).stdout.strip())
+        return {'id': commit, 'dirty': dirty}
+    except Exception:
+        return {}
+
+class BenchmarkRunner:
+    # times callables and collects results
+
+    def __init__(self, min_rounds=5, max_rounds=1000, max_time=1.0, warmup=1):
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.max_time = max_time
+        self.warmup = warmup
+        self.results = []
+
+    def run(self, name, func, group="default", setup=None, params=None, rounds=None):
+        # time func(*setup()) until min_rounds and max_time are both satisfied
+        # setup runs outside the timed section
+        min_rounds = rounds or self.min_rounds
+        max_rounds = rounds or self.max_rounds
+
+        for _ in range(self.warmup):
+            func(*(setup() if setup else ()))
+
+        times = []
+        started = time.perf_counter()
+        while len(times) < min_rounds or (time.perf_counter() - started < self.max_time and len(times) < max_rounds):
+            args = setup() if setup else ()
+            t0 = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - t0)
+
+        result = {
+            'group': group,
+            'name': name,
+            'fullname': f"{group}::{name}",
+            'params': params or {},
+            'stats': summarize(times)
+        }
+        self.results.append(result)
+        return result
+
+    def to_dict(self):
+        return {
+            'machine_info': {
+                'node': platform.node(),
+                'machine': platform.machine(),
+                'python_version': platform.python_version(),
+                'system': platform.system()
+            },
+            'commit_info': _commit_info(),
+            'datetime': datetime.now().isoformat(),
+            'benchmarks': self.results
+        }
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare_results(baseline, current, threshold=0.2, stat="median"):
+    # compare two result dicts, a benchmark regresses when it is more than
+    # threshold (fraction) slower than the baseline
+    base = {b['fullname']: b['stats'][stat] for b in baseline.get('benchmarks', [])}
+    rows = []
+    for bench in current.get('benchmarks', []):
+        name = bench['fullname']
+        value = bench['stats'][stat]
+        if name not in base:
+            rows.append({'name': name, 'baseline': None, 'current': value, 'change': None, 'regression': False})
+            continue
+        change = (value - base[name]) / base[name] if base[name] else 0.0
+        rows.append({
+            'name': name,
+            'baseline': base[name],
+            'current': value,
+            'change': change,
+            'regression': change > threshold
+        })
+    return rows
+
+def format_results(results):
+    lines = [f"{'benchmark':<60} {'median':>12} {'mean':>12} {'ops/s':>10} {'rounds':>7}"]
+    for bench in results:
+        stats = bench['stats']
+        lines.append(
+            f"{bench['fullname']:<60} {stats['median'] * 1000:>10.3f}ms {stats['mean'] * 1000:>10.3f}ms "
+            f"{stats['ops']:>10.1f} {stats['rounds']:>7}"
+        )
+    return "\n".join(lines)
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in rows:
+        if row['baseline'] is None:
+            lines.append(f"{row['name']:<60} {'-':>12} {row['current'] * 1000:>10.3f}ms {'new':>9}")
+            continue
+        flag = "  REGRESSION" if row['regression'] else ""
+        lines.append(
+            f"{row['name']:<60} {row['baseline'] * 1000:>10.3f}ms {row['current'] * 1000:>10.3f}ms "
+            f"{row['change'] * 100:>+8.1f}%{flag}"
+        )
+    return "\n".join(lines)
@@ -1,37 +1,149 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger(name="pubmed_etl", level="INFO"):
+from src.config.config import LOG_ASYNC, LOG_JSON
+
+# attributes every LogRecord has, anything else was passed with extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    # one json object per line, extra={...} fields are kept as top level keys
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _LazyQueueHandler(QueueHandler):
+    # the stock QueueHandler runs the full formatter on the calling thread,
+    # here only the message is resolved and formatting happens on the listener
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class _DispatchHandler(logging.Handler):
+    # hands queued records to the handlers of the logger that produced them
+
+    def __init__(self):
+        super().__init__()
+        self.handlers = {}
+
+    def handle(self, record):
+        for handler in self.handlers.get(record.name, []):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+_queue = queue.Queue(-1)
+_queue_handlers = []
+_dispatcher = _DispatchHandler()
+_listener = None
+_listener_lock = threading.Lock()
+
+def _start_listener():
+    # one background thread writes the records of every logger
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_queue, _dispatcher)
+            _listener.start()
+            atexit.register(stop_logging)
+
+def _reinit_after_fork():
+    # the listener thread does not survive fork, forked workers get their own
+    global _queue, _listener, _listener_lock
+    _queue = queue.Queue(-1)
+    _listener_lock = threading.Lock()
+    for handler in _queue_handlers:
+        handler.queue = _queue
+    if _listener is not None:
+        _listener = None
+        _start_listener()
+
+os.register_at_fork(after_in_child=_reinit_after_fork)
+
+def flush_logs():
+    # block until the background thread has written everything queued so far
+    if _listener is not None:
+        _queue.join()
+
+def stop_logging():
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+    for handlers in _dispatcher.handlers.values():
+        for handler in handlers:
+            handler.close()
+
+def setup_logger(name="pubmed_etl", level="INFO", json_format=None, use_queue=None):
     # basic logger setup
+    json_format = LOG_JSON if json_format is None else json_format
+    use_queue = LOG_ASYNC if use_queue is None else use_queue
+
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
+    _queue_handlers[:] = [h for h in _queue_handlers if h not in logger.handlers]
     logger.handlers.clear()
-    
+
     # format for logs
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+    if json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
     # console output
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
     # file output
     log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
+
     file_handler = logging.FileHandler(
-        os.path.join(log_dir, f"{name}_{datetime.now().strftime('%Y%m%d')}.log")
+        os.path.join(log_dir, f"{name}_{datetime.now().strftime('%Y%m%d')}.{'jsonl' if json_format else 'log'}")
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+
+    if use_queue:
+        # the caller only puts the record on a queue, file and console I/O
+        # happen on the background listener thread
+        for old_handler in _dispatcher.handlers.get(name, []):
+            old_handler.close()
+        _dispatcher.handlers[name] = [console_handler, file_handler]
+        queue_handler = _LazyQueueHandler(_queue)
+        _queue_handlers.append(queue_handler)
+        logger.addHandler(queue_handler)
+        _start_listener()
+    else:
+        logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+
     return logger
 
 def get_logger(name="pubmed_etl"):
@@ -39,3 +151,37 @@ def get_logger(name="pubmed_etl"):
     if not logger.handlers:
         return setup_logger(name)
     return logger
+
+class LogSampler:
+    # rate limits per-item log lines: a key is logged on its first call and then
+    # once every `every` calls or `interval` seconds, whichever comes first,
+    # with the number of lines skipped since the last one
+
+    def __init__(self, every=100, interval=5.0):
+        self.every = every
+        self.interval = interval
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def should_log(self, key):
+        # returns the number of suppressed calls when this one should be logged, otherwise None
+        now = time.monotonic()
+        with self._lock:
+            count, suppressed, last = self._state.get(key, (0, 0, None))
+            count += 1
+            if last is None or count >= self.every or now - last >= self.interval:
+                self._state[key] = (0, 0, now)
+                return suppressed
+            self._state[key] = (count, suppressed + 1, last)
+            return None
+
+    def log(self, logger, level, key, msg, *args):
+        if not logger.isEnabledFor(level):
+            return
+        suppressed = self.should_log(key)
+        if suppressed is None:
+            return
+        if suppressed:
+            msg += " (%d similar suppressed)"
+            args = args + (suppressed,)
+        logger.log(level, msg, *args)
@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+class Histogram:
+    # log-scale buckets (BUCKETS_PER_DOUBLING per doubling), so memory stays bounded
+    # however many samples a long run or the daemon observes. count, total, min
+    # and max are exact, percentiles are within ~2% of the true value
+
+    BUCKETS_PER_DOUBLING = 16
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, value):
+        # zero and negative values share one bucket below every positive one
+        if value <= 0:
+            return None
+        return math.floor(math.log2(value) * self.BUCKETS_PER_DOUBLING)
+
+    def observe(self, value):
+        bucket = self._bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        # nearest-rank percentile, p in 0..100, the geometric middle of its bucket
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets, key=lambda b: float('-inf') if b is None else b):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                break
+        if bucket is None:
+            return min(self.min, 0.0)
+        value = 2 ** ((bucket + 0.5) / self.BUCKETS_PER_DOUBLING)
+        return min(max(value, self.min), self.max)
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99)
+        }
+
+class RunMetrics:
+    # stage timings (seconds), sizes and counters for one run
+
+    def __init__(self, name="etl"):
+        self.name = name
+        self.histograms = {}
+        self.counters = {}
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, value):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(value)
+
+    def incr(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def report(self, **extra):
+        # json friendly run report
+        elapsed = self.elapsed
+        processed = self.counters.get('articles_processed', 0)
+        with self._lock:
+            stages = {stage: hist.summary() for stage, hist in self.histograms.items()}
+            counters = dict(self.counters)
+        report = {
+            'name': self.name,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'duration_seconds': elapsed,
+            'articles_per_second': processed / elapsed if elapsed else 0.0,
+            'counters': counters,
+            'stages': stages
+        }
+        report.update(extra)
+        return report
+
+    def write_report(self, directory="logs", **extra):
+        os.makedirs(directory, exist_ok=True)
+        # microseconds and the pid, runs started in the same second (workers,
+        # parallel cli jobs) must not overwrite each other's report
+        stamp = self.started_at.strftime('%Y%m%d_%H%M%S_%f')
+        path = os.path.join(directory, f"{self.name}_run_{stamp}_{os.getpid()}.json")
+        with open(path, "w") as f:
+            json.dump(self.report(**extra), f, indent=2, default=str)
+        return path
+
+    def format_summary(self):
+        # console table, times in ms, byte stages in KB
+        report = self.report()
+        lines = [
+            f"{'stage':<22} {'count':>7} {'p50':>10} {'p95':>10} {'p99':>10} {'total':>10}",
+        ]
+        for stage, summary in sorted(report['stages'].items()):
+            if not summary['count']:
+                continue
+            if stage.endswith('_bytes'):
+                scale, unit = 1 / 1024.0, "KB"
+            else:
+                scale, unit = 1000.0, "ms"
+            lines.append(
+                f"{stage:<22} {summary['count']:>7} "
+                f"{summary['p50'] * scale:>8.1f}{unit} {summary['p95'] * scale:>8.1f}{unit} "
+                f"{summary['p99'] * scale:>8.1f}{unit} {summary['total'] * scale:>8.0f}{unit}"
+            )
+        lines.append(
+            f"{report['counters'].get('articles_processed', 0)} articles in {report['duration_seconds']:.1f}s "
+            f"({report['articles_per_second']:.2f} articles/s)"
+        )
+        return "\n".join(lines)
+
+def timed(metrics, stage):
+    # metrics.timer(stage) when metrics are being collected, otherwise a no-op
+    if metrics is None:
+        return nullcontext()
+    return metrics.timer(stage)
@@ -0,0 +1,256 @@
+"""
+On-demand profiling for ETL runs and Streamlit script runs.
+
+Turned on with the PROFILE env var (or AppSettings.profile), a comma separated
+list of modes:
+    cprofile     deterministic profile, written as a pstats .prof file
+    sample       sampling profiler, written as a speedscope .speedscope.json file
+    tracemalloc  memory snapshot (.tracemalloc) with the top allocation sites
+
+Files go to logs/ and the top functions by cumulative time are returned in
+Profiler.summary so they can be added to run reports.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.config.config import PROFILE, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL_MS
+from src.utils.logger import get_logger
+
+logger = get_logger("profiling")
+
+VALID_MODES = ('cprofile', 'sample', 'tracemalloc')
+
+
+def parse_modes(value):
+    # "cprofile, tracemalloc" -> ['cprofile', 'tracemalloc']
+    modes = [mode.strip().lower() for mode in (value or "").split(",") if mode.strip()]
+    for mode in modes:
+        if mode not in VALID_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', use one of: {', '.join(VALID_MODES)}")
+    return modes
+
+
+class _StackSampler:
+    # samples one thread's stack at a fixed interval
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = []
+        self.frame_index = {}
+        self.samples = []
+        self.weights = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _frame_id(self, code, line):
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        if key not in self.frame_index:
+            self.frame_index[key] = len(self.frames)
+            self.frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+        return self.frame_index[key]
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                last = now
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack)
+            self.weights.append(now - last)
+            last = now
+
+    def to_speedscope(self, name):
+        total = sum(self.weights)
+        return {
+            '$schema': "https://www.speedscope.app/file-format-schema.json",
+            'name': name,
+            'exporter': "pubmed-etl-profiler",
+            'activeProfileIndex': 0,
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': "sampled",
+                'name': name,
+                'unit': "seconds",
+                'startValue': 0,
+                'endValue': total,
+                'samples': self.samples,
+                'weights': self.weights
+            }]
+        }
+
+    def top_functions(self, limit):
+        # inclusive (cumulative) time per function across samples
+        cumulative = {}
+        for stack, weight in zip(self.samples, self.weights):
+            for frame_id in set(stack):
+                cumulative[frame_id] = cumulative.get(frame_id, 0.0) + weight
+        ranked = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {
+                'function': f"{self.frames[frame_id]['file']}:{self.frames[frame_id]['line']}({self.frames[frame_id]['name']})",
+                'cumtime': seconds
+            }
+            for frame_id, seconds in ranked
+        ]
+
+
+class Profiler:
+    """Profiles a block of code with the requested modes"""
+
+    def __init__(self, name, modes=None, output_dir=PROFILE_DIR,
+                 interval_ms=PROFILE_SAMPLE_INTERVAL_MS, top_n=15):
+        self.name = name
+        self.modes = parse_modes(modes) if isinstance(modes, str) else list(modes or [])
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000.0
+        self.top_n = top_n
+        self.summary = {'name': name, 'modes': self.modes, 'files': []}
+
+        self._profile = None
+        self._sampler = None
+        self._started_tracemalloc = False
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if 'tracemalloc' in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        if 'sample' in self.modes:
+            self._sampler = _StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        if 'cprofile' in self.modes:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._sampler.stop()
+
+        self.summary['duration_seconds'] = time.perf_counter() - self._started
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(
+            self.output_dir, f"profile_{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        )
+
+        try:
+            if self._profile:
+                self._write_pstats(base + ".prof")
+            if self._sampler:
+                self._write_speedscope(base + ".speedscope.json")
+            if 'tracemalloc' in self.modes and tracemalloc.is_tracing():
+                self._write_tracemalloc(base + ".tracemalloc")
+        except Exception as e:
+            logger.error(f"Error writing profile for {self.name}: {str(e)}")
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+        return self.summary
+
+    def _write_pstats(self, path):
+        self._profile.dump_stats(path)
+        self.summary['files'].append(path)
+
+        stats = pstats.Stats(self._profile)
+        stats.sort_stats('cumulative')
+        top = []
+        for func in stats.fcn_list[:self.top_n]:
+            primitive_calls, calls, tottime, cumtime, _ = stats.stats[func]
+            top.append({
+                'function': pstats.func_std_string(func),
+                'calls': calls,
+                'tottime': tottime,
+                'cumtime': cumtime
+            })
+        self.summary['top_functions'] = top
+
+    def _write_speedscope(self, path):
+        with open(path, "w") as f:
+            json.dump(self._sampler.to_speedscope(self.name), f)
+        self.summary['files'].append(path)
+        self.summary['samples'] = len(self._sampler.samples)
+        # cprofile numbers are exact, only use sampled ones when it is not running
+        if 'top_functions' not in self.summary:
+            self.summary['top_functions'] = self._sampler.top_functions(self.top_n)
+
+    def _write_tracemalloc(self, path):
+        snapshot = tracemalloc.take_snapshot()
+        snapshot.dump(path)
+        self.summary['files'].append(path)
+
+        current, peak = tracemalloc.get_traced_memory()
+        self.summary['memory'] = {
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top_allocations': [
+                {'location': str(stat.traceback[0]), 'size_bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top_n]
+            ]
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def format_profile_summary(summary, limit=10):
+    # console lines with the top functions by cumulative time
+    lines = [f"Profile '{summary['name']}' ({', '.join(summary['modes'])}): {', '.join(summary['files'])}"]
+    for func in summary.get('top_functions', [])[:limit]:
+        calls = f" {func['calls']:>8} calls" if 'calls' in func else ""
+        lines.append(f"  {func['cumtime'] * 1000:>10.1f}ms{calls}  {func['function']}")
+    memory = summary.get('memory')
+    if memory:
+        lines.append(f"  memory peak {memory['peak_bytes'] / 1024 / 1024:.1f} MB")
+        for alloc in memory['top_allocations'][:5]:
+            lines.append(f"  {alloc['size_bytes'] / 1024:>10.1f}KB  {alloc['location']}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def maybe_profile(name, modes=None):
+    # yields a running Profiler when profiling is switched on, otherwise None
+    modes = parse_modes(PROFILE) if modes is None else modes
+    if not modes:
+        yield None
+        return
+
+    profiler = Profiler(name, modes)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        logger.info(format_profile_summary(profiler.summary))
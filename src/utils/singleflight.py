@@ -0,0 +1,118 @@
+"""
+Single-flight request coalescing: concurrent identical calls wait on the
+one that is already running and share its result (or its exception)
+instead of each hitting Postgres or the model.
+
+Only calls that overlap in time are coalesced, nothing is kept once the
+call returns, so this is not a cache. A shared result is deep copied for
+every caller so one session cannot change another's. Only coalesce calls
+that return plain data (DataFrames, dicts, lists of rows): ORM instances are
+bound to the session that loaded them and must not be handed to others.
+
+    flights = SingleFlight("qa")
+    sql, shared = flights.do(key, generate, question)
+
+    class DatabaseManager:
+        @coalesced
+        def get_top_journals(self, limit=10, fresh=False): ...
+
+@coalesced methods need a `_flights` SingleFlight on the instance. Calls
+with fresh=True are never coalesced: a call already in flight may have
+started before the caller's own write.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self, name="singleflight"):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        # calls: every do(), executed: ran fn, shared: waited on another call
+        self.stats = {'calls': 0, 'executed': 0, 'shared': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        # returns (result, shared), shared is True when more than one caller got this result
+        with self._lock:
+            self.stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['executed'] += 1
+            else:
+                call.waiters += 1
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+        return call.result, shared
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._calls))
+
+def _freeze(value):
+    # hashable version of call arguments (lists and dicts from callers)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+def _copy(result):
+    # DataFrames copy their data themselves, everything else is deep copied
+    if hasattr(result, 'to_numpy') and hasattr(result, 'copy'):
+        return result.copy(deep=True)
+    return copy.deepcopy(result)
+
+def coalesced(method):
+    # coalesce concurrent calls of a method with the same arguments on the same instance
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop('self')
+        if arguments.get('fresh'):
+            return method(self, *args, **kwargs)
+        key = (method.__name__, _freeze(arguments))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        result, shared = self._flights.do(key, method, self, *args, **kwargs)
+        return _copy(result) if shared else result
+    return wrapper
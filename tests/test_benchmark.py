@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.benchmark import BenchmarkRunner, summarize, compare_results, load_results
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_summarize(self):
+        stats = summarize([0.1, 0.2, 0.3, 0.4])
+        self.assertAlmostEqual(stats['min'], 0.1)
+        self.assertAlmostEqual(stats['max'], 0.4)
+        self.assertAlmostEqual(stats['median'], 0.25)
+        self.assertEqual(stats['rounds'], 4)
+
+    def test_runner_uses_setup_outside_timing(self):
+        calls = []
+        runner = BenchmarkRunner(min_rounds=3, max_time=0, warmup=0)
+        result = runner.run("append", calls.append, group="unit", setup=lambda: (1,))
+        self.assertEqual(result['fullname'], "unit::append")
+        self.assertEqual(result['stats']['rounds'], 3)
+        self.assertEqual(len(calls), 3)
+
+    def test_save_and_load(self):
+        runner = BenchmarkRunner(min_rounds=2, max_time=0)
+        runner.run("noop", lambda: None)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = runner.save(os.path.join(tmp, "results", "run.json"))
+            data = load_results(path)
+        self.assertEqual(len(data['benchmarks']), 1)
+        self.assertIn('machine_info', data)
+
+    def test_compare_flags_regressions(self):
+        def result(name, median):
+            return {'fullname': name, 'stats': {'median': median}}
+        baseline = {'benchmarks': [result("a", 1.0), result("b", 1.0)]}
+        current = {'benchmarks': [result("a", 1.5), result("b", 1.1), result("c", 1.0)]}
+
+        rows = {row['name']: row for row in compare_results(baseline, current, threshold=0.2)}
+        self.assertTrue(rows['a']['regression'])
+        self.assertFalse(rows['b']['regression'])
+        self.assertIsNone(rows['c']['baseline'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.database.bulk_load import InitialLoader
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+
+TEST_DATABASE = "pubmed_test_initial_load"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+class TestInitialLoader(unittest.TestCase):
+
+    def setUp(self):
+        # fresh empty database for every test
+        admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+        admin.dispose()
+        self.db = DatabaseManager(_url(TEST_DATABASE))
+        self.db.create_tables()
+
+    def tearDown(self):
+        self.db.engine.dispose()
+
+    def _constraints(self):
+        with self.db.engine.connect() as conn:
+            return sorted(conn.execute(text(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid::regclass::text IN ('journals', 'authors', 'mesh_terms', 'articles', "
+                "'article_authors', 'article_mesh_terms')")).all())
+
+    def test_initial_load_matches_articles(self):
+        articles = SyntheticCorpus(CorpusConfig(seed=7)).articles(300)
+        # a repeated record must not be loaded twice
+        articles.append(articles[0])
+        before = self._constraints()
+
+        stats = InitialLoader(self.db).load(articles, batch_size=100)
+
+        authors = {(a['last_name'], a['first_name']) for data in articles for a in data['authors']}
+        mesh_terms = {term for data in articles for term in data['mesh_terms']}
+        self.assertEqual(stats['rows']['articles'], 300)
+        self.assertEqual(stats['rows']['authors'], len(authors))
+        self.assertEqual(stats['rows']['mesh_terms'], len(mesh_terms))
+        self.assertEqual(stats['rows']['article_mesh_terms'],
+                         len({(int(d['pmid']), t) for d in articles for t in d['mesh_terms']}))
+        self.assertEqual(self._constraints(), before)
+
+        # the loaded data looks like the regular insert path wrote it
+        article = self.db.get_article_by_pmid(int(articles[5]['pmid']))
+        self.assertEqual(article.title, articles[5]['title'])
+        self.assertEqual(self.db.insert_articles_bulk(articles[:10]), 0)
+
+    def test_requires_empty_tables(self):
+        self.db.insert_articles_bulk(SyntheticCorpus().articles(1))
+        with self.assertRaises(ValueError):
+            InitialLoader(self.db).begin()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import requests
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.database.models import IngestState
+from src.etl.daemon import IngestDaemon, SavedSearch, load_search_config, search_window
+from src.etl.eutils_server import EUtilsStubServer, ArticleStore
+from src.etl.rate_limit import RateLimiter
+
+TEST_DATABASE = "pubmed_test_daemon"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _recreate_database(create=True):
+    admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+        if create:
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+    admin.dispose()
+
+class TestSearchConfig(unittest.TestCase):
+
+    def test_load_config(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({'workers': 3, 'searches': [{'name': 'a', 'term': 'cancer', 'interval_minutes': 15}]}, f)
+        try:
+            searches, options = load_search_config(f.name)
+        finally:
+            os.remove(f.name)
+        self.assertEqual(options['workers'], 3)
+        self.assertEqual(searches[0].interval, timedelta(minutes=15))
+
+    def test_invalid_search(self):
+        with self.assertRaises(ValueError):
+            SavedSearch("a", "cancer", interval_minutes=0)
+
+    def test_search_window(self):
+        today = date(2025, 3, 10)
+        self.assertEqual(search_window(None, today, 30), (date(2025, 2, 8), today))
+        state = IngestState(last_window_end=date(2025, 3, 9))
+        self.assertEqual(search_window(state, today, 30), (date(2025, 3, 9), today))
+
+class TestIngestDaemon(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        _recreate_database()
+        cls.db = DatabaseManager(_url(TEST_DATABASE))
+        cls.db.create_tables()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.engine.dispose()
+        _recreate_database(create=False)
+
+    def setUp(self):
+        self._delete_state()
+        self.store = ArticleStore(synthetic_count=15)
+        self.server = EUtilsStubServer(store=self.store).start()
+        self.daemon = IngestDaemon(
+            [SavedSearch("test-daemon", "daemon refresh", interval_minutes=60)],
+            db=self.db, base_url=self.server.base_url, workers=2, batch_size=10,
+            rate_limiter=RateLimiter(100)
+        )
+
+    def tearDown(self):
+        self.daemon.stop()
+        self.server.stop()
+        self._delete_state()
+
+    def _delete_state(self):
+        session = self.db.get_session()
+        session.query(IngestState).filter(IngestState.name == "test-daemon").delete()
+        session.commit()
+        session.close()
+
+    def test_tick_runs_due_searches_once(self):
+        results = [future.result() for future in self.daemon.tick()]
+        self.assertEqual(results[0]['status'], 'ok')
+        self.assertEqual(results[0]['found'], 15)
+        self.assertEqual(results[0]['window'][1], str(datetime.now(timezone.utc).date()))
+
+        # not due again until the interval has passed
+        self.assertEqual(self.daemon.tick(), [])
+        later = datetime.now(timezone.utc) + timedelta(minutes=61)
+        self.assertEqual([s.name for s in self.daemon.due_searches(later)], ["test-daemon"])
+
+    def test_failed_run_keeps_window(self):
+        self.server.error_rate = 1.0
+        result = self.daemon.run_search(self.daemon.searches["test-daemon"])
+        self.server.error_rate = 0.0
+        self.assertEqual(result['status'], 'error')
+
+        session = self.db.get_session()
+        state = session.get(IngestState, "test-daemon")
+        session.close()
+        self.assertEqual(state.last_status, 'error')
+        self.assertIsNone(state.last_window_end)
+
+    def _state(self):
+        session = self.db.get_session()
+        state = session.get(IngestState, "test-daemon")
+        session.close()
+        return state
+
+    def test_esearch_pages_through_window(self):
+        with mock.patch('src.etl.pubmed_etl.ESEARCH_PAGE_SIZE', 4):
+            result = self.daemon.run_search(self.daemon.searches["test-daemon"])
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual((result['found'], result['matched']), (15, 15))
+        self.assertIsNotNone(self._state().last_window_end)
+
+    def test_over_full_window_is_split(self):
+        # 15 matches over 30 days, at most 6 per run: every run loads whole
+        # days and moves the window, the search is due again until it is done
+        search = self.daemon.searches["test-daemon"]
+        search.max_articles = 6
+        results = []
+        while not results or results[-1]['status'] == 'partial':
+            self.assertEqual([s.name for s in self.daemon.due_searches()], ["test-daemon"])
+            results.append(self.daemon.run_search(search))
+            self.assertLessEqual(results[-1]['found'], 6)
+            self.assertLess(len(results), 10)
+
+        self.assertGreater(len(results), 2)
+        self.assertEqual(results[-1]['status'], 'ok')
+        self.assertEqual(results[0]['matched'], 15)
+        ends = [result['window_end'] for result in results]
+        self.assertEqual(ends, sorted(set(ends)))
+        self.assertEqual(sum(result['found'] for result in results), 15)
+        self.assertEqual(self._state().last_window_end, datetime.now(timezone.utc).date())
+        self.assertEqual(self.daemon.due_searches(), [])
+
+    def test_over_full_day_is_fetched_whole(self):
+        # every record entered today, a day cannot be split further
+        self.store.synthetic_days = 1
+        self.daemon.searches["test-daemon"].max_articles = 10
+        result = self.daemon.run_search(self.daemon.searches["test-daemon"])
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['found'], 15)
+
+    def test_insert_error_keeps_window(self):
+        with mock.patch.object(self.db, 'insert_articles_bulk', side_effect=RuntimeError("database is down")):
+            result = self.daemon.run_search(self.daemon.searches["test-daemon"])
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(self._state().last_status, 'error')
+        self.assertIsNone(self._state().last_window_end)
+
+    def test_status_endpoint(self):
+        for future in self.daemon.tick():
+            future.result()
+        port = self.daemon.serve_status(port=0)
+        status = requests.get(f"http://127.0.0.1:{port}/status").json()
+        search = status['searches'][0]
+        self.assertEqual(search['name'], "test-daemon")
+        self.assertEqual(search['last_status'], 'ok')
+        self.assertEqual(search['last_found'], 15)
+        self.assertIsNotNone(search['next_run_at'])
+
+if __name__ == '__main__':
+    unittest.main()
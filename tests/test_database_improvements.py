@@ -1,16 +1,49 @@
 import unittest
 import os
 import sys
+import threading
+import time
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.config.config import DB_CONFIG
 from src.database.database import DatabaseManager
+from src.database.db_manager import compute_article_hash
 from src.database.models import Journal, Author, Article, MeshTerm
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+
+TEST_DATABASE = "pubmed_test_db_improvements"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _recreate_database(create=True):
+    admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+        if create:
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+    admin.dispose()
 
 class TestDatabaseImprovements(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        # the insert tests write articles, into a throwaway database
+        _recreate_database()
+    
+    @classmethod
+    def tearDownClass(cls):
+        _recreate_database(create=False)
+    
     def setUp(self):
         # make database manager
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(_url(TEST_DATABASE))
+    
+    def tearDown(self):
+        self.db.engine.dispose()
     
     def test_create_tables(self):
         # test making tables
@@ -52,5 +85,113 @@ class TestDatabaseImprovements(unittest.TestCase):
         # can be None or Article object
         self.assertTrue(result is None or hasattr(result, 'pmid'))
 
+    def test_insert_articles_bulk(self):
+        # test bulk insert, second run should skip existing pmids
+        self.db.create_tables()
+        articles = SyntheticCorpus(CorpusConfig(pmid_start=990000000)).articles(20)
+        self.assertEqual(self.db.insert_articles_bulk(articles), 20)
+        self.assertEqual(self.db.insert_articles_bulk(articles), 0)
+        self.assertIsNotNone(self.db.get_article_by_pmid(990000000))
+    
+    def test_insert_articles_bulk_raises_on_error(self):
+        # a failed batch raises and writes nothing, it is never reported as 0 new
+        self.db.create_tables()
+        articles = SyntheticCorpus(CorpusConfig(pmid_start=990003000)).articles(2)
+        articles[1]['publication_year'] = 'not a year'
+        with self.assertRaises(Exception):
+            self.db.insert_articles_bulk(articles)
+        self.assertIsNone(self.db.get_article_by_pmid(990003000))
+    
+    def test_insert_articles_bulk_concurrent_batch(self):
+        # another batch inserts an article and a new author between the lookup
+        # and the inserts: the batch waits for it and skips both, no unique violation
+        self.db.create_tables()
+        articles = SyntheticCorpus(CorpusConfig(pmid_start=990004000)).articles(3)
+        author = {'last_name': 'Concurrent', 'first_name': 'Batch', 'middle_name': '', 'full_name': 'Batch Concurrent'}
+        articles[0]['authors'] = [author]
+        with self.db.engine.begin() as conn:
+            conn.execute(pg_insert(Journal).values(title=articles[0]['journal_title']).on_conflict_do_nothing())
+        
+        other = self.db.engine.connect()
+        other.begin()
+        other.execute(insert(Author).values(last_name='Concurrent', first_name='Batch', full_name='Batch Concurrent'))
+        journal_id = other.execute(text("SELECT id FROM journals WHERE title = :title"),
+                                   {'title': articles[0]['journal_title']}).scalar()
+        other.execute(insert(Article).values(pmid=990004000, title='written concurrently', journal_id=journal_id))
+        
+        result = {}
+        writer = threading.Thread(target=lambda: result.update(written=self.db.insert_articles_bulk(articles)))
+        writer.start()
+        time.sleep(0.5)
+        other.commit()
+        other.close()
+        writer.join()
+        
+        self.assertEqual(result['written'], 2)
+        self.assertEqual(self.db.get_article_by_pmid(990004000).title, 'written concurrently')
+        session = self.db.get_session()
+        try:
+            self.assertEqual(session.query(Author).filter(Author.last_name == 'Concurrent').count(), 1)
+        finally:
+            session.close()
+    
+    def test_article_hash(self):
+        # mesh term order does not matter, content does
+        article = SyntheticCorpus().article(30000001)
+        reordered = dict(article, mesh_terms=list(reversed(article['mesh_terms'])))
+        retitled = dict(article, title=article['title'] + " (corrected)")
+        self.assertEqual(compute_article_hash(article), compute_article_hash(reordered))
+        self.assertNotEqual(compute_article_hash(article), compute_article_hash(retitled))
+    
+    def _associations(self, pmid):
+        session = self.db.get_session()
+        try:
+            article = session.query(Article).filter(Article.pmid == pmid).first()
+            return (article.title,
+                    sorted((a.last_name, a.first_name) for a in article.authors),
+                    sorted(m.term for m in article.mesh_terms))
+        finally:
+            session.close()
+    
+    def _revise(self, article):
+        # corrected title, one mesh term dropped and one author added
+        return dict(
+            article,
+            title=article['title'] + " (corrected)",
+            mesh_terms=article['mesh_terms'][1:],
+            authors=article['authors'] + [{'last_name': 'Revised', 'first_name': 'Added',
+                                           'middle_name': '', 'full_name': 'Added Revised'}]
+        )
+    
+    def test_bulk_upsert_changed_articles(self):
+        self.db.create_tables()
+        articles = SyntheticCorpus(CorpusConfig(pmid_start=990001000, mesh_missing_rate=0)).articles(5)
+        self.db.insert_articles_bulk(articles)
+        
+        revised = self._revise(articles[0])
+        self.assertEqual(self.db.insert_articles_bulk([revised] + articles[1:]), 1)
+        title, authors, mesh_terms = self._associations(990001000)
+        self.assertEqual(title, revised['title'])
+        self.assertIn(('Revised', 'Added'), authors)
+        self.assertEqual(mesh_terms, sorted(set(revised['mesh_terms'])))
+        
+        # put the original back for the next run
+        self.assertEqual(self.db.insert_articles_bulk(articles), 1)
+    
+    def test_insert_article_data_updates_changed_article(self):
+        self.db.create_tables()
+        article = SyntheticCorpus(CorpusConfig(pmid_start=990002000, mesh_missing_rate=0)).article(990002000)
+        self.assertTrue(self.db.insert_article_data(article))
+        
+        revised = self._revise(article)
+        self.assertTrue(self.db.insert_article_data(revised))
+        title, authors, mesh_terms = self._associations(990002000)
+        self.assertEqual(title, revised['title'])
+        self.assertIn(('Revised', 'Added'), authors)
+        self.assertEqual(mesh_terms, sorted(set(revised['mesh_terms'])))
+        
+        self.assertTrue(self.db.insert_article_data(article))
+        self.assertEqual(self._associations(990002000)[0], article['title'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import requests
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.etl.eutils_server import EUtilsStubServer, ArticleStore
+from src.etl.synthetic_corpus import SYNTHETIC_PMID_START
+from src.etl.pubmed_etl import PubMedETL
+from src.api.health import HealthChecker
+
+TEST_DATABASE = "pubmed_test_eutils"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _recreate_database(create=True):
+    admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+        if create:
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+    admin.dispose()
+
+class TestEUtilsStubServer(unittest.TestCase):
+
+    def setUp(self):
+        # process_articles writes what it fetched, into a throwaway database
+        _recreate_database()
+        self.db = DatabaseManager(_url(TEST_DATABASE))
+        self.server = EUtilsStubServer(store=ArticleStore(synthetic_count=30)).start()
+        self.etl = PubMedETL(base_url=self.server.base_url, db=self.db)
+
+    def tearDown(self):
+        self.server.stop()
+        self.db.engine.dispose()
+        _recreate_database(create=False)
+
+    def test_synthetic_pmids_are_not_real(self):
+        pmids = self.etl.search_articles("cancer", max_results=30)
+        self.assertTrue(all(int(pmid) >= SYNTHETIC_PMID_START for pmid in pmids))
+
+    def test_search_articles(self):
+        pmids = self.etl.search_articles("machine learning", max_results=10)
+        self.assertEqual(len(pmids), 10)
+
+    def test_search_is_deterministic(self):
+        first = self.etl.search_articles("cancer", max_results=5)
+        second = self.etl.search_articles("  CANCER ", max_results=5)
+        self.assertEqual(first, second)
+
+    def test_fetch_article_details(self):
+        pmid = self.etl.search_articles("cancer", max_results=1)[0]
+        article = self.etl.fetch_article_details(pmid)
+        self.assertEqual(article['pmid'], pmid)
+        self.assertTrue(article['title'])
+        self.assertTrue(article['journal_title'])
+        self.assertIsInstance(article['publication_year'], int)
+
+    def test_history_server(self):
+        url = self.server.base_url
+        response = requests.get(f"{url}esearch.fcgi",
+                                params={'db': 'pubmed', 'term': 'vaccine', 'usehistory': 'y', 'retmax': 0})
+        self.assertIn("<WebEnv>", response.text)
+        webenv = response.text.split("<WebEnv>")[1].split("</WebEnv>")[0]
+
+        response = requests.get(f"{url}efetch.fcgi",
+                                params={'db': 'pubmed', 'WebEnv': webenv, 'query_key': 1,
+                                        'retstart': 0, 'retmax': 7})
+        self.assertEqual(response.text.count("<PubmedArticle>"), 7)
+
+    def test_unknown_webenv(self):
+        response = requests.get(f"{self.server.base_url}efetch.fcgi",
+                                params={'db': 'pubmed', 'WebEnv': 'nope', 'query_key': 1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_process_articles_run_report(self):
+        report = self.etl.process_articles("run report", max_articles=2)
+        for stage in ['esearch', 'efetch', 'efetch_bytes', 'parse', 'clean', 'db_insert', 'db_article_lookup']:
+            self.assertIn(stage, report['stages'])
+        self.assertEqual(report['counters']['articles_processed'], 2)
+        # one clean sample per article, not per cleaned field
+        self.assertEqual(report['stages']['clean']['count'], 2)
+        self.assertTrue(os.path.exists(report['report_path']))
+
+    def test_process_articles_profile(self):
+        with mock.patch('src.utils.profiling.PROFILE', 'cprofile'):
+            report = self.etl.process_articles("profiled run", max_articles=1)
+        self.assertTrue(report['profile']['files'][0].endswith(".prof"))
+        self.assertTrue(report['profile']['top_functions'])
+
+    def test_health_check_uses_stub(self):
+        checker = HealthChecker(pubmed_base_url=self.server.base_url)
+        self.assertEqual(checker.check_pubmed_api()['status'], "healthy")
+
+class TestEUtilsStubFaults(unittest.TestCase):
+
+    def test_error_injection(self):
+        with EUtilsStubServer(error_rate=1.0) as server:
+            etl = PubMedETL(base_url=server.base_url)
+            self.assertEqual(etl.search_articles("cancer"), [])
+            self.assertEqual(server.get_stats()['errors_injected'], 1)
+
+    def test_rate_limit(self):
+        with EUtilsStubServer(rate_limit=1) as server:
+            url = f"{server.base_url}esearch.fcgi"
+            statuses = [requests.get(url, params={'term': 'x'}).status_code for _ in range(3)]
+            self.assertIn(429, statuses)
+            self.assertGreater(server.get_stats()['rate_limited'], 0)
+
+    def test_replay_recorded_data(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            os.makedirs(os.path.join(data_dir, "articles"))
+            with open(os.path.join(data_dir, "searches.json"), "w") as f:
+                f.write('{"recorded term": ["111"]}')
+            with open(os.path.join(data_dir, "articles", "111.xml"), "w") as f:
+                f.write("<PubmedArticle><MedlineCitation><PMID>111</PMID><Article>"
+                        "<ArticleTitle>Recorded title</ArticleTitle></Article>"
+                        "</MedlineCitation></PubmedArticle>")
+
+            store = ArticleStore(data_dir=data_dir, synthetic=False)
+            with EUtilsStubServer(store=store) as server:
+                etl = PubMedETL(base_url=server.base_url)
+                self.assertEqual(etl.search_articles("Recorded  term"), ["111"])
+                self.assertEqual(etl.fetch_article_details("111")['title'], "Recorded title")
+                self.assertEqual(etl.search_articles("unknown"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.instrumentation import QueryStats, instrument_engine, normalize_statement, can_explain
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = QueryStats(slow_query_ms=0.000001, explain_slow=False)
+        self.engine = instrument_engine(create_engine("sqlite://"), self.stats)
+
+    def test_normalize_statement(self):
+        normalized = normalize_statement("SELECT *\n  FROM articles WHERE pmid = 123 AND title = 'x'")
+        self.assertEqual(normalized, "SELECT * FROM articles WHERE pmid = ? AND title = '?'")
+
+    def run_query(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1")).fetchall()
+
+    def test_records_call_site(self):
+        self.run_query()
+        self.run_query()
+        top = self.stats.top()
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0]['calls'], 2)
+        self.assertTrue(top[0]['call_site'].endswith("test_instrumentation.py:run_query"))
+
+    def test_slow_query_log(self):
+        self.run_query()
+        slow = self.stats.get_slow_queries()
+        self.assertEqual(len(slow), 1)
+        self.assertIsNone(slow[0]['plan'])
+        self.assertEqual(self.stats.summary()['slow_queries'], 1)
+
+    def test_instrument_once(self):
+        instrument_engine(self.engine, self.stats)
+        self.run_query()
+        self.assertEqual(self.stats.summary()['calls'], 1)
+
+    def test_reset(self):
+        self.run_query()
+        self.stats.reset()
+        self.assertEqual(self.stats.top(), [])
+
+class TestSlowQueryExplain(unittest.TestCase):
+
+    def setUp(self):
+        url = (f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@"
+               f"{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+        self.stats = QueryStats(slow_query_ms=0.000001)
+        self.engine = instrument_engine(create_engine(url), self.stats)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _plans(self, conn, statement):
+        self.stats.reset()
+        conn.execute(text(statement)).fetchall()
+        return [slow['plan'] for slow in self.stats.get_slow_queries()]
+
+    def test_can_explain(self):
+        self.assertTrue(can_explain("SELECT pmid FROM articles WHERE title LIKE '%x%'"))
+        self.assertTrue(can_explain("WITH recent AS (SELECT 1) SELECT * FROM recent"))
+        self.assertFalse(can_explain("SELECT id FROM etl_jobs LIMIT 1 FOR UPDATE SKIP LOCKED"))
+        self.assertFalse(can_explain("SELECT * FROM articles FOR NO KEY UPDATE"))
+        self.assertFalse(can_explain("WITH gone AS (DELETE FROM etl_jobs RETURNING id) SELECT count(*) FROM gone"))
+        self.assertFalse(can_explain("UPDATE etl_jobs SET status = 'done'"))
+
+    def test_plain_explain_by_default(self):
+        with self.engine.connect() as conn:
+            plan = self._plans(conn, "SELECT count(*) FROM generate_series(1, 10)")[0]
+        self.assertIn("Aggregate", plan)
+        self.assertNotIn("actual time", plan)
+
+    def test_analyze_leaves_nothing_behind(self):
+        self.stats.explain_analyze = True
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TEMP TABLE explain_probe (n int)"))
+            conn.execute(text("INSERT INTO explain_probe VALUES (1)"))
+            plan = self._plans(conn, "SELECT n FROM explain_probe")[0]
+            self.assertIn("actual time", plan)
+            # skipped statements get no plan and run exactly once
+            plans = self._plans(conn, "WITH gone AS (DELETE FROM explain_probe RETURNING n) "
+                                      "SELECT n FROM gone")
+            self.assertEqual(plans, [None])
+            conn.execute(text("INSERT INTO explain_probe VALUES (2)"))
+            # the caller's transaction is still usable
+            self.assertEqual(conn.execute(text("SELECT n FROM explain_probe")).scalars().all(), [2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+import json
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.logger import setup_logger, flush_logs, JsonFormatter, LogSampler
+
+class TestLogger(unittest.TestCase):
+
+    def test_queued_logger_writes_file(self):
+        logger = setup_logger("test_queued", use_queue=True, json_format=True)
+        logger.info("queued %s", "message", extra={'pmid': '123'})
+        flush_logs()
+
+        log_files = [f for f in os.listdir("logs") if f.startswith("test_queued_") and f.endswith(".jsonl")]
+        self.assertTrue(log_files)
+        with open(os.path.join("logs", log_files[0])) as f:
+            entry = json.loads(f.readlines()[-1])
+        self.assertEqual(entry['message'], "queued message")
+        self.assertEqual(entry['pmid'], '123')
+        self.assertEqual(entry['level'], "INFO")
+
+    def test_json_formatter_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.getLogger("test").makeRecord(
+                "test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertIn("ValueError: boom", entry['exc_info'])
+
+    def test_sampler_every(self):
+        sampler = LogSampler(every=10, interval=3600)
+        logged = [sampler.should_log("item") for _ in range(25)]
+        self.assertEqual([i for i, s in enumerate(logged) if s is not None], [0, 10, 20])
+        self.assertEqual(logged[10], 9)
+
+    def test_sampler_log_suppressed_count(self):
+        sampler = LogSampler(every=3, interval=3600)
+        logger = logging.getLogger("test_sampler")
+        logger.setLevel(logging.INFO)
+        with self.assertLogs(logger, level="INFO") as captured:
+            for i in range(4):
+                sampler.log(logger, logging.INFO, "item", "item %d", i)
+        self.assertEqual(captured.output, ["INFO:test_sampler:item 0", "INFO:test_sampler:item 3 (2 similar suppressed)"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.metrics import Histogram, RunMetrics, timed
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_percentiles(self):
+        hist = Histogram()
+        for value in range(1, 101):
+            hist.observe(value)
+        # bucketed, within 2% of the exact nearest-rank value
+        self.assertAlmostEqual(hist.percentile(50), 50, delta=1)
+        self.assertAlmostEqual(hist.percentile(95), 95, delta=1.9)
+        self.assertAlmostEqual(hist.percentile(99), 99, delta=1.98)
+        summary = hist.summary()
+        self.assertEqual((summary['count'], summary['total'], summary['min'], summary['max']), (100, 5050, 1, 100))
+
+    def test_histogram_memory_is_bounded(self):
+        hist = Histogram()
+        for i in range(100000):
+            hist.observe(0.001 + (i % 1000) * 0.00001)
+        hist.observe(0)
+        self.assertLess(len(hist.buckets), 100)
+        self.assertEqual(hist.percentile(0), 0)
+        self.assertAlmostEqual(hist.percentile(50), 0.006, delta=0.006 * 0.03)
+
+    def test_empty_histogram(self):
+        self.assertEqual(Histogram().summary(), {'count': 0})
+
+    def test_timer_and_counters(self):
+        metrics = RunMetrics("unit")
+        with metrics.timer('parse'):
+            pass
+        metrics.incr('articles_processed', 3)
+        report = metrics.report(search_term="x")
+        self.assertEqual(report['stages']['parse']['count'], 1)
+        self.assertEqual(report['counters']['articles_processed'], 3)
+        self.assertEqual(report['search_term'], "x")
+        self.assertGreater(report['articles_per_second'], 0)
+
+    def test_timed_without_metrics(self):
+        with timed(None, 'parse'):
+            pass
+
+    def test_write_report(self):
+        metrics = RunMetrics("unit")
+        metrics.observe('efetch_bytes', 2048)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = metrics.write_report(tmp)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data['stages']['efetch_bytes']['p50'], 2048)
+        self.assertIn("efetch_bytes", metrics.format_summary())
+
+    def test_reports_of_concurrent_runs_do_not_collide(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {RunMetrics("unit").write_report(tmp) for _ in range(5)}
+            self.assertEqual(len(paths), 5)
+            self.assertEqual(len(os.listdir(tmp)), 5)
+
+if __name__ == '__main__':
+    unittest.main()
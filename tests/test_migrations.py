@@ -0,0 +1,126 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.database.migrate import (alembic_config, check_indexes, current_revision,
+                                  downgrade_database, head_revision, upgrade_database)
+from src.database.models import Base
+
+TEST_DATABASE = "pubmed_test_migrations"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _performance_indexes():
+    # the author lookup index became a unique one in 0005
+    indexes = ScriptDirectory.from_config(alembic_config()).get_revision('0002').module.INDEXES
+    return [index for index in indexes if index[0] != 'ix_authors_last_name_first_name']
+
+class TestRevisions(unittest.TestCase):
+
+    def test_single_linear_history(self):
+        script = ScriptDirectory.from_config(alembic_config())
+        self.assertEqual(script.get_heads(), [head_revision()])
+        chain = [rev.revision for rev in script.walk_revisions()]
+        self.assertEqual(chain[-1], '0001')
+        for rev in script.walk_revisions():
+            self.assertLessEqual(len(rev._all_down_revisions), 1)
+
+    def test_models_declare_migration_indexes(self):
+        # create_all (sqlite, tests) and the migrations must end up with the same indexes
+        declared = {index.name: (table.name, [c.name for c in index.columns])
+                    for table in Base.metadata.tables.values() for index in table.indexes}
+        for name, table, columns in _performance_indexes():
+            self.assertEqual(declared.get(name), (table, columns))
+        self.assertEqual(declared.get('uq_authors_last_name_first_name'), ('authors', ['last_name', 'first_name']))
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+        admin.dispose()
+        self.db = DatabaseManager(_url(TEST_DATABASE))
+
+    def tearDown(self):
+        self.db.engine.dispose()
+
+    def _indexes(self):
+        with self.db.engine.connect() as conn:
+            return {row[0] for row in conn.execute(text(
+                "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"))}
+
+    def test_upgrade_and_downgrade(self):
+        self.assertIsNone(current_revision(self.db.engine))
+        self.assertTrue(self.db.create_tables())
+        self.assertEqual(current_revision(self.db.engine), head_revision())
+        names = {name for name, _, _ in _performance_indexes()}
+        self.assertTrue(names <= self._indexes())
+
+        # running it again is a no-op
+        self.assertTrue(self.db.create_tables())
+        with self.db.engine.connect() as conn:
+            # the concurrently built indexes are valid, the migration lock was released
+            for name in ('ix_articles_fts', 'ix_articles_journal_id', 'ix_articles_publication_year'):
+                self.assertTrue(conn.execute(text(
+                    f"SELECT indisvalid FROM pg_index WHERE indexrelid = '{name}'::regclass")).scalar())
+            self.assertEqual(conn.execute(text(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND objid = 727100")).scalar(), 0)
+
+        downgrade_database(self.db.engine, '0001')
+        self.assertEqual(current_revision(self.db.engine), '0001')
+        self.assertFalse(names & self._indexes())
+
+    def test_upgrade_database_made_by_create_all(self):
+        # databases from before the migrations: tables exist, no alembic_version,
+        # possibly without columns added later. tables added by later
+        # revisions did not exist back then
+        legacy_tables = [table for name, table in Base.metadata.tables.items() if name != 'qa_sql_cache']
+        Base.metadata.create_all(bind=self.db.engine, tables=legacy_tables)
+        with self.db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE articles DROP COLUMN content_hash"))
+            conn.execute(text("DROP INDEX ix_articles_journal_id"))
+
+        self.assertTrue(self.db.create_tables())
+        self.assertEqual(current_revision(self.db.engine), head_revision())
+        self.assertIn('ix_articles_journal_id', self._indexes())
+        self.assertEqual(self.db.insert_articles_bulk([{
+            'pmid': '990003000', 'title': 'Migrated', 'abstract': '', 'publication_year': 2024,
+            'journal_title': 'Migration Journal', 'journal_issn': '', 'authors': [], 'mesh_terms': []
+        }]), 1)
+
+    def test_unique_authors_merges_duplicates(self):
+        upgrade_database(self.db.engine, '0004')
+        with self.db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO journals (id, title) VALUES (1, 'Journal')"))
+            conn.execute(text("INSERT INTO articles (pmid, title, journal_id) VALUES (990005000, 'a', 1), (990005001, 'b', 1)"))
+            conn.execute(text(
+                "INSERT INTO authors (id, last_name, first_name, full_name) VALUES "
+                "(1, 'Smith', 'John', 'John Smith'), (2, 'Smith', 'John', 'John Smith'), "
+                "(3, 'Smith', 'John', 'John Smith'), (4, 'Doe', NULL, 'Doe')"))
+            conn.execute(text(
+                "INSERT INTO article_authors VALUES (990005000, 1), (990005000, 2), (990005001, 3), (990005001, 4)"))
+
+        upgrade_database(self.db.engine)
+        with self.db.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT id, first_name FROM authors ORDER BY id")).all(),
+                             [(1, 'John'), (4, '')])
+            self.assertEqual(conn.execute(text(
+                "SELECT article_pmid, author_id FROM article_authors ORDER BY 1, 2")).all(),
+                             [(990005000, 1), (990005001, 1), (990005001, 4)])
+
+    def test_queries_can_use_indexes(self):
+        self.db.create_tables()
+        for result in check_indexes(self.db.engine, force=True):
+            self.assertTrue(result['uses_index'], f"{result['name']}: {result['indexes_in_plan']}")
+
+if __name__ == '__main__':
+    unittest.main()
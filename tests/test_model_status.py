@@ -0,0 +1,82 @@
+import threading
+import unittest
+from unittest import mock
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.api import health
+from src.qa import model_status
+from src.qa.model_status import ModelStatus, AVAILABLE, UNAVAILABLE, CHECKING, NOT_CONFIGURED
+
+class FakeProbe:
+    # counts probes, blocks until released when gated
+    def __init__(self, ok=True, gated=False):
+        self.ok = ok
+        self.calls = 0
+        self.release = threading.Event()
+        if not gated:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        return self.ok, "fake-model" if self.ok else "permission denied"
+
+class TestModelStatus(unittest.TestCase):
+
+    def test_status_does_not_wait_for_probe(self):
+        probe = FakeProbe(gated=True)
+        status = ModelStatus(probe)
+        self.assertEqual(status.status()['state'], CHECKING)
+        # a running probe is not started twice
+        self.assertEqual(status.status()['state'], CHECKING)
+
+        probe.release.set()
+        self.assertEqual(status.refresh(wait=5)['state'], AVAILABLE)
+        self.assertEqual(probe.calls, 1)
+
+    def test_result_is_cached_for_ttl(self):
+        probe = FakeProbe()
+        status = ModelStatus(probe, ttl_seconds=3600)
+        status.refresh(wait=5)
+        for _ in range(10):
+            self.assertEqual(status.status()['state'], AVAILABLE)
+        self.assertEqual(probe.calls, 1)
+
+    def test_failures_are_retried_sooner(self):
+        probe = FakeProbe(ok=False)
+        status = ModelStatus(probe, ttl_seconds=3600, retry_seconds=0.01)
+        self.assertEqual(status.refresh(wait=5)['state'], UNAVAILABLE)
+        self.assertEqual(status.status()['message'], "permission denied")
+
+        probe.ok = True
+        threading.Event().wait(0.02)
+        status.status()
+        self.assertEqual(status.refresh(wait=5)['state'], AVAILABLE)
+        self.assertGreaterEqual(probe.calls, 2)
+
+    def test_requests_report_outcome(self):
+        status = ModelStatus(FakeProbe(), ttl_seconds=3600)
+        status.refresh(wait=5)
+        status.record_failure(RuntimeError("quota exceeded"))
+        self.assertEqual(status.status()['state'], UNAVAILABLE)
+        status.record_success()
+        self.assertEqual(status.status()['state'], AVAILABLE)
+
+    def test_not_configured(self):
+        status = ModelStatus(None)
+        self.assertEqual(status.status()['state'], NOT_CONFIGURED)
+        self.assertEqual(status.refresh(wait=1)['state'], NOT_CONFIGURED)
+
+    def test_health_check_uses_shared_status(self):
+        probe = FakeProbe()
+        with mock.patch.object(health, 'GEMINI_API_KEY', 'test-key'), \
+                mock.patch.object(model_status, '_shared', ModelStatus(probe)):
+            checker = health.HealthChecker()
+            self.assertEqual(checker.check_gemini_api()['status'], "healthy")
+            self.assertEqual(checker.check_gemini_api()['status'], "healthy")
+        self.assertEqual(probe.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database import partitioning, queries
+from src.database.bulk_load import InitialLoader
+from src.database.migrate import downgrade_database, upgrade_database
+from src.database.database import DatabaseManager
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+
+TEST_DATABASE = "pubmed_test_partitioning"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+class TestPartitioning(unittest.TestCase):
+
+    def setUp(self):
+        admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+        admin.dispose()
+        self.db = DatabaseManager(_url(TEST_DATABASE))
+        self.db.create_tables()
+        self.articles = SyntheticCorpus(CorpusConfig(seed=11, year_start=2000, year_end=2024)).articles(200)
+
+    def tearDown(self):
+        self.db.engine.dispose()
+
+    def _scalar(self, sql, params=()):
+        with self.db.engine.connect() as conn:
+            return conn.exec_driver_sql(sql, params).scalar()
+
+    def _partition_of(self, pmid):
+        return self._scalar("SELECT tableoid::regclass::text FROM articles WHERE pmid = %s", (pmid,))
+
+    def test_convert_and_prune(self):
+        self.db.insert_articles_bulk(self.articles)
+        moved = partitioning.convert(self.db.engine, start_year=2010, end_year=2020)
+
+        self.assertEqual(moved, 200)
+        self.assertTrue(partitioning.is_partitioned(self.db.engine))
+        self.assertEqual(self._scalar("SELECT count(*) FROM articles"), 200)
+        names = {part['name'] for part in partitioning.list_partitions(self.db.engine)}
+        self.assertIn('articles_before_2010', names)
+        self.assertIn('articles_y2015', names)
+        self.assertIn('articles_default', names)
+
+        # a year filter only touches that year's partition
+        query, params = queries.build_search_query('a', 2015)
+        with self.db.engine.connect() as conn:
+            plan = "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + query, tuple(params)))
+        self.assertIn('articles_y2015', plan)
+        self.assertNotIn('articles_y2016', plan)
+        self.assertNotIn('articles_default', plan)
+
+        # a revised record with another year moves partitions
+        article = dict(self.articles[0], publication_year=2012, title="Revised title")
+        self.assertEqual(self.db.insert_articles_bulk([article]), 1)
+        self.assertEqual(self._partition_of(int(article['pmid'])), 'articles_y2012')
+        self.assertEqual(self.db.insert_articles_bulk([article]), 0)
+
+    def test_maintain_and_detach(self):
+        self.db.insert_articles_bulk(self.articles)
+        partitioning.convert(self.db.engine, start_year=2010, end_year=2020)
+        in_default = self._scalar("SELECT count(*) FROM articles_default")
+        self.assertGreater(in_default, 0)
+
+        created = partitioning.maintain(self.db.engine)
+        self.assertIn(2021, created)
+        self.assertEqual(self._scalar("SELECT count(*) FROM articles_default"), 0)
+        self.assertEqual(self._scalar("SELECT count(*) FROM articles"), 200)
+        self.assertEqual(partitioning.maintain(self.db.engine), [])
+
+        in_2015 = self._scalar("SELECT count(*) FROM articles_y2015")
+        partitioning.detach_year(self.db.engine, 2015)
+        self.assertEqual(self._scalar("SELECT count(*) FROM articles"), 200 - in_2015)
+        self.assertEqual(self._scalar("SELECT count(*) FROM articles_y2015"), in_2015)
+
+    def test_initial_load_into_partitions(self):
+        partitioning.convert(self.db.engine, start_year=2010, end_year=2024)
+        stats = InitialLoader(self.db).load(self.articles, batch_size=50)
+
+        self.assertEqual(stats['rows']['articles'], 200)
+        self.assertTrue(partitioning.is_partitioned(self.db.engine))
+        self.assertEqual(self._scalar("SELECT count(*) FROM articles_default"), 0)
+        # the partition indexes came back with their parent (pk, journal, year, full text)
+        self.assertEqual(self._scalar(
+            "SELECT count(*) FROM pg_indexes WHERE tablename = 'articles_y2015'"), 4)
+
+    def test_fulltext_migration_on_partitioned_table(self):
+        # 0004 builds the partition indexes concurrently and attaches them to the parent
+        self.db.insert_articles_bulk(self.articles)
+        partitioning.convert(self.db.engine, start_year=2010, end_year=2020)
+        downgrade_database(self.db.engine, '0003')
+        self.assertIsNone(self._scalar("SELECT to_regclass('ix_articles_fts')"))
+
+        upgrade_database(self.db.engine)
+        self.assertTrue(self._scalar("SELECT indisvalid FROM pg_index WHERE indexrelid = 'ix_articles_fts'::regclass"))
+        self.assertEqual(
+            self._scalar("SELECT count(*) FROM pg_inherits WHERE inhparent = 'ix_articles_fts'::regclass"),
+            len(partitioning.list_partitions(self.db.engine)))
+
+if __name__ == '__main__':
+    unittest.main()
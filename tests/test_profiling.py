@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.utils.profiling import Profiler, maybe_profile, parse_modes, format_profile_summary
+
+def busy_work(n=20000):
+    return sum(i * i for i in range(n))
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_modes(self):
+        self.assertEqual(parse_modes(" cprofile, TRACEMALLOC "), ['cprofile', 'tracemalloc'])
+        self.assertEqual(parse_modes(""), [])
+        with self.assertRaises(ValueError):
+            parse_modes("perf")
+
+    def test_cprofile_writes_pstats(self):
+        with Profiler("test", "cprofile", output_dir=self.tmp.name) as profiler:
+            for _ in range(5):
+                busy_work()
+
+        path = profiler.summary['files'][0]
+        self.assertTrue(path.endswith(".prof"))
+        self.assertTrue(os.path.exists(path))
+        functions = [func['function'] for func in profiler.summary['top_functions']]
+        self.assertTrue(any("busy_work" in func for func in functions))
+        self.assertIn("busy_work", format_profile_summary(profiler.summary))
+
+    def test_sampler_writes_speedscope(self):
+        with Profiler("test", "sample", output_dir=self.tmp.name, interval_ms=1) as profiler:
+            for _ in range(50):
+                busy_work()
+
+        with open(profiler.summary['files'][0]) as f:
+            data = json.load(f)
+        profile = data['profiles'][0]
+        self.assertEqual(profile['type'], "sampled")
+        self.assertEqual(len(profile['samples']), len(profile['weights']))
+        self.assertGreater(profiler.summary['samples'], 0)
+        self.assertTrue(profiler.summary['top_functions'])
+
+    def test_tracemalloc_snapshot(self):
+        with Profiler("test", "tracemalloc", output_dir=self.tmp.name) as profiler:
+            data = [str(i) * 10 for i in range(10000)]
+
+        self.assertTrue(profiler.summary['files'][0].endswith(".tracemalloc"))
+        self.assertGreater(profiler.summary['memory']['peak_bytes'], 0)
+        self.assertTrue(profiler.summary['memory']['top_allocations'])
+        self.assertEqual(len(data), 10000)
+
+    def test_maybe_profile_disabled(self):
+        with maybe_profile("test", modes=[]) as profiler:
+            busy_work()
+        self.assertIsNone(profiler)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.qa import prompt_builder
+from src.qa.prompt_builder import PromptBuilder, render_schema, similarity
+
+class FakeCache:
+    # verified_examples like SqlCache, counts reloads
+    def __init__(self, examples):
+        self.examples = examples
+        self.loads = 0
+
+    def verified_examples(self):
+        self.loads += 1
+        return list(self.examples)
+
+class TestSchema(unittest.TestCase):
+
+    def test_schema_lists_types_keys_and_joins(self):
+        schema = render_schema()
+        lines = {line.split('(')[0]: line for line in schema.splitlines()}
+        self.assertEqual(set(lines), set(prompt_builder.QA_TABLES))
+        self.assertIn("pmid int pk", lines['articles'])
+        self.assertIn("publication_year int idx", lines['articles'])
+        self.assertIn("journal_id int idx -> journals.id", lines['articles'])
+        self.assertIn("author_id int pk idx -> authors.id", lines['article_authors'])
+        self.assertIn("idx(last_name, first_name)", lines['authors'])
+        self.assertIn("term text unique", lines['mesh_terms'])
+        # bookkeeping columns stay out of the prompt
+        self.assertNotIn("created_at", schema)
+        self.assertNotIn("content_hash", schema)
+
+    def test_schema_is_rendered_once(self):
+        self.assertIs(render_schema(), render_schema())
+
+class TestExamples(unittest.TestCase):
+
+    def test_similarity(self):
+        self.assertGreater(similarity("top journals in 2020", "Top journals in 2023?"),
+                           similarity("top journals in 2020", "most prolific authors"))
+        self.assertEqual(similarity("the", "a"), 0.0)
+
+    def test_most_similar_examples_first(self):
+        cache = FakeCache([
+            ("Which journals published the most articles in 2020?",
+             "SELECT j.title, COUNT(*) FROM articles a JOIN journals j ON j.id = a.journal_id "
+             "WHERE a.publication_year = 2020 GROUP BY j.title ORDER BY 2 DESC LIMIT 10"),
+            ("Articles mentioning insulin", "SELECT pmid, title FROM articles WHERE abstract ILIKE '%insulin%' LIMIT 100"),
+        ])
+        builder = PromptBuilder(cache, max_examples=2)
+        examples = builder.examples("Which journals published the most articles in 2023?")
+        self.assertEqual(len(examples), 2)
+        self.assertIn("2020", examples[0][0])
+        self.assertNotIn("insulin", ' '.join(q for q, _ in examples))
+
+    def test_same_question_is_not_an_example(self):
+        builder = PromptBuilder(FakeCache([("How many articles are there", "SELECT 1")]))
+        self.assertNotIn("How many articles are there",
+                         [q for q, _ in builder.examples("how many articles are there?")])
+
+    def test_cache_snapshot_is_reused(self):
+        cache = FakeCache([])
+        builder = PromptBuilder(cache, refresh_seconds=3600)
+        for _ in range(5):
+            builder.build("top journals")
+        self.assertEqual(cache.loads, 1)
+
+    def test_prompt(self):
+        prompt = PromptBuilder(max_examples=1).build("  Which journals have the most articles in 2021?  ")
+        self.assertTrue(prompt.startswith("Schema:\n" + render_schema()))
+        self.assertIn("Examples:\nQ: Which journals have the most articles?", prompt)
+        self.assertTrue(prompt.endswith("Q: Which journals have the most articles in 2021?\nSQL:"))
+
+if __name__ == '__main__':
+    unittest.main()
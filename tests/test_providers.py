@@ -0,0 +1,145 @@
+import threading
+import time
+import unittest
+from unittest import mock
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.qa import providers
+from src.qa.providers import (LLMProvider, StubProvider, ProviderError, TransientProviderError,
+                              STUB_FALLBACK_SQL, get_provider)
+
+class FlakyProvider(LLMProvider):
+    # fails the first `failures` requests with the given error
+    name = 'flaky'
+
+    def __init__(self, failures, error, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.error = error
+        self.attempts = 0
+
+    def _generate(self, prompt, question, kind, timeout):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        return "SELECT 1"
+
+class TestStubProvider(unittest.TestCase):
+
+    def test_known_questions_map_to_sql(self):
+        provider = StubProvider(latency_ms=0)
+        self.assertIn("publication_year = 2024",
+                      provider.generate("prompt", question="How many articles were published in 2024?"))
+        self.assertEqual(provider.generate("prompt", question="something else"), STUB_FALLBACK_SQL)
+
+    def test_latency(self):
+        provider = StubProvider(latency_ms=50)
+        started = time.perf_counter()
+        provider.generate("prompt", question="how many articles are there")
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+
+    def test_same_seed_same_failures(self):
+        def outcomes():
+            provider = StubProvider(latency_ms=0, failure_rate=0.5, max_retries=0, seed=7)
+            result = []
+            for _ in range(20):
+                try:
+                    provider.generate("prompt", question="q")
+                    result.append(True)
+                except ProviderError:
+                    result.append(False)
+            return result
+        self.assertEqual(outcomes(), outcomes())
+        self.assertIn(False, outcomes())
+
+    def test_from_file(self):
+        path = os.path.join(os.path.dirname(__file__), "stub_answers_test.json")
+        with open(path, "w") as f:
+            f.write('{"Top journals?": "SELECT title FROM journals"}')
+        try:
+            provider = StubProvider.from_file(path, latency_ms=0)
+        finally:
+            os.remove(path)
+        self.assertEqual(provider.generate("prompt", question="top journals"), "SELECT title FROM journals")
+
+class TestProviderLimits(unittest.TestCase):
+
+    def test_transient_errors_are_retried(self):
+        provider = FlakyProvider(2, TransientProviderError("overloaded"), max_retries=2, retry_backoff=0)
+        self.assertEqual(provider.generate("prompt"), "SELECT 1")
+        self.assertEqual(provider.stats['retries'], 2)
+
+    def test_retries_give_up(self):
+        provider = FlakyProvider(5, TimeoutError("slow"), max_retries=1, retry_backoff=0)
+        with self.assertRaises(ProviderError):
+            provider.generate("prompt")
+        self.assertEqual(provider.attempts, 2)
+        self.assertEqual(provider.stats['failures'], 1)
+
+    def test_other_errors_are_not_retried(self):
+        provider = FlakyProvider(1, ValueError("bad api key"), max_retries=3, retry_backoff=0)
+        with self.assertRaises(ProviderError):
+            provider.generate("prompt")
+        self.assertEqual(provider.attempts, 1)
+
+    def test_timeout(self):
+        provider = StubProvider(latency_ms=500, timeout=0.05, max_retries=0)
+        with self.assertRaises(ProviderError):
+            provider.generate("prompt", question="q")
+
+    def test_concurrency_limit(self):
+        provider = StubProvider(latency_ms=100, max_concurrency=2, timeout=5)
+        running = []
+        peak = []
+        lock = threading.Lock()
+        original = provider._generate
+
+        def tracked(*args):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            try:
+                return original(*args)
+            finally:
+                with lock:
+                    running.pop()
+
+        provider._generate = tracked
+        threads = [threading.Thread(target=provider.generate, args=("prompt",), kwargs={'question': 'q'})
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(provider.stats['requests'], 6)
+
+    def test_busy_when_no_slot_frees_up(self):
+        provider = StubProvider(latency_ms=0, max_concurrency=1, timeout=0.05)
+        # another request holds the only slot
+        provider._slots.acquire()
+        try:
+            with self.assertRaises(ProviderError):
+                provider.generate("prompt", question="q")
+        finally:
+            provider._slots.release()
+        self.assertEqual(provider.stats['busy'], 1)
+        provider.generate("prompt", question="q")
+
+class TestGetProvider(unittest.TestCase):
+
+    def test_stub(self):
+        self.assertIsInstance(get_provider('stub'), StubProvider)
+
+    def test_gemini_without_key(self):
+        with mock.patch('src.config.config.GEMINI_API_KEY', None):
+            self.assertIsNone(get_provider('gemini'))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_provider('gpt')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.database.database import DatabaseManager
+from src.database.query_governor import QueryGovernor, QueryRejectedError, clean_sql
+
+class TestCleanSql(unittest.TestCase):
+
+    def test_accepts_single_select(self):
+        self.assertEqual(clean_sql("  SELECT 1;; "), "SELECT 1")
+        self.assertEqual(clean_sql("WITH x AS (SELECT 1) SELECT * FROM x"), "WITH x AS (SELECT 1) SELECT * FROM x")
+        # keywords and semicolons inside string literals are fine
+        self.assertTrue(clean_sql("SELECT title FROM articles WHERE title LIKE '%drop; create%'"))
+
+    def test_rejects_everything_else(self):
+        for sql in ["", "DELETE FROM articles", "SELECT 1; SELECT 2",
+                    "WITH gone AS (DELETE FROM journals RETURNING *) SELECT * FROM gone",
+                    "SELECT * FROM articles; DROP TABLE articles"]:
+            with self.assertRaises(QueryRejectedError):
+                clean_sql(sql)
+
+class TestQueryGovernor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = DatabaseManager()
+        cls.db.create_tables()
+
+    def test_runs_query_with_row_limit(self):
+        governor = QueryGovernor(self.db, row_limit=50)
+        df, report = governor.run("SELECT g AS n FROM generate_series(1, 500) g WHERE g::text LIKE '%1%'")
+        self.assertEqual(len(df), 50)
+        self.assertTrue(report['truncated'])
+        self.assertFalse(report['limited'])
+        self.assertGreater(report['cost'], 0)
+
+    def test_expensive_plan_is_limited_or_rejected(self):
+        governor = QueryGovernor(self.db, max_cost=1000, row_limit=100)
+        # a streaming plan gets cheap under the outer LIMIT and runs
+        df, report = governor.run("SELECT g FROM generate_series(1, 10000000) g")
+        self.assertTrue(report['limited'])
+        self.assertEqual(len(df), 100)
+
+        # a sort over everything stays expensive and is rejected
+        with self.assertRaises(QueryRejectedError) as ctx:
+            governor.run("SELECT g FROM generate_series(1, 10000000) g ORDER BY g DESC")
+        self.assertIn("too expensive", str(ctx.exception))
+
+    def test_statement_timeout(self):
+        governor = QueryGovernor(self.db, timeout_ms=100)
+        with self.assertRaises(QueryRejectedError) as ctx:
+            governor.run("SELECT pg_sleep(2)")
+        self.assertIn("cancelled", str(ctx.exception))
+
+    def test_read_only_transaction(self):
+        # writes the keyword check cannot see still fail
+        with self.assertRaises(QueryRejectedError) as ctx:
+            QueryGovernor(self.db).run("SELECT nextval('journals_id_seq')")
+        self.assertIn("read-only", str(ctx.exception))
+
+    def test_invalid_sql(self):
+        with self.assertRaises(QueryRejectedError):
+            QueryGovernor(self.db).run("SELECT missing_column FROM articles")
+
+if __name__ == '__main__':
+    unittest.main()
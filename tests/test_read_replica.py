@@ -0,0 +1,92 @@
+import unittest
+from unittest import mock
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database import db_manager
+from src.database.db_manager import DatabaseManager
+
+# a second plain database stands in for the replica, it reports no lag
+PRIMARY_DATABASE = "pubmed_test_primary"
+REPLICA_DATABASE = "pubmed_test_replica"
+
+def _url(database, port=None):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{port or DB_CONFIG['port']}/{database}"
+
+class TestReadReplica(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            for database in (PRIMARY_DATABASE, REPLICA_DATABASE):
+                conn.execute(text(f'DROP DATABASE IF EXISTS "{database}"'))
+                conn.execute(text(f'CREATE DATABASE "{database}"'))
+        admin.dispose()
+
+    def setUp(self):
+        self.db = DatabaseManager(_url(PRIMARY_DATABASE), _url(REPLICA_DATABASE))
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.db.read_engine.dispose()
+
+    def _database(self, fresh=False):
+        return self.db.execute_query("SELECT current_database() AS name", fresh=fresh)['name'][0]
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self._database(), REPLICA_DATABASE)
+        self.assertEqual(self._database(fresh=True), PRIMARY_DATABASE)
+
+        session = self.db.get_read_session()
+        try:
+            self.assertEqual(session.execute(text("SELECT current_database()")).scalar(), REPLICA_DATABASE)
+        finally:
+            session.close()
+
+        # writes and ETL sessions stay on the primary
+        session = self.db.get_session()
+        try:
+            self.assertEqual(session.execute(text("SELECT current_database()")).scalar(), PRIMARY_DATABASE)
+        finally:
+            session.close()
+
+        status = self.db.get_replica_status()
+        self.assertTrue(status['serving_reads'])
+        self.assertEqual(status['lag_seconds'], 0)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        with mock.patch.object(self.db, 'replica_lag', return_value=self.db.max_replica_lag + 1):
+            self.assertEqual(self._database(), PRIMARY_DATABASE)
+        with mock.patch.object(self.db, 'replica_lag', return_value=0.5):
+            self.assertEqual(self._database(), REPLICA_DATABASE)
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        db = DatabaseManager(_url(PRIMARY_DATABASE), _url(REPLICA_DATABASE, port=1))
+        try:
+            self.assertIsNone(db.replica_lag())
+            self.assertEqual(db.execute_query("SELECT current_database() AS name")['name'][0], PRIMARY_DATABASE)
+            self.assertFalse(db.get_replica_status()['serving_reads'])
+        finally:
+            db.engine.dispose()
+
+    def test_replica_without_replay_falls_back_to_primary(self):
+        # a replica that is not streaming and never replayed anything reports NULL
+        with mock.patch.object(db_manager, 'REPLICA_LAG_SQL', "SELECT NULL"):
+            self.assertIsNone(self.db.replica_lag())
+            self.assertEqual(self._database(), PRIMARY_DATABASE)
+            self.assertFalse(self.db.get_replica_status()['serving_reads'])
+
+    def test_read_url_only_applies_to_default_database(self):
+        with mock.patch.object(db_manager, 'DB_READ_URL', _url(REPLICA_DATABASE)):
+            db = DatabaseManager(_url(PRIMARY_DATABASE))
+            self.assertFalse(db.has_replica())
+            self.assertEqual(db.get_replica_status(), {'configured': False})
+            db.engine.dispose()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from unittest import mock
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.db_manager import DatabaseManager
+from src.qa.providers import StubProvider
+from src.qa.retrieval import (AbstractRetriever, QueryTooBroadError, estimate_tokens, truncate_tokens,
+                              extract_keywords, extract_citations)
+
+TEST_DATABASE = "pubmed_test_retrieval"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _article(pmid, title, abstract, year):
+    return {'pmid': str(pmid), 'title': title, 'abstract': abstract, 'publication_year': year,
+            'journal_title': 'Retrieval Journal', 'journal_issn': '', 'authors': [], 'mesh_terms': []}
+
+class TestContext(unittest.TestCase):
+
+    def test_keywords_drop_request_words(self):
+        self.assertEqual(extract_keywords("What do recent abstracts say about insulin resistance in obesity?"),
+                         ['insulin', 'resistance', 'obesity'])
+        self.assertEqual(extract_keywords("What do the studies say?"), [])
+
+    def test_truncate_stays_within_budget(self):
+        text_ = "word " * 1000
+        cut = truncate_tokens(text_, 50)
+        self.assertLessEqual(estimate_tokens(cut), 50)
+        self.assertTrue(cut.endswith('…'))
+        self.assertEqual(truncate_tokens("short", 50), "short")
+
+    def test_pack_respects_budget(self):
+        retriever = AbstractRetriever(None, None, token_budget=300, abstract_tokens=100)
+        articles = [{'pmid': pmid, 'title': 'Title', 'abstract': 'text ' * 200, 'publication_year': 2024}
+                    for pmid in range(1, 8)]
+        chunks = retriever.pack(articles)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([pmid for chunk in chunks for pmid, _ in chunk], list(range(1, 8)))
+        for chunk in chunks:
+            self.assertLessEqual(sum(estimate_tokens(block) for _, block in chunk), 300)
+
+    def test_citations_only_from_context(self):
+        answer = "A [PMID 2], B [PMID: 99] and again [PMID 2], C [PMID 1]."
+        self.assertEqual(extract_citations(answer, {1, 2, 3}), [2, 1])
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            AbstractRetriever(None, None, strategy='rerank')
+
+class TestAbstractRetriever(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+        admin.dispose()
+        cls.db = DatabaseManager(_url(TEST_DATABASE))
+        cls.db.create_tables()
+        filler = "Patients were followed for several years in a multicenter cohort. " * 20
+        cls.db.insert_articles_bulk([
+            _article(910001, "Insulin resistance in adolescents", "Insulin resistance rose with obesity. " + filler, 2019),
+            _article(910002, "Insulin resistance and exercise", "Exercise lowered insulin resistance. " + filler, 2023),
+            _article(910003, "Insulin pumps", "Pump therapy improved glucose control. " + filler, 2021),
+            _article(910004, "Statins after stroke", "Statins reduced recurrent stroke. " + filler, 2022),
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.engine.dispose()
+
+    def test_search_ranks_matches(self):
+        retriever = AbstractRetriever(self.db, None, top_k=2)
+        pmids = [article['pmid'] for article in retriever.search("insulin resistance")]
+        self.assertEqual(sorted(pmids), [910001, 910002])
+
+    def test_search_falls_back_to_any_keyword(self):
+        retriever = AbstractRetriever(self.db, None, top_k=3)
+        pmids = {article['pmid'] for article in retriever.search("insulin pumps resistance")}
+        self.assertEqual(pmids, {910001, 910002, 910003})
+        self.assertEqual(retriever.search("quantum chromodynamics"), [])
+
+    def test_recent_questions_prefer_newer_articles(self):
+        retriever = AbstractRetriever(self.db, None, top_k=1, candidates=1)
+        self.assertEqual(retriever.search("recent insulin resistance findings")[0]['pmid'], 910002)
+
+    def test_candidates_are_the_newest_matches(self):
+        retriever = AbstractRetriever(self.db, None, top_k=2, candidates=2)
+        pmids = {article['pmid'] for article in retriever.search("insulin")}
+        self.assertEqual(pmids, {910002, 910003})
+
+    def test_cancelled_search_is_too_broad(self):
+        # a search that runs past the timeout stands in for a very broad query
+        retriever = AbstractRetriever(self.db, StubProvider(latency_ms=0), timeout_ms=50)
+        with mock.patch('src.qa.retrieval.SEARCH_SQL', "SELECT pg_sleep(1) -- {order}"):
+            with self.assertRaises(QueryTooBroadError):
+                retriever.answer("insulin")
+
+    def test_single_call_within_budget(self):
+        provider = StubProvider(latency_ms=0)
+        retriever = AbstractRetriever(self.db, provider, top_k=3, token_budget=250, abstract_tokens=200)
+        result = retriever.answer("insulin resistance")
+
+        self.assertEqual(result['strategy'], 'single')
+        self.assertEqual(result['model_calls'], 1)
+        self.assertLessEqual(result['context_tokens'], 250)
+        self.assertEqual(result['left_out'], 2)
+        self.assertTrue(result['citations'])
+        self.assertTrue(all(source['cited'] for source in result['sources']))
+
+    def test_map_reduce_summarizes_the_rest(self):
+        provider = StubProvider(latency_ms=0)
+        retriever = AbstractRetriever(self.db, provider, top_k=3, token_budget=250, abstract_tokens=200,
+                                      strategy='map_reduce')
+        result = retriever.answer("insulin resistance")
+
+        self.assertEqual(result['strategy'], 'map_reduce')
+        self.assertEqual(result['model_calls'], 4)
+        self.assertEqual(provider.stats['requests'], 4)
+        self.assertEqual(result['left_out'], 0)
+        self.assertEqual(len(result['sources']), 3)
+
+    def test_no_matches_skip_the_model(self):
+        provider = StubProvider(latency_ms=0)
+        result = AbstractRetriever(self.db, provider).answer("quantum chromodynamics")
+        self.assertEqual(result['model_calls'], 0)
+        self.assertEqual(provider.stats['requests'], 0)
+        self.assertEqual(result['sources'], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import importlib.util
+import contextlib
+import io
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.etl.eutils_server import EUtilsStubServer, ArticleStore
+
+# scripts/ is not a package
+_spec = importlib.util.spec_from_file_location(
+    "run_etl_cli", os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "run_etl.py"))
+run_etl = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(run_etl)
+
+TEST_DATABASE = "pubmed_test_run_etl"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _recreate_database(create=True):
+    # FORCE: the engines the commands opened are still connected
+    admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}" WITH (FORCE)'))
+        if create:
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+    admin.dispose()
+
+class TestRunEtlCli(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        _recreate_database()
+
+    @classmethod
+    def tearDownClass(cls):
+        _recreate_database(create=False)
+
+    def _run(self, argv, **server_options):
+        # (exit code, stdout lines) of the command against a stub server
+        output = io.StringIO()
+        with EUtilsStubServer(**server_options) as server, contextlib.redirect_stdout(output):
+            code = run_etl.main(argv + ["--rate-limit", "100", "--base-url", server.base_url,
+                                        "--database-url", _url(TEST_DATABASE)])
+        return code, output.getvalue().splitlines()
+
+    def test_read_job_file_text(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("cancer\n# skipped\n\nvaccine\t25\n")
+        try:
+            self.assertEqual(run_etl.read_job_file(f.name, 100), [("cancer", 100), ("vaccine", 25)])
+        finally:
+            os.remove(f.name)
+
+    def test_read_job_file_json(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(["cancer", {"term": "vaccine", "max": 25}], f)
+        try:
+            self.assertEqual(run_etl.read_job_file(f.name, 100), [("cancer", 100), ("vaccine", 25)])
+        finally:
+            os.remove(f.name)
+
+    def test_search_dry_run(self):
+        with EUtilsStubServer(store=ArticleStore(synthetic_count=30)) as server:
+            parser, args = run_etl.parse_args([
+                "search", "cli dry run", "--max", "30", "--batch-size", "10",
+                "--rate-limit", "100", "--dry-run", "--base-url", server.base_url
+            ])
+            loader = run_etl.Loader(args)
+            pmids = loader.etl.search_articles("cli dry run", 30)
+            inserted = loader.load_pmids(pmids, run_etl.Progress(False, total=len(pmids)))
+
+        self.assertEqual(inserted, 0)
+        self.assertEqual(loader.metrics.counters['articles_processed'], 30)
+        self.assertEqual(loader.metrics.histograms['efetch'].count, 3)
+
+    def test_search_pages_and_reports_new_and_updated(self):
+        with mock.patch('src.etl.pubmed_etl.ESEARCH_PAGE_SIZE', 8):
+            code, lines = self._run(["search", "cli paging", "--max", "25", "--batch-size", "10"],
+                                    store=ArticleStore(synthetic_count=30))
+        self.assertEqual(code, 0)
+        self.assertEqual(lines[0], "cli paging: 25 articles of 30 matches")
+        self.assertEqual(lines[1], "25 new and 0 updated articles written")
+
+    def test_failed_search_exits_non_zero(self):
+        code, lines = self._run(["search", "cli failed search", "--dry-run"], error_rate=1.0)
+        self.assertEqual(code, 1)
+        self.assertTrue(lines[0].startswith("cli failed search: search failed:"))
+
+    def test_failed_efetch_exits_non_zero(self):
+        code, lines = self._run(["fetch", "990000001", "990000002", "--dry-run"], error_rate=1.0)
+        self.assertEqual(code, 1)
+
+    def test_store_error_cancels_queued_fetches(self):
+        store = ArticleStore(synthetic_count=40)
+        with mock.patch.object(run_etl.Loader, 'store', side_effect=RuntimeError("database is down")):
+            code, lines = self._run(["search", "cli store error", "--max", "40", "--batch-size", "1",
+                                     "--concurrency", "1"], store=store, latency_ms=20)
+        self.assertEqual(code, 1)
+        self.assertIn("cli store error: store failed: database is down", lines)
+
+        # the first batch failed to store, the other 39 efetch calls never ran
+        report_path = lines[-1].rpartition(" ")[2]
+        try:
+            with open(report_path) as f:
+                report = json.load(f)
+        finally:
+            os.remove(report_path)
+        self.assertEqual(report['errors'], ["cli store error: store failed: database is down"])
+        self.assertLess(report['stages']['efetch']['count'], 5)
+
+    def test_no_command_without_tty(self):
+        with open(os.devnull) as devnull:
+            stdin = sys.stdin
+            sys.stdin = devnull
+            try:
+                self.assertEqual(run_etl.main([]), 1)
+            finally:
+                sys.stdin = stdin
+
+if __name__ == '__main__':
+    unittest.main()
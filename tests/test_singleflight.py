@@ -0,0 +1,131 @@
+import unittest
+import threading
+import time
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pandas as pd
+
+from src.qa.providers import StubProvider
+from src.qa.sql_generator import SqlGenerator
+from src.utils.singleflight import SingleFlight, coalesced, _copy
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+class SlowReads:
+    # stands in for DatabaseManager: reads block until released
+
+    def __init__(self):
+        self._flights = SingleFlight("test")
+        self.release = threading.Event()
+        self.queries = 0
+
+    @coalesced
+    def execute_query(self, query, params=None, fresh=False):
+        self.queries += 1
+        self.release.wait(5)
+        return pd.DataFrame({'query': [query], 'params': [params]})
+
+class TestSingleFlight(unittest.TestCase):
+
+    def _run_concurrently(self, count, target):
+        results = [None] * count
+        errors = [None] * count
+
+        def run(index):
+            try:
+                results[index] = target()
+            except Exception as e:
+                errors[index] = e
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def test_identical_calls_share_one_execution(self):
+        reads = SlowReads()
+        threads, results, _ = self._run_concurrently(
+            5, lambda: reads.execute_query("SELECT 1", [2024]))
+        _wait_for(lambda: reads._flights.stats['calls'] == 5)
+        reads.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(reads.queries, 1)
+        self.assertEqual(reads._flights.get_stats(), {'calls': 5, 'executed': 1, 'shared': 4, 'in_flight': 0})
+        # every caller gets its own copy
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertTrue(all(result.equals(results[0]) for result in results))
+
+    def test_shared_results_are_deep_copies(self):
+        stats = {'year_range': [2001, 2024]}
+        copied = _copy(stats)
+        copied['year_range'].append(2025)
+        self.assertEqual(stats['year_range'], [2001, 2024])
+
+        frame = pd.DataFrame({'authors': [1, 2]})
+        copied = _copy(frame)
+        copied.loc[0, 'authors'] = 99
+        self.assertEqual(frame.loc[0, 'authors'], 1)
+
+    def test_different_arguments_run_separately(self):
+        reads = SlowReads()
+        reads.release.set()
+        reads.execute_query("SELECT 1", [2023])
+        reads.execute_query("SELECT 1", (2023,))
+        reads.execute_query("SELECT 1", params=[2024])
+        self.assertEqual(reads._flights.stats['shared'], 0)
+        self.assertEqual(reads.queries, 3)
+
+    def test_fresh_reads_are_not_coalesced(self):
+        reads = SlowReads()
+        threads, _, _ = self._run_concurrently(3, lambda: reads.execute_query("SELECT 1", fresh=True))
+        _wait_for(lambda: reads.queries == 3)
+        reads.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(reads._flights.stats['calls'], 0)
+
+    def test_errors_reach_every_caller(self):
+        flights = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("database is down")
+
+        threads, _, errors = self._run_concurrently(1, lambda: flights.do('key', fail))
+        started.wait(5)
+        more, _, more_errors = self._run_concurrently(2, lambda: flights.do('key', fail))
+        _wait_for(lambda: flights.stats['shared'] == 2)
+        release.set()
+        for thread in threads + more:
+            thread.join()
+
+        self.assertTrue(all(isinstance(error, RuntimeError) for error in errors + more_errors))
+        self.assertEqual(flights.in_flight(), 0)
+        # nothing is kept once the call is done
+        self.assertEqual(flights.do('key', lambda: 42), (42, False))
+
+    def test_generator_makes_one_model_call(self):
+        provider = StubProvider(latency_ms=300)
+        generator = SqlGenerator(provider)
+        threads, results, errors = self._run_concurrently(
+            4, lambda: generator.generate("How many articles are there?"))
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [None] * 4)
+        self.assertEqual(provider.stats['requests'], 1)
+        self.assertEqual({sql for sql, _ in results}, {"SELECT COUNT(*) AS articles FROM articles"})
+
+if __name__ == '__main__':
+    unittest.main()
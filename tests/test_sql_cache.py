@@ -0,0 +1,122 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.db_manager import DatabaseManager
+from src.qa import sql_cache
+from src.qa.sql_cache import SqlCache, normalize_question, cache_key
+from src.qa.providers import StubProvider
+from src.qa.sql_generator import SqlGenerator, SqlGenerationError, clean_response
+
+TEST_DATABASE = "pubmed_test_sql_cache"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+class TestNormalization(unittest.TestCase):
+
+    def test_normalize_question(self):
+        self.assertEqual(normalize_question("  Which journals have the MOST\n articles?? "),
+                         "which journals have the most articles")
+        self.assertEqual(normalize_question("How many articles in 2023."), "how many articles in 2023")
+
+    def test_key_includes_schema_version(self):
+        self.assertEqual(cache_key("How many articles?"), cache_key("how many articles"))
+        self.assertNotEqual(cache_key("how many articles", "v1"), cache_key("how many articles", "v2"))
+
+    def test_clean_response(self):
+        self.assertEqual(clean_response("```sql\nSELECT 1\n```"), "SELECT 1")
+
+class TestSqlCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+        admin.dispose()
+        cls.db = DatabaseManager(_url(TEST_DATABASE))
+        cls.db.create_tables()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.engine.dispose()
+
+    def setUp(self):
+        self.cache = SqlCache(self.db)
+        self.cache.clear()
+
+    def test_persists_across_instances(self):
+        self.assertIsNone(self.cache.get("How many articles?"))
+        self.cache.put("How many articles?", "SELECT COUNT(*) FROM articles")
+
+        other = SqlCache(self.db)
+        self.assertEqual(other.get("how many  ARTICLES"), "SELECT COUNT(*) FROM articles")
+        self.assertEqual(other.get("how many articles"), "SELECT COUNT(*) FROM articles")
+        self.assertEqual(other.stats['db_hits'], 1)
+        self.assertEqual(other.stats['memory_hits'], 1)
+
+        stats = other.get_stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['total_hits'], 2)
+        self.assertEqual(stats['hit_rate'], 1.0)
+        self.assertEqual(stats['top_questions'][0]['question'], "How many articles?")
+
+    def test_expired_entries_are_misses(self):
+        self.cache.put("how many journals", "SELECT COUNT(*) FROM journals")
+        with self.db.engine.begin() as conn:
+            conn.execute(text("UPDATE qa_sql_cache SET created_at = now() - interval '2 hours'"))
+
+        cache = SqlCache(self.db, ttl_seconds=3600)
+        self.assertIsNone(cache.get("how many journals"))
+        self.assertEqual(cache.get_stats()['entries'], 0)
+
+    def test_least_recently_used_are_evicted(self):
+        cache = SqlCache(self.db, max_entries=2)
+        cache.put("first", "SELECT 1")
+        cache.put("second", "SELECT 2")
+        with self.db.engine.begin() as conn:
+            conn.execute(text("UPDATE qa_sql_cache SET last_used_at = now() - interval '1 hour' WHERE question = 'first'"))
+        cache.put("third", "SELECT 3")
+
+        self.assertIsNone(cache.get("first"))
+        self.assertEqual(cache.get("second"), "SELECT 2")
+        self.assertEqual(cache.get("third"), "SELECT 3")
+
+    def test_other_schema_version_is_not_served(self):
+        self.cache.put("how many authors", "SELECT COUNT(*) FROM authors")
+        original = sql_cache._schema_version
+        sql_cache._schema_version = "0" * 16
+        try:
+            self.assertIsNone(SqlCache(self.db).get("how many authors"))
+        finally:
+            sql_cache._schema_version = original
+
+    def test_generator_skips_model_on_hit(self):
+        provider = StubProvider({"how many articles": "```sql\nSELECT COUNT(*) FROM articles\n```"}, latency_ms=0)
+        generator = SqlGenerator(provider, self.cache)
+
+        sql, cached = generator.generate("How many articles?")
+        self.assertEqual((sql, cached), ("SELECT COUNT(*) FROM articles", False))
+        generator.remember("How many articles?", sql)
+
+        sql, cached = generator.generate("how many articles")
+        self.assertTrue(cached)
+        self.assertEqual(provider.stats['requests'], 1)
+
+        generator.forget("how many articles")
+        generator.generate("how many articles")
+        self.assertEqual(provider.stats['requests'], 2)
+
+    def test_generator_rejects_writes(self):
+        generator = SqlGenerator(StubProvider({"remove everything": "DELETE FROM articles"}, latency_ms=0), self.cache)
+        with self.assertRaises(SqlGenerationError):
+            generator.generate("remove everything")
+
+if __name__ == '__main__':
+    unittest.main()
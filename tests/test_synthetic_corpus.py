@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+from src.etl.pubmed_etl import PubMedETL
+
+class TestSyntheticCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = SyntheticCorpus(CorpusConfig(seed=7, authors_max=12, mesh_max=20,
+                                                   year_start=2010, year_end=2020))
+        self.etl = PubMedETL()
+
+    def test_deterministic(self):
+        first = self.corpus.articles(5)
+        second = SyntheticCorpus(CorpusConfig(seed=7, authors_max=12, mesh_max=20,
+                                              year_start=2010, year_end=2020)).articles(5)
+        self.assertEqual(first, second)
+
+    def test_distribution_bounds(self):
+        for article in self.corpus.iter_articles(200):
+            self.assertTrue(1 <= len(article['authors']) <= 12)
+            self.assertLessEqual(len(article['mesh_terms']), 20)
+            self.assertTrue(2010 <= article['publication_year'] <= 2020)
+            self.assertTrue(article['journal_title'])
+
+    def test_unique_author_keys(self):
+        keys = {(a['last_name'], a['first_name']) for a in (self.corpus.author(i) for i in range(20000))}
+        self.assertEqual(len(keys), 20000)
+
+    def test_xml_round_trip_through_parser(self):
+        articles = self.corpus.articles(20)
+        xml = "<PubmedArticleSet>" + "".join(self.corpus.to_xml(a) for a in articles) + "</PubmedArticleSet>"
+        parsed = self.etl.parse_articles(xml.encode())
+        self.assertEqual(parsed, articles)
+
+    def test_write_xml_streams_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.xml")
+            self.corpus.write_xml(path, 15)
+            parsed = list(self.etl.iter_xml_file(path))
+        self.assertEqual(parsed, self.corpus.articles(15))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+import os
+import sys
+import threading
+import time
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from src.config.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.database.models import EtlJob, Article
+from src.etl.eutils_server import EUtilsStubServer, ArticleStore
+from src.etl.pubmed_etl import PubMedETL
+from src.etl.synthetic_corpus import SyntheticCorpus, CorpusConfig
+from src.etl.rate_limit import RateLimiter, SharedRateLimiter
+from src.etl.work_queue import WorkQueue, EtlWorker
+
+TEST_TERM = "test_work_queue"
+TEST_DATABASE = "pubmed_test_work_queue"
+
+def _url(database):
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{database}"
+
+def _recreate_database(create=True):
+    admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE}"'))
+        if create:
+            conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+    admin.dispose()
+
+class TestWorkQueue(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # workers write the stub's articles, into a throwaway database
+        _recreate_database()
+        cls.db = DatabaseManager(_url(TEST_DATABASE))
+        cls.db.create_tables()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.engine.dispose()
+        _recreate_database(create=False)
+
+    def setUp(self):
+        self._delete_jobs()
+        self.queue = WorkQueue(self.db, lease_seconds=60, max_attempts=2)
+
+    def tearDown(self):
+        self._delete_jobs()
+
+    def _delete_jobs(self):
+        session = self.db.get_session()
+        session.query(EtlJob).filter(EtlJob.search_term == TEST_TERM).delete()
+        session.commit()
+        session.close()
+
+    def test_claim_is_exclusive(self):
+        self.queue.enqueue(["1", "2", "3"], batch_size=2, search_term=TEST_TERM)
+        first = self.queue.claim("worker-a")
+        second = self.queue.claim("worker-b")
+        self.assertEqual(first['pmids'], ["1", "2"])
+        self.assertEqual(second['pmids'], ["3"])
+        self.assertIsNone(self.queue.claim("worker-c"))
+
+    def test_expired_lease_is_reclaimed(self):
+        queue = WorkQueue(self.db, lease_seconds=0, max_attempts=2)
+        queue.enqueue(["1"], search_term=TEST_TERM)
+        first = queue.claim("crashed-worker")
+        time.sleep(0.05)
+        second = queue.claim("worker-b")
+        self.assertEqual(second['id'], first['id'])
+        self.assertEqual(second['attempts'], 2)
+        # the old owner can no longer touch the job
+        self.assertFalse(queue.heartbeat(first['id'], "crashed-worker"))
+        self.assertTrue(queue.complete(second['id'], "worker-b", 1))
+
+    def test_fail_retries_then_gives_up(self):
+        self.queue.enqueue(["1"], search_term=TEST_TERM)
+        job = self.queue.claim("worker-a")
+        self.queue.fail(job['id'], "worker-a", "boom", job['attempts'])
+        job = self.queue.claim("worker-a")
+        self.assertEqual(job['attempts'], 2)
+        self.queue.fail(job['id'], "worker-a", "boom", job['attempts'])
+        self.assertIsNone(self.queue.claim("worker-a"))
+
+    def test_insert_error_fails_job(self):
+        # a batch the database rejects releases the job for a retry, it is not done
+        self.queue.enqueue(["990004000"], search_term=TEST_TERM)
+        etl = PubMedETL(rate_limiter=RateLimiter(100), db=self.db)
+        article = SyntheticCorpus(CorpusConfig(pmid_start=990004000)).article(990004000)
+        article['publication_year'] = 'not a year'
+        worker = EtlWorker(self.queue, etl, worker_id="worker-a")
+        with mock.patch.object(etl, 'fetch_articles_batch', return_value=[article]):
+            self.assertFalse(worker.process_job(self.queue.claim("worker-a")))
+
+        self.assertEqual(worker.stats['jobs_failed'], 1)
+        session = self.db.get_session()
+        job = session.query(EtlJob).filter(EtlJob.search_term == TEST_TERM).one()
+        session.close()
+        self.assertEqual(job.status, 'pending')
+        self.assertIsNone(job.worker_id)
+        self.assertIsNone(job.lease_expires_at)
+        self.assertIsNone(job.articles_inserted)
+        self.assertIn('not a year', job.last_error)
+
+    def test_workers_process_queue(self):
+        with EUtilsStubServer(store=ArticleStore(synthetic_count=40)) as server:
+            etl = PubMedETL(base_url=server.base_url, rate_limiter=RateLimiter(100), db=self.db)
+            pmids = etl.search_articles(TEST_TERM, max_results=40)
+            self.assertEqual(self.queue.enqueue(pmids, batch_size=10, search_term=TEST_TERM), 4)
+
+            workers = [
+                EtlWorker(self.queue,
+                          PubMedETL(base_url=server.base_url, rate_limiter=RateLimiter(100), db=self.db),
+                          worker_id=f"worker-{i}", idle_sleep=0.1)
+                for i in range(2)
+            ]
+            threads = [threading.Thread(target=w.run, kwargs={'exit_when_empty': True}) for w in workers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sum(w.stats['jobs_done'] for w in workers), 4)
+        session = self.db.get_session()
+        found = session.query(Article).filter(Article.pmid.in_([int(p) for p in pmids])).count()
+        statuses = {job.status for job in session.query(EtlJob).filter(EtlJob.search_term == TEST_TERM)}
+        session.close()
+        self.assertEqual(found, 40)
+        self.assertEqual(statuses, {'done'})
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_local_rate_limiter(self):
+        limiter = RateLimiter(50)
+        started = time.perf_counter()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+
+    def test_shared_rate_limiter_across_clients(self):
+        # two limiters on the same row behave like two worker processes
+        db = DatabaseManager()
+        db.create_tables()
+        limiters = [SharedRateLimiter(db, 40, name="test_shared"), SharedRateLimiter(db, 40, name="test_shared")]
+        started = time.perf_counter()
+        threads = [threading.Thread(target=lambda l=l: [l.acquire() for _ in range(5)]) for l in limiters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 10 slots 25ms apart
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+
+if __name__ == '__main__':
+    unittest.main()